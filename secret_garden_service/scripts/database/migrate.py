@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script para aplicar as migrações pendentes em um banco de dados existente.
+"""
+
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para permitir importações relativas
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+)
+
+from sqlalchemy import create_engine
+
+from src.secret_garden.database.config import SQLALCHEMY_DATABASE_URL, Base
+from src.secret_garden.database import models  # noqa
+from src.secret_garden.database.migrations import run_migrations
+
+
+def migrate():
+    """Cria as tabelas novas e aplica as migrações pendentes"""
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+
+    if not applied:
+        print('Nenhuma migração pendente.')
+        return
+
+    for migration in applied:
+        print(f'Migração aplicada: {migration}')
+
+
+if __name__ == '__main__':
+    migrate()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Script para recriar o índice de nomes dos clientes (nomes normalizados e
+trigramas usados na busca de clientes pelo nome do pagador).
+
+Uso:
+    python rebuild_name_index.py
+"""
+
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para permitir importações relativas
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+)
+
+from src.secret_garden.database.config import SessionLocal
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameIndexService
+
+
+def rebuild_name_index():
+    """Recria o índice de nomes de todos os clientes"""
+    db = SessionLocal()
+    try:
+        total = ClientNameIndexService.rebuild(db)
+        print(f'{total} clientes indexados.')
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    rebuild_name_index()
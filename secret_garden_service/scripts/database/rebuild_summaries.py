@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Script para recriar a tabela owner_month_summary (totais de repasse e de
+retornos bancários por proprietário/mês) a partir dos cálculos e retornos.
+
+Uso:
+    python rebuild_summaries.py
+    python rebuild_summaries.py --month 3 --year 2024
+"""
+
+import argparse
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para permitir importações relativas
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+)
+
+from src.secret_garden.database.config import SessionLocal
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+
+
+def rebuild_summaries(month=None, year=None):
+    """Recria os resumos de um mês ou de todos os meses"""
+    db = SessionLocal()
+    try:
+        total = OwnerMonthSummaryService.rebuild(db, month, year)
+        print(f'{total} resumos de proprietário/mês recriados.')
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Recria os resumos de proprietário/mês'
+    )
+    parser.add_argument('--month', type=int, help='Mês (1-12)')
+    parser.add_argument('--year', type=int, help='Ano')
+    args = parser.parse_args()
+
+    if bool(args.month) != bool(args.year):
+        parser.error('Informe --month e --year juntos.')
+
+    rebuild_summaries(args.month, args.year)
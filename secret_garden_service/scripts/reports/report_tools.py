@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Ferramentas para gerar relatórios do Secret Garden.
+
+Uso:
+    python report_tools.py transfers --month 3 --year 2024
+    python report_tools.py transfers --month 3 --year 2024 \
+        --output repasses.ndjson
+    python report_tools.py statements --month 3 --year 2024 \
+        --output-dir extratos --format html --format pdf
+"""
+
+import os
+import sys
+
+# Adicionar o diretório raiz ao path para permitir importações relativas
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+)
+
+from src.secret_garden.cli.reports import main
+
+if __name__ == '__main__':
+    main()
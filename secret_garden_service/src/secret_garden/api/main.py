@@ -5,7 +5,8 @@ from src.secret_garden.database.init_db import init_db
 
 from .routers import (
     clients, health, monthly_calculations, owners,
-    monthly_variable_values, monthly_transfers, bank_returns
+    monthly_variable_values, monthly_transfers, bank_returns, exports,
+    reconciliation, retornos
 )
 
 # Inicializa o banco de dados
@@ -29,3 +30,6 @@ app.include_router(owners.router)
 app.include_router(monthly_variable_values.router)
 app.include_router(monthly_transfers.router)
 app.include_router(bank_returns.router)
+app.include_router(exports.router)
+app.include_router(reconciliation.router)
+app.include_router(retornos.router)
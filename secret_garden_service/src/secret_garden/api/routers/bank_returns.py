@@ -1,15 +1,19 @@
-from typing import Optional
+import io
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Path, Query, Body
+from fastapi import APIRouter, Depends, File, Path, Query, Body, UploadFile
 from sqlalchemy.orm import Session
 
+from src.secret_garden.core.money import from_cents, to_cents
 from src.secret_garden.database.config import get_db
 from src.secret_garden.database.models import BankReturn, Client
 from src.secret_garden.models.bank_return import (
-    BankReturnCreate, BankReturnUpdate, BankReturnResponse
+    BankReturnCreate, BankReturnUpdate, BankReturnResponse,
+    BankReturnImportResponse, BankReturnBulkResponse
 )
 from src.secret_garden.services.bank_return_service import BankReturnService
+from src.secret_garden.services.cnab_import_service import CnabImportService
 
 router = APIRouter(
     prefix='/api/bank-returns',
@@ -64,6 +68,58 @@ async def create_or_update_bank_return(
         return {'data': None, 'error': str(e)}
 
 
+@router.post('/bulk', response_model=BankReturnBulkResponse)
+def bulk_create_or_update_bank_returns(
+    items: List[Dict[str, Any]] = Body(..., description="Retornos a gravar"),
+    db: Session = Depends(get_db),
+):
+    """
+    Cria ou atualiza vários retornos bancários em uma única transação.
+
+    Cada item tem client_id, month, year e os campos de retorno bancário
+    (payer_name, due_date, payment_date, title_amount, charged_amount,
+    variation_amount). Nos retornos existentes, apenas os campos informados
+    são alterados. Retorna o resultado de cada item:
+    - created / updated: retorno gravado
+    - replaced: item substituído por outro do mesmo cliente/mês no lote
+    - invalid: item com campos inválidos ou cliente inexistente (não impede
+      a gravação dos demais)
+    """
+    try:
+        result = BankReturnService.bulk_create_or_update_bank_returns(
+            db, items
+        )
+        return {'data': result, 'error': None}
+    except Exception as e:
+        return {'data': None, 'error': str(e)}
+
+
+@router.post('/import', response_model=BankReturnImportResponse)
+def import_bank_return_file(
+    file: UploadFile = File(..., description="Arquivo de retorno CNAB 240 ou 400"),
+    db: Session = Depends(get_db),
+):
+    """
+    Importa um arquivo de retorno bancário (CNAB 240 ou 400).
+
+    O arquivo enviado é mantido em disco (arquivos grandes não ficam em
+    memória) e lido linha a linha. Os títulos são gravados em lotes, com um
+    resultado por título:
+    - imported: retorno criado/atualizado
+    - replaced: título substituído por outro do mesmo cliente/mês no arquivo
+    - unmatched: cliente não encontrado pelo seu número nem pelo pagador
+    - invalid: linha que não pôde ser lida ou gravada
+    """
+    try:
+        lines = io.TextIOWrapper(file.file, encoding='latin-1', newline='')
+        result = CnabImportService.import_file(db, lines)
+        return {'data': result, 'error': None}
+    except Exception as e:
+        return {'data': None, 'error': str(e)}
+    finally:
+        file.file.close()
+
+
 @router.get('/owner/{owner_id}', response_model=BankReturnResponse)
 async def get_owner_bank_returns(
     owner_id: int = Path(..., title="ID do proprietário", gt=0),
@@ -117,12 +173,11 @@ async def get_monthly_returns(
         # Lista para armazenar os dados de retorno
         return_items = []
         
-        # Variáveis para o resumo
-        summary = {
+        # Variáveis para o resumo (somadas em centavos, sem erro de arredondamento)
+        totals = {
             "total_title_amount": 0,
             "total_charged_amount": 0,
-            "total_variation_amount": 0,
-            "total_returns": 0
+            "total_variation_amount": 0
         }
 
         # Processar cada retorno
@@ -149,10 +204,12 @@ async def get_monthly_returns(
             return_items.append(return_item)
 
             # Atualizar resumo
-            summary["total_title_amount"] += (bank_return.title_amount or 0)
-            summary["total_charged_amount"] += (bank_return.charged_amount or 0)
-            summary["total_variation_amount"] += (bank_return.variation_amount or 0)
-            summary["total_returns"] += 1
+            totals["total_title_amount"] += to_cents(bank_return.title_amount or 0)
+            totals["total_charged_amount"] += to_cents(bank_return.charged_amount or 0)
+            totals["total_variation_amount"] += to_cents(bank_return.variation_amount or 0)
+
+        summary = {key: from_cents(cents) for key, cents in totals.items()}
+        summary["total_returns"] = len(return_items)
 
         return {
             "data": return_items,
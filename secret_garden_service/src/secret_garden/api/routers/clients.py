@@ -10,7 +10,11 @@ from dateutil.relativedelta import relativedelta
 from src.secret_garden.database.config import get_db
 from src.secret_garden.database.models import Client
 from src.secret_garden.models.client import (
-    AdjustmentResponse, ClientCreate, ClientResponse, ClientUpdate
+    AdjustmentResponse, ClientCreate, ClientNameMatchRequest, ClientResponse,
+    ClientUpdate
+)
+from src.secret_garden.services.client_name_index_service import (
+    ClientNameIndexService
 )
 from src.secret_garden.services.client_service import ClientService
 
@@ -91,6 +95,28 @@ async def list_client_names(
         return {"data": None, "error": str(e)}
 
 
+@router.post('/match-names', response_model=ClientResponse)
+async def match_client_names(
+    request: ClientNameMatchRequest = Body(...),
+    db: Session = Depends(get_db),
+):
+    """
+    Busca os clientes ativos com nome parecido com cada um dos nomes
+    informados (ex: nomes de pagadores de um retorno bancário).
+
+    A comparação ignora acentos, maiúsculas e pontuação e usa a similaridade
+    de trigramas (score de 0 a 1). Para cada nome, retorna os clientes do
+    mais para o menos parecido.
+    """
+    try:
+        matches = ClientNameIndexService.match_many(
+            db, request.names, request.limit, request.min_score
+        )
+        return {"data": matches, "error": None}
+    except Exception as e:
+        return {"data": None, "error": str(e)}
+
+
 @router.get('/', response_model=ClientResponse, status_code=status.HTTP_200_OK)
 async def list_clients(
     is_active: Optional[bool] = Query(
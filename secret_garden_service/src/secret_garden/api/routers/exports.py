@@ -0,0 +1,96 @@
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+
+from src.secret_garden.database.config import SessionLocal
+from src.secret_garden.services.export_service import (EXPORT_DATASETS,
+                                                       ExportService)
+
+router = APIRouter(
+    prefix='/api/exports',
+    tags=['exports'],
+    responses={404: {'description': 'Not found'}},
+)
+
+# Tipo de conteúdo de cada formato de exportação
+MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _stream_export(query, export_format: str) -> Iterator[str]:
+    """
+    Gera o conteúdo da exportação.
+
+    Usa uma sessão própria, pois o corpo da resposta é gerado depois que o
+    endpoint retorna.
+    """
+    db = SessionLocal()
+    try:
+        if export_format == 'csv':
+            yield from ExportService.iter_csv(db, query)
+        else:
+            yield from ExportService.iter_ndjson(db, query)
+    finally:
+        db.close()
+
+
+@router.get('/{dataset}')
+async def export_dataset(
+    dataset: str = Path(
+        ...,
+        title='Conjunto de dados',
+        description=(
+            'transfers, monthly-calculations, bank-returns ou retornos'
+        ),
+    ),
+    format: str = Query('csv', pattern='^(csv|ndjson)$'),
+    client_id: Optional[int] = Query(None, gt=0),
+    owner_id: Optional[int] = Query(None, gt=0),
+    start_month: Optional[int] = Query(None, ge=1, le=12),
+    start_year: Optional[int] = Query(None, ge=2000, le=2100),
+    end_month: Optional[int] = Query(None, ge=1, le=12),
+    end_year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """
+    Exporta um conjunto de dados em CSV ou NDJSON, em streaming.
+
+    As linhas são lidas do banco em lotes e enviadas à medida que são lidas,
+    então a memória usada não depende do tamanho da exportação.
+
+    Conjuntos de dados:
+    - transfers: itens de repasse (um por cálculo mensal de cliente ativo)
+    - monthly-calculations: cálculos mensais
+    - bank-returns: retornos bancários de clientes ativos
+    - retornos: retornos de pagamento
+
+    O período (start_month/start_year a end_month/end_year) é opcional e
+    inclusivo.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=404,
+            detail=f'Conjunto de dados desconhecido: {dataset}',
+        )
+
+    query = ExportService.build_query(
+        dataset,
+        client_id=client_id,
+        owner_id=owner_id,
+        start_month=start_month,
+        start_year=start_year,
+        end_month=end_month,
+        end_year=end_year,
+    )
+
+    return StreamingResponse(
+        _stream_export(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="{dataset}.{format}"'
+            )
+        },
+    )
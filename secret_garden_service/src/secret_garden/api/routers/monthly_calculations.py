@@ -1,13 +1,18 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from src.secret_garden.database.config import get_db
 from src.secret_garden.database.models import MonthlyCalculation, Client
 from src.secret_garden.models.monthly_calculation import (
-    MonthlyCalculationResponse, MonthlyCalculationSummary)
+    MonthlyCalculationJob, MonthlyCalculationPreview,
+    MonthlyCalculationRangeSummary, MonthlyCalculationResponse,
+    MonthlyCalculationSummary)
+from src.secret_garden.services.calculation_job_service import \
+    CalculationJobService
 from src.secret_garden.services.monthly_calculation_service import \
     MonthlyCalculationService
 
@@ -42,6 +47,29 @@ def calculation_to_dict(calculation: Any) -> Dict[str, Any]:
 async def calculate_monthly_values(
     month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None, ge=2000, le=2100),
+    bulk: bool = Query(
+        True,
+        description=(
+            'Calcula em lote (uma consulta e uma transação). '
+            'Use false para o cálculo cliente a cliente.'
+        ),
+    ),
+    workers: Optional[int] = Query(
+        None,
+        ge=1,
+        le=64,
+        description=(
+            'Calcula em paralelo, com os clientes particionados por '
+            'proprietário entre este número de workers'
+        ),
+    ),
+    processes: bool = Query(
+        False, description='Usa processos em vez de threads no modo paralelo'
+    ),
+    force: bool = Query(
+        False,
+        description='Recalcula também os clientes cujos valores não mudaram',
+    ),
     db: Session = Depends(get_db),
 ):
     """
@@ -49,9 +77,34 @@ async def calculate_monthly_values(
 
     Se mês e ano não forem fornecidos, usa o mês e ano atuais.
 
+    Nos modos em lote e paralelo, clientes cujos valores de entrada não
+    mudaram desde o último cálculo são ignorados e contados em 'skipped'.
+
     Retorna um resumo do processamento com contagem de sucessos e falhas.
     """
     try:
+        # Os cálculos em lote e paralelo bloqueiam até o fim: rodam fora do
+        # event loop para não travar as demais requisições
+        if workers:
+            return await run_in_threadpool(
+                MonthlyCalculationService.calculate_for_all_clients_parallel,
+                db,
+                month,
+                year,
+                max_workers=workers,
+                use_processes=processes,
+                force=force,
+            )
+
+        if bulk:
+            return await run_in_threadpool(
+                MonthlyCalculationService.calculate_for_all_clients_bulk,
+                db,
+                month,
+                year,
+                force=force,
+            )
+
         result = await MonthlyCalculationService.calculate_for_all_clients(
             db, month, year
         )
@@ -63,6 +116,114 @@ async def calculate_monthly_values(
         )
 
 
+@router.post('/calculate/range', response_model=MonthlyCalculationRangeSummary)
+def calculate_monthly_values_for_range(
+    start_month: int = Query(..., ge=1, le=12),
+    start_year: int = Query(..., ge=2000, le=2100),
+    end_month: int = Query(..., ge=1, le=12),
+    end_year: int = Query(..., ge=2000, le=2100),
+    client_ids: Optional[List[int]] = Query(
+        None, description='Calcular apenas estes clientes'
+    ),
+    owner_ids: Optional[List[int]] = Query(
+        None, description='Calcular apenas os clientes destes proprietários'
+    ),
+    force: bool = Query(
+        False,
+        description='Recalcula também os meses cujos valores não mudaram',
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Calcula os valores financeiros de todos os meses de um período
+    (do mês/ano inicial ao mês/ano final, inclusive).
+
+    Pode ser limitado a uma lista de clientes ou de proprietários. Meses
+    anteriores à data de início do contrato do cliente são ignorados.
+
+    Retorna os totais do processamento e as contagens de cada mês.
+    """
+    try:
+        return MonthlyCalculationService.calculate_for_period_range(
+            db,
+            start_month,
+            start_year,
+            end_month,
+            end_year,
+            client_ids=client_ids,
+            owner_ids=owner_ids,
+            force=force,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f'Erro ao calcular valores mensais: {str(e)}',
+        )
+
+
+@router.get('/preview', response_model=MonthlyCalculationPreview)
+def preview_monthly_values(
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    db: Session = Depends(get_db),
+):
+    """
+    Simula o cálculo mensal de todos os clientes ativos sem gravar nada.
+
+    Retorna, para cada cliente, apenas os campos cujo valor mudaria em
+    relação ao cálculo gravado, além das diferenças agregadas por campo.
+
+    Se mês e ano não forem fornecidos, usa o mês e ano atuais.
+    """
+    try:
+        return MonthlyCalculationService.preview_calculations(db, month, year)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f'Erro ao simular valores mensais: {str(e)}',
+        )
+
+
+@router.post(
+    '/jobs', response_model=MonthlyCalculationJob, status_code=202
+)
+async def submit_calculation_job(
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    force: bool = Query(
+        False,
+        description='Recalcula também os clientes cujos valores não mudaram',
+    ),
+):
+    """
+    Agenda o cálculo mensal de todos os clientes ativos em segundo plano.
+
+    Retorna imediatamente o job criado. Se já houver um job em andamento
+    para o mesmo mês/ano, retorna esse job em vez de iniciar outro.
+
+    Se mês e ano não forem fornecidos, usa o mês e ano atuais.
+    """
+    return CalculationJobService.submit(month, year, force=force)
+
+
+@router.get('/jobs/{job_id}', response_model=MonthlyCalculationJob)
+async def get_calculation_job(
+    job_id: str = Path(..., title="ID do job"),
+):
+    """
+    Retorna a situação de um job de cálculo: quantidade de clientes
+    processados, sucessos, falhas e tempo decorrido.
+    """
+    job = CalculationJobService.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404, detail=f'Job {job_id} não encontrado'
+        )
+    return job
+
+
 @router.get('/', response_model=MonthlyCalculationResponse)
 async def get_monthly_calculations(
     client_id: Optional[int] = None,
@@ -1,10 +1,15 @@
-from typing import Optional
+import json
+from datetime import datetime
+from typing import Iterator, Optional
 
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from src.secret_garden.database.config import get_db
-from src.secret_garden.models.monthly_calculation import MonthlyTransferResponse
+from src.secret_garden.database.config import SessionLocal, get_db
+from src.secret_garden.models.monthly_calculation import (
+    MonthlyTransferHistoryResponse, MonthlyTransferResponse)
 from src.secret_garden.services.monthly_transfer_service import MonthlyTransferService
 
 router = APIRouter(
@@ -34,4 +39,85 @@ async def get_owner_transfers(
     result = MonthlyTransferService.get_owner_transfers(
         db, owner_id, month, year
     )
-    return result 
\ No newline at end of file
+    return result 
+
+
+@router.get(
+    '/owner/{owner_id}/history', response_model=MonthlyTransferHistoryResponse
+)
+async def get_owner_transfer_history(
+    owner_id: int = Path(..., title="ID do proprietário", gt=0),
+    start_month: Optional[int] = Query(None, ge=1, le=12, description="Mês inicial (1-12)"),
+    start_year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano inicial"),
+    end_month: Optional[int] = Query(None, ge=1, le=12, description="Mês final (1-12)"),
+    end_year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano final"),
+    db: Session = Depends(get_db),
+):
+    """
+    Retorna o histórico de repasses de um proprietário em um período.
+
+    Para cada mês com repasse:
+    - Totais do mês e lista de imóveis (mesmos campos de /owner/{owner_id})
+    - Totais acumulados desde o início do período
+    - Totais acumulados no ano
+
+    Se o período final não for fornecido, usa o mês atual. Se o período
+    inicial não for fornecido, usa os 12 meses que terminam no período final.
+    Nos totais do histórico, calculated_properties conta os imóveis com
+    cálculo no mês (ou no período, no resumo). Já o total_properties de
+    /owner/{owner_id} conta todos os imóveis ativos do proprietário.
+    """
+    now = datetime.now()
+    end_month = end_month or now.month
+    end_year = end_year or now.year
+
+    if not start_month or not start_year:
+        start_index = end_year * 12 + end_month - 1 - 11
+        start_year, start_month = divmod(start_index, 12)
+        start_month += 1
+
+    try:
+        return MonthlyTransferService.get_owner_transfer_history(
+            db, owner_id, start_month, start_year, end_month, end_year
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _stream_owner_transfers(
+    month: Optional[int], year: Optional[int]
+) -> Iterator[str]:
+    """
+    Gera os repasses de todos os proprietários em NDJSON (um por linha).
+
+    Usa uma sessão própria, pois o corpo da resposta é gerado depois que o
+    endpoint retorna.
+    """
+    db = SessionLocal()
+    try:
+        for statement in MonthlyTransferService.iter_all_owner_transfers(
+            db, month, year
+        ):
+            yield json.dumps(jsonable_encoder(statement)) + "\n"
+    finally:
+        db.close()
+
+
+@router.get('/owners')
+async def get_all_owner_transfers(
+    month: Optional[int] = Query(None, ge=1, le=12, description="Mês (1-12)"),
+    year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano"),
+):
+    """
+    Retorna os repasses mensais de todos os proprietários.
+
+    A resposta é enviada em streaming no formato NDJSON, com uma linha por
+    proprietário no mesmo formato de /owner/{owner_id} (data, summary e
+    metadata, com o nome do proprietário nos metadados).
+
+    Se mês e ano não forem fornecidos, usa o mês e ano atuais.
+    """
+    return StreamingResponse(
+        _stream_owner_transfers(month, year),
+        media_type="application/x-ndjson",
+    )
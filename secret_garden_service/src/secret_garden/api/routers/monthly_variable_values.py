@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query, Path, Body
@@ -8,7 +8,8 @@ from src.secret_garden.database.config import get_db
 from src.secret_garden.models.monthly_variable_values import (
     MonthlyVariableValuesCreate,
     MonthlyVariableValuesUpdate,
-    MonthlyVariableValuesResponse
+    MonthlyVariableValuesResponse,
+    MonthlyVariableValuesBulkResponse
 )
 from src.secret_garden.services.monthly_variable_values_service import \
     MonthlyVariableValuesService
@@ -113,6 +114,38 @@ async def create_monthly_values(
         return {'data': None, 'error': str(e)}
 
 
+@router.post('/bulk', response_model=MonthlyVariableValuesBulkResponse)
+def bulk_upsert_monthly_values(
+    items: List[Dict[str, Any]] = Body(..., description="Linhas da planilha do mês"),
+    recalculate: bool = Query(
+        False, description="Recalcular os cálculos mensais dos clientes gravados"
+    ),
+    db: Session = Depends(get_db),
+):
+    """
+    Cria ou atualiza os valores variáveis mensais de vários clientes (a
+    planilha do mês) em uma única transação.
+    
+    Cada linha tem os campos de MonthlyVariableValuesCreate. Nos registros
+    existentes, todos os valores do mês são substituídos. Retorna o
+    resultado de cada linha:
+    - created / updated: valores gravados
+    - replaced: linha substituída por outra do mesmo cliente/mês no lote
+    - invalid: linha com campos inválidos ou cliente inexistente (não impede
+      a gravação das demais)
+    
+    Com recalculate, os cálculos mensais dos clientes gravados são refeitos
+    após a gravação.
+    """
+    try:
+        result = MonthlyVariableValuesService.bulk_upsert_monthly_values(
+            db, items, recalculate=recalculate
+        )
+        return {'data': result, 'error': None}
+    except Exception as e:
+        return {'data': None, 'error': str(e)}
+
+
 @router.put('/{client_id}/{month}/{year}', response_model=MonthlyVariableValuesResponse)
 async def update_monthly_values(
     client_id: int = Path(..., title="ID do cliente", gt=0),
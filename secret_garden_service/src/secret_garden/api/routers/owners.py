@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Path, Query
 from sqlalchemy.orm import Session
 
 from src.secret_garden.database.config import get_db
 from src.secret_garden.database.models import Owner
 from src.secret_garden.models.owner import (OwnerCreate, OwnerResponse,
                                             OwnerUpdate)
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
 
 router = APIRouter(
     prefix='/api/owners',
@@ -57,6 +59,29 @@ async def get_all_owners(db: Session = Depends(get_db)):
         return {'data': None, 'error': str(e)}
 
 
+@router.get('/summary', response_model=OwnerResponse)
+async def get_owners_month_summary(
+    month: Optional[int] = Query(None, ge=1, le=12, description='Mês (1-12)'),
+    year: Optional[int] = Query(None, ge=2000, le=2100, description='Ano'),
+    db: Session = Depends(get_db),
+):
+    """
+    Retorna os totais de repasse e de retornos bancários de todos os
+    proprietários no mês (uma linha materializada por proprietário).
+
+    Se mês e ano não forem fornecidos, usa o mês e ano atuais.
+    """
+    try:
+        now = datetime.now()
+        summaries = OwnerMonthSummaryService.list_month_summaries(
+            db, month or now.month, year or now.year
+        )
+        return {'data': summaries, 'error': None}
+    except Exception as e:
+        db.rollback()
+        return {'data': None, 'error': str(e)}
+
+
 @router.get('/{owner_id}', response_model=OwnerResponse)
 async def get_owner(
     owner_id: int = Path(..., title='ID do proprietário', gt=0),
@@ -180,3 +205,36 @@ async def get_owner_clients(
         return {'data': clients, 'error': None}
     except Exception as e:
         return {'data': None, 'error': str(e)}
+
+
+@router.get('/{owner_id}/summary', response_model=OwnerResponse)
+async def get_owner_month_summary(
+    owner_id: int = Path(..., title='ID do proprietário', gt=0),
+    month: Optional[int] = Query(None, ge=1, le=12, description='Mês (1-12)'),
+    year: Optional[int] = Query(None, ge=2000, le=2100, description='Ano'),
+    db: Session = Depends(get_db),
+):
+    """
+    Retorna os totais de repasse (mesmos campos do resumo de
+    /api/monthly-transfers/owner/{owner_id}) e de retornos bancários
+    (mesmos campos do resumo de /api/bank-returns/owner/{owner_id}) de um
+    proprietário no mês.
+
+    Se mês e ano não forem fornecidos, usa o mês e ano atuais.
+    """
+    try:
+        owner = db.query(Owner).filter(Owner.id == owner_id).first()
+        if owner is None:
+            return {
+                'data': None,
+                'error': f'Proprietário com ID {owner_id} não encontrado',
+            }
+
+        now = datetime.now()
+        summary = OwnerMonthSummaryService.get_summary(
+            db, owner_id, month or now.month, year or now.year
+        )
+        return {'data': summary, 'error': None}
+    except Exception as e:
+        db.rollback()
+        return {'data': None, 'error': str(e)}
@@ -0,0 +1,73 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.orm import Session
+
+from src.secret_garden.database.config import get_db
+from src.secret_garden.models.reconciliation import (
+    ReconciliationResponse, ReconciliationRunResponse
+)
+from src.secret_garden.services.reconciliation_service import (
+    RECONCILIATION_STATUSES, ReconciliationService
+)
+
+router = APIRouter(
+    prefix='/api/reconciliation',
+    tags=['reconciliation'],
+    responses={404: {'description': 'Not found'}},
+)
+
+
+@router.post('/{month}/{year}', response_model=ReconciliationRunResponse)
+async def run_reconciliation(
+    month: int = Path(..., title="Mês", ge=1, le=12),
+    year: int = Path(..., title="Ano", ge=2000, le=2100),
+    tolerance: float = Query(0.0, ge=0, description="Diferença aceita (em reais)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Concilia o valor cobrado pelo banco (retornos bancários) com o aluguel
+    calculado de cada cliente ativo no mês e grava os resultados.
+
+    Cada cliente é classificado como:
+    - matched: valor cobrado igual ao calculado (dentro da tolerância)
+    - underpaid: valor cobrado menor que o calculado
+    - overpaid: valor cobrado maior que o calculado
+    - missing_return: cálculo sem retorno bancário
+    - missing_calculation: retorno bancário sem cálculo
+    """
+    try:
+        result = ReconciliationService.reconcile(db, month, year, tolerance)
+        return {'data': result, 'error': None}
+    except Exception as e:
+        return {'data': None, 'error': str(e)}
+
+
+@router.get('/{month}/{year}', response_model=ReconciliationResponse)
+async def get_reconciliation_dashboard(
+    month: int = Path(..., title="Mês", ge=1, le=12),
+    year: int = Path(..., title="Ano", ge=2000, le=2100),
+    status: Optional[str] = Query(
+        None,
+        description="Filtrar por situação (" + ", ".join(RECONCILIATION_STATUSES) + ")",
+    ),
+    owner_id: Optional[int] = Query(None, gt=0, description="Filtrar por proprietário"),
+    db: Session = Depends(get_db),
+):
+    """
+    Retorna o painel de conciliação do mês: os clientes conciliados e o
+    resumo por situação, lidos dos resultados gravados.
+
+    Se o mês ainda não foi conciliado, retorna os itens vazios e
+    reconciled_at nulo: a conciliação só é feita pelo POST. Para refletir
+    novos retornos ou cálculos, execute a conciliação novamente.
+    """
+    if status and status not in RECONCILIATION_STATUSES:
+        return {'data': None, 'error': f'Situação inválida: {status}'}
+
+    try:
+        return ReconciliationService.get_dashboard(
+            db, month, year, status, owner_id
+        )
+    except Exception as e:
+        return {'data': None, 'error': str(e)}
@@ -6,7 +6,8 @@ from sqlalchemy.orm import Session
 
 from src.secret_garden.database.config import get_db
 from src.secret_garden.models.retorno_pagamento import (
-    RetornoPagamentoResponse, ProcessamentoRetornoRequest
+    RetornoPagamentoResponse, ProcessamentoRetornoRequest,
+    ProcessamentoRetornoLoteItem
 )
 from src.secret_garden.services.retorno_service import RetornoService
 
@@ -62,19 +63,45 @@ async def processar_retorno(
         return {"data": None, "error": str(e)}
 
 
+@router.post("/processar-lote", response_model=RetornoPagamentoResponse)
+def processar_retornos_lote(
+    pagamentos: List[ProcessamentoRetornoLoteItem] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Processa os retornos de pagamento de vários clientes de uma vez.
+    
+    Os retornos válidos são gravados em uma única transação; cada pagamento
+    recebe seu resultado (processado ou o motivo da recusa).
+    """
+    try:
+        result = RetornoService.processar_retornos_lote(
+            db, [pagamento.model_dump() for pagamento in pagamentos]
+        )
+        return {"data": result, "error": None}
+    except Exception as e:
+        return {"data": None, "error": str(e)}
+
+
 @router.get("/", response_model=RetornoPagamentoResponse)
 async def listar_retornos(
     client_id: Optional[int] = Query(None, description="Filtrar por cliente"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Mês (1-12)"),
     year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Retornos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor da página (next_cursor da anterior)"),
     db: Session = Depends(get_db)
 ):
     """
     Lista todos os retornos de pagamento com filtros opcionais.
+    
+    Com limit, a lista é paginada: next_cursor (quando há mais retornos)
+    deve ser enviado em cursor para obter a próxima página.
     """
     try:
-        retornos = RetornoService.get_retornos(
-            db, client_id=client_id, month=month, year=year
+        retornos, next_cursor = RetornoService.get_retornos(
+            db, client_id=client_id, month=month, year=year,
+            limit=limit, cursor=cursor
         )
         
         if not retornos:
@@ -83,7 +110,7 @@ async def listar_retornos(
         # Converter objetos SQLAlchemy em dicionários
         retornos_dict = [RetornoService.retorno_to_dict(r) for r in retornos]
         
-        return {"data": retornos_dict, "error": None}
+        return {"data": retornos_dict, "error": None, "next_cursor": next_cursor}
     except Exception as e:
         return {"data": None, "error": str(e)}
 
@@ -93,14 +120,19 @@ async def listar_retornos_por_proprietario(
     owner_id: int = Path(..., description="ID do proprietário"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Mês (1-12)"),
     year: Optional[int] = Query(None, ge=2000, le=2100, description="Ano"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Retornos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor da página (next_cursor da anterior)"),
     db: Session = Depends(get_db)
 ):
     """
     Lista retornos de pagamento de todos os clientes de um proprietário.
+    
+    Com limit, a lista é paginada como em GET /api/retornos/.
     """
     try:
-        retornos = RetornoService.get_retornos_by_owner(
-            db, owner_id=owner_id, month=month, year=year
+        retornos, next_cursor = RetornoService.get_retornos_by_owner(
+            db, owner_id=owner_id, month=month, year=year,
+            limit=limit, cursor=cursor
         )
         
         if not retornos:
@@ -109,7 +141,7 @@ async def listar_retornos_por_proprietario(
         # Converter objetos SQLAlchemy em dicionários
         retornos_dict = [RetornoService.retorno_to_dict(r) for r in retornos]
         
-        return {"data": retornos_dict, "error": None}
+        return {"data": retornos_dict, "error": None, "next_cursor": next_cursor}
     except Exception as e:
         return {"data": None, "error": str(e)}
 
@@ -5,6 +5,8 @@ from tabulate import tabulate
 
 from src.secret_garden.database.config import SessionLocal
 from src.secret_garden.database.models import Client
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameIndexService
 
 
 def list_clients(args):
@@ -99,6 +101,8 @@ def add_client(args):
             new_client.notes = args.notes
 
         db.add(new_client)
+        db.flush()
+        ClientNameIndexService.refresh_clients(db, [new_client.id])
         db.commit()
         db.refresh(new_client)
 
@@ -126,6 +130,7 @@ def delete_client(args):
             print(f'Cliente com ID {args.id} marcado como inativo.')
         elif args.force or not args.soft:
             # Hard delete (remove do banco)
+            ClientNameIndexService.remove_clients(db, [client.id])
             db.delete(client)
             db.commit()
             print(
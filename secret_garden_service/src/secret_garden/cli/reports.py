@@ -0,0 +1,127 @@
+import argparse
+import json
+import sys
+
+from fastapi.encoders import jsonable_encoder
+
+from src.secret_garden.database.config import SessionLocal
+from src.secret_garden.services.monthly_transfer_service import \
+    MonthlyTransferService
+from src.secret_garden.services.statement_render_service import \
+    StatementRenderService
+
+
+def export_transfers(args):
+    """Exporta os repasses de todos os proprietários em NDJSON"""
+    db = SessionLocal()
+    output = (
+        open(args.output, 'w', encoding='utf-8')
+        if args.output != '-'
+        else sys.stdout
+    )
+    try:
+        total_owners = 0
+        for statement in MonthlyTransferService.iter_all_owner_transfers(
+            db, args.month, args.year
+        ):
+            output.write(json.dumps(jsonable_encoder(statement)) + '\n')
+            total_owners += 1
+
+        if output is not sys.stdout:
+            print(f'Repasses de {total_owners} proprietários gravados em '
+                  f'{args.output}')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        db.close()
+
+
+def render_statements(args):
+    """Gera os extratos de repasse de todos os proprietários"""
+    db = SessionLocal()
+    try:
+        result = StatementRenderService.render_all(
+            db,
+            args.output_dir,
+            month=args.month,
+            year=args.year,
+            formats=args.format,
+            max_workers=args.workers,
+        )
+    except ValueError as e:
+        print(f'Erro: {e}')
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(
+        f"{result['total_statements']} extratos gerados "
+        f"({result['files']} arquivos) em {result['output_dir']}"
+    )
+    for failure in result['failed']:
+        print(
+            f"Falha no proprietário {failure['owner_id']}: {failure['error']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Ferramenta de linha de comando para gerar relatórios'
+    )
+    subparsers = parser.add_subparsers(
+        dest='command', help='Comandos disponíveis'
+    )
+
+    # Comando para exportar os repasses de todos os proprietários
+    transfers_parser = subparsers.add_parser(
+        'transfers', help='Exportar os repasses de todos os proprietários'
+    )
+    transfers_parser.add_argument(
+        '--month', type=int, help='Mês (1-12). Padrão: mês atual'
+    )
+    transfers_parser.add_argument(
+        '--year', type=int, help='Ano. Padrão: ano atual'
+    )
+    transfers_parser.add_argument(
+        '--output',
+        default='-',
+        help='Arquivo de saída (NDJSON). Padrão: saída padrão',
+    )
+
+    # Comando para gerar os extratos de repasse em HTML/PDF
+    statements_parser = subparsers.add_parser(
+        'statements', help='Gerar os extratos de repasse (HTML/PDF)'
+    )
+    statements_parser.add_argument(
+        '--month', type=int, help='Mês (1-12). Padrão: mês atual'
+    )
+    statements_parser.add_argument(
+        '--year', type=int, help='Ano. Padrão: ano atual'
+    )
+    statements_parser.add_argument(
+        '--output-dir', default='extratos', help='Diretório de saída'
+    )
+    statements_parser.add_argument(
+        '--format',
+        action='append',
+        choices=['html', 'pdf'],
+        help='Formato de saída (pode ser repetido). Padrão: html',
+    )
+    statements_parser.add_argument(
+        '--workers', type=int, help='Número de processos. Padrão: CPUs'
+    )
+
+    args = parser.parse_args()
+
+    # Executar o comando apropriado
+    if args.command == 'transfers':
+        export_transfers(args)
+    elif args.command == 'statements':
+        args.format = args.format or ['html']
+        render_statements(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 import argparse
 
 from src.secret_garden.cli.db_viewer import main as db_viewer_main
+from src.secret_garden.cli.reports import main as reports_main
 from src.secret_garden.cli.sqlite_viewer import main as sqlite_viewer_main
 
 
@@ -23,6 +24,10 @@ def main():
     )
     db_parser.set_defaults(func=sqlite_viewer_main)
 
+    # Comando para gerar relatórios
+    report_parser = subparsers.add_parser('report', help='Gerar relatórios')
+    report_parser.set_defaults(func=reports_main)
+
     args = parser.parse_args()
 
     if hasattr(args, 'func'):
@@ -0,0 +1,37 @@
+from typing import Optional, Union
+
+Number = Union[int, float]
+
+
+def to_cents(value: Optional[Number]) -> Optional[int]:
+    """
+    Converte um valor em reais para centavos inteiros.
+
+    O valor é arredondado para 2 casas com round() antes da conversão, para
+    que erros de representação do float (ex: 0.29 * 100 = 28.999...) não
+    percam um centavo.
+
+    Args:
+        value: Valor em reais (ou None)
+
+    Returns:
+        Valor em centavos ou None
+    """
+    if value is None:
+        return None
+    return int(round(round(value, 2) * 100))
+
+
+def from_cents(cents: Optional[int]) -> Optional[float]:
+    """
+    Converte um valor em centavos inteiros para reais.
+
+    Args:
+        cents: Valor em centavos (ou None)
+
+    Returns:
+        Valor em reais ou None
+    """
+    if cents is None:
+        return None
+    return cents / 100
@@ -0,0 +1,81 @@
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Normaliza um nome para comparação: sem acentos, em minúsculas, apenas
+    letras, dígitos e espaços simples.
+
+    Ex: ' JOSÉ  da Silva-Santos' -> 'jose da silva santos'
+
+    Args:
+        name: Nome (ou None)
+
+    Returns:
+        Nome normalizado ('' para nomes vazios)
+    """
+    if not name:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', name)
+    folded = ''.join(
+        char if char.isalnum() else ' '
+        for char in decomposed
+        if not unicodedata.combining(char)
+    )
+    return ' '.join(folded.casefold().split())
+
+
+def name_trigrams(normalized_name: str) -> Set[str]:
+    """
+    Retorna os trigramas de um nome normalizado.
+
+    Como no pg_trgm, cada palavra recebe dois espaços no início e um no fim,
+    de modo que palavras curtas e o início das palavras também geram
+    trigramas (ex: 'ana' -> '  a', ' an', 'ana', 'na ').
+
+    Args:
+        normalized_name: Nome já normalizado (ver normalize_name)
+
+    Returns:
+        Conjunto de trigramas
+    """
+    trigrams = set()
+    for word in normalized_name.split():
+        padded = f'  {word} '
+        trigrams.update(
+            padded[index:index + 3] for index in range(len(padded) - 2)
+        )
+    return trigrams
+
+
+def trigram_similarity(first: Set[str], second: Set[str]) -> float:
+    """
+    Similaridade entre dois conjuntos de trigramas (trigramas em comum
+    divididos pelo total de trigramas distintos), entre 0 e 1.
+    """
+    if not first or not second:
+        return 0.0
+    shared = len(first & second)
+    return shared / (len(first) + len(second) - shared)
+
+
+def client_name_index_rows(
+    clients: Iterable[Tuple[int, str]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Monta as linhas de client_name_index e client_name_trigrams dos
+    clientes informados ((client_id, nome))
+    """
+    name_rows = []
+    trigram_rows = []
+    for client_id, name in clients:
+        normalized_name = normalize_name(name)
+        name_rows.append(
+            {'client_id': client_id, 'normalized_name': normalized_name}
+        )
+        trigram_rows.extend(
+            {'trigram': trigram, 'client_id': client_id}
+            for trigram in name_trigrams(normalized_name)
+        )
+    return name_rows, trigram_rows
@@ -2,12 +2,18 @@ from src.secret_garden.database.config import Base, engine
 # Importação necessária para que o SQLAlchemy reconheça o modelo
 # ao criar as tabelas
 from src.secret_garden.database.models import Client  # noqa
+from src.secret_garden.database.migrations import run_migrations
 from src.secret_garden.database.seed import seed_database
 
 
 def init_db():
     """Inicializa o banco de dados criando todas as tabelas"""
     Base.metadata.create_all(bind=engine)
+
+    # Aplica alterações em tabelas que já existiam
+    for migration in run_migrations(engine):
+        print(f'Migração aplicada: {migration}')
+
     print('Banco de dados inicializado com sucesso!')
 
     # Adiciona dados de exemplo
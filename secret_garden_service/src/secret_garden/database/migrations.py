@@ -0,0 +1,305 @@
+"""
+Migrações incrementais do esquema do banco de dados.
+
+O create_all do SQLAlchemy cria apenas as tabelas que ainda não existem.
+As funções deste módulo aplicam as alterações em tabelas já existentes
+(novas colunas, índices e conversões de dados). Cada migração verifica o
+estado atual do banco antes de agir, então run_migrations pode ser executado
+quantas vezes for necessário.
+"""
+
+from sqlalchemy import Integer, insert, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from src.secret_garden.core.money import to_cents
+from src.secret_garden.core.names import client_name_index_rows
+from src.secret_garden.database import models  # noqa
+from src.secret_garden.database.config import Base
+from src.secret_garden.database.types import Money
+
+
+def _column_names(conn: Connection, table_name: str) -> set:
+    """Retorna os nomes das colunas de uma tabela"""
+    return {
+        column['name'] for column in inspect(conn).get_columns(table_name)
+    }
+
+
+def add_monthly_calculation_fingerprint(conn: Connection) -> bool:
+    """Adiciona a coluna input_fingerprint em monthly_calculations"""
+    if 'input_fingerprint' in _column_names(conn, 'monthly_calculations'):
+        return False
+
+    conn.execute(
+        text(
+            'ALTER TABLE monthly_calculations '
+            'ADD COLUMN input_fingerprint VARCHAR(32)'
+        )
+    )
+    return True
+
+
+def add_monthly_calculation_unique_key(conn: Connection) -> bool:
+    """
+    Cria o índice único (client_id, month, year) em monthly_calculations,
+    removendo antes os cálculos duplicados (mantém o mais recente de cada
+    cliente/mês/ano)
+    """
+    index_name = 'uix_calculation_client_month_year'
+    existing_indexes = {
+        index['name']
+        for index in inspect(conn).get_indexes('monthly_calculations')
+    }
+    if index_name in existing_indexes:
+        return False
+
+    conn.execute(
+        text(
+            'DELETE FROM monthly_calculations WHERE id NOT IN ('
+            'SELECT MAX(id) FROM monthly_calculations '
+            'GROUP BY client_id, month, year)'
+        )
+    )
+
+    table = Base.metadata.tables['monthly_calculations']
+    for index in table.indexes:
+        if index.name == index_name:
+            index.create(conn)
+    return True
+
+
+def add_retorno_pagamento_unique_key(conn: Connection) -> bool:
+    """
+    Cria o índice único (client_id, month, year) em retornos_pagamentos,
+    removendo antes os retornos duplicados (mantém o primeiro processado de
+    cada cliente/mês/ano, como faz o processamento de retornos)
+    """
+    index_name = 'uix_retorno_client_month_year'
+    existing_indexes = {
+        index['name']
+        for index in inspect(conn).get_indexes('retornos_pagamentos')
+    }
+    if index_name in existing_indexes:
+        return False
+
+    conn.execute(
+        text(
+            'DELETE FROM retornos_pagamentos WHERE id NOT IN ('
+            'SELECT MIN(id) FROM retornos_pagamentos '
+            'GROUP BY client_id, month, year)'
+        )
+    )
+
+    table = Base.metadata.tables['retornos_pagamentos']
+    for index in table.indexes:
+        if index.name == index_name:
+            index.create(conn)
+    return True
+
+
+def add_retorno_pagamento_processed_at_index(conn: Connection) -> bool:
+    """
+    Cria o índice (processed_at, id) em retornos_pagamentos, usado na
+    ordenação e na paginação das listagens de retornos
+    """
+    index_name = 'ix_retorno_processed_at_id'
+    existing_indexes = {
+        index['name']
+        for index in inspect(conn).get_indexes('retornos_pagamentos')
+    }
+    if index_name in existing_indexes:
+        return False
+
+    table = Base.metadata.tables['retornos_pagamentos']
+    for index in table.indexes:
+        if index.name == index_name:
+            index.create(conn)
+    return True
+
+
+def _money_columns_to_convert(conn: Connection, table_name: str) -> list:
+    """
+    Retorna as colunas Money de uma tabela que ainda não são inteiras no
+    banco (bancos criados antes da conversão para centavos)
+    """
+    table = Base.metadata.tables[table_name]
+    db_types = {
+        column['name']: column['type']
+        for column in inspect(conn).get_columns(table_name)
+    }
+    return [
+        column.name for column in table.columns
+        if isinstance(column.type, Money)
+        and column.name in db_types
+        and not isinstance(db_types[column.name], Integer)
+    ]
+
+
+def _money_values_in_cents(
+    conn: Connection, table_name: str, money_columns: list
+) -> list:
+    """
+    Lê as colunas monetárias (em reais) de todas as linhas de uma tabela e
+    as converte para centavos com to_cents, a mesma regra de arredondamento
+    usada pela aplicação ao gravar valores.
+    """
+    table = Base.metadata.tables[table_name]
+    key_columns = [column.name for column in table.primary_key.columns]
+    rows = conn.execute(
+        text(
+            f'SELECT {", ".join(key_columns + money_columns)} '
+            f'FROM {table_name}'
+        )
+    ).mappings()
+    return [
+        {
+            **{f'key_{name}': row[name] for name in key_columns},
+            **{name: to_cents(row[name]) for name in money_columns},
+        }
+        for row in rows
+    ]
+
+
+def _write_money_cents(
+    conn: Connection, table_name: str, money_columns: list, rows: list
+) -> None:
+    """Grava os valores em centavos lidos por _money_values_in_cents"""
+    if not rows:
+        return
+    table = Base.metadata.tables[table_name]
+    key_columns = [column.name for column in table.primary_key.columns]
+    conn.execute(
+        text(
+            f'UPDATE {table_name} SET '
+            + ', '.join(f'{name} = :{name}' for name in money_columns)
+            + ' WHERE '
+            + ' AND '.join(f'{name} = :key_{name}' for name in key_columns)
+        ),
+        rows,
+    )
+
+
+def _rebuild_sqlite_table(conn: Connection, table_name: str) -> None:
+    """
+    Recria uma tabela no SQLite (que não altera o tipo de colunas) com o
+    esquema atual do modelo, copiando os dados existentes.
+    """
+    table = Base.metadata.tables[table_name]
+    temp_name = f'{table_name}__new'
+    old_columns = {
+        column['name'] for column in inspect(conn).get_columns(table_name)
+    }
+    copied = [
+        column.name for column in table.columns
+        if column.name in old_columns
+    ]
+    select_list = ', '.join(copied)
+
+    # Cria a nova tabela sem os índices (os nomes ainda estão em uso)
+    create_sql = str(CreateTable(table).compile(dialect=conn.dialect))
+    create_sql = create_sql.replace(
+        f'CREATE TABLE {table_name}', f'CREATE TABLE {temp_name}', 1
+    )
+    conn.execute(text(create_sql))
+    conn.execute(
+        text(
+            f'INSERT INTO {temp_name} ({", ".join(copied)}) '
+            f'SELECT {select_list} FROM {table_name}'
+        )
+    )
+    conn.execute(text(f'DROP TABLE {table_name}'))
+    conn.execute(text(f'ALTER TABLE {temp_name} RENAME TO {table_name}'))
+
+    for index in table.indexes:
+        index.create(conn)
+
+
+def convert_money_columns_to_cents(conn: Connection) -> bool:
+    """
+    Converte as colunas monetárias (Float em reais) para inteiros em
+    centavos, convertendo os dados existentes.
+
+    Os valores são convertidos com to_cents (e não com ROUND no banco, que
+    arredonda alguns valores de outro modo, ex: 2.675), para que um valor
+    migrado tenha os mesmos centavos que a aplicação gravaria.
+    """
+    converted = False
+    existing_tables = set(inspect(conn).get_table_names())
+
+    for table_name in Base.metadata.tables:
+        if table_name not in existing_tables:
+            continue
+
+        money_columns = _money_columns_to_convert(conn, table_name)
+        if not money_columns:
+            continue
+
+        rows = _money_values_in_cents(conn, table_name, money_columns)
+        if conn.dialect.name == 'sqlite':
+            _rebuild_sqlite_table(conn, table_name)
+        else:
+            for name in money_columns:
+                conn.execute(
+                    text(
+                        f'ALTER TABLE {table_name} ALTER COLUMN {name} '
+                        f'TYPE INTEGER USING CAST(ROUND({name} * 100) '
+                        'AS INTEGER)'
+                    )
+                )
+        _write_money_cents(conn, table_name, money_columns, rows)
+        converted = True
+
+    return converted
+
+
+def build_client_name_index(conn: Connection) -> bool:
+    """
+    Indexa os nomes dos clientes que ainda não estão em client_name_index
+    (clientes existentes antes do índice ou gravados fora do ClientService)
+    """
+    missing = conn.execute(
+        text(
+            'SELECT id, name FROM clients WHERE id NOT IN ('
+            'SELECT client_id FROM client_name_index)'
+        )
+    ).all()
+    if not missing:
+        return False
+
+    name_rows, trigram_rows = client_name_index_rows(missing)
+    conn.execute(insert(models.ClientNameIndex), name_rows)
+    if trigram_rows:
+        conn.execute(insert(models.ClientNameTrigram), trigram_rows)
+    return True
+
+
+# Migrações na ordem em que devem ser aplicadas. A remoção de duplicados
+# precisa vir antes da conversão para centavos, que recria as tabelas no
+# SQLite junto com os índices únicos do modelo.
+MIGRATIONS = [
+    add_monthly_calculation_fingerprint,
+    add_monthly_calculation_unique_key,
+    add_retorno_pagamento_unique_key,
+    add_retorno_pagamento_processed_at_index,
+    convert_money_columns_to_cents,
+    build_client_name_index,
+]
+
+
+def run_migrations(engine: Engine) -> list:
+    """
+    Aplica as migrações pendentes.
+
+    Args:
+        engine: Engine do banco de dados
+
+    Returns:
+        Lista com os nomes das migrações aplicadas
+    """
+    applied = []
+    for migration in MIGRATIONS:
+        with engine.begin() as conn:
+            if migration(conn):
+                applied.append(migration.__name__)
+    return applied
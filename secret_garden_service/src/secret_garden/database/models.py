@@ -1,10 +1,11 @@
 from datetime import datetime
 
 from sqlalchemy import (Boolean, Column, Date, DateTime, Float, ForeignKey,
-                        Integer, String, UniqueConstraint)
+                        Index, Integer, String, UniqueConstraint)
 from sqlalchemy.orm import relationship
 
 from src.secret_garden.database.config import Base
+from src.secret_garden.database.types import Money
 
 
 class Owner(Base):
@@ -45,14 +46,14 @@ class Client(Base):
     due_date = Column(Integer, nullable=True)     # Vencimento (dia do mês)
 
     # Valores financeiros
-    amount_paid = Column(Float, nullable=True)    # Valor efetivamente pago
-    property_tax = Column(Float, nullable=True)   # IPTU
-    interest = Column(Float, nullable=True)       # Juros
-    utilities = Column(Float, nullable=True)      # Água/Gás
-    insurance = Column(Float, nullable=True)      # Seguro
-    condo_fee = Column(Float, nullable=True)      # Condomínio
+    amount_paid = Column(Money, nullable=True)    # Valor efetivamente pago
+    property_tax = Column(Money, nullable=True)   # IPTU
+    interest = Column(Money, nullable=True)       # Juros
+    utilities = Column(Money, nullable=True)      # Água/Gás
+    insurance = Column(Money, nullable=True)      # Seguro
+    condo_fee = Column(Money, nullable=True)      # Condomínio
     percentage = Column(Float, nullable=True)     # %
-    delivery_fee = Column(Float, nullable=True)   # Taxa de envio
+    delivery_fee = Column(Money, nullable=True)   # Taxa de envio
 
     # Datas
     start_date = Column(Date, nullable=True)      # Início
@@ -88,6 +89,36 @@ class Client(Base):
         return f"<Client(id={self.id}, name='{self.name}')>"
 
 
+class ClientNameIndex(Base):
+    """
+    Nome normalizado de cada cliente (sem acentos e em minúsculas), usado
+    nas buscas por nome (ver ClientNameIndexService)
+    """
+    __tablename__ = 'client_name_index'
+
+    client_id = Column(Integer, ForeignKey('clients.id'), primary_key=True)
+    normalized_name = Column(String, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ClientNameIndex(client_id={self.client_id}, normalized_name='{self.normalized_name}')>"
+
+
+class ClientNameTrigram(Base):
+    """
+    Trigramas do nome normalizado de cada cliente, usados na busca
+    aproximada por nome (ver ClientNameIndexService)
+    """
+    __tablename__ = 'client_name_trigrams'
+
+    trigram = Column(String(3), primary_key=True)
+    client_id = Column(
+        Integer, ForeignKey('clients.id'), primary_key=True, index=True
+    )
+
+    def __repr__(self):
+        return f"<ClientNameTrigram(trigram='{self.trigram}', client_id={self.client_id})>"
+
+
 class MonthlyCalculation(Base):
     """Modelo para armazenar cálculos financeiros mensais dos clientes"""
 
@@ -99,13 +130,16 @@ class MonthlyCalculation(Base):
     year = Column(Integer, nullable=False)   # Ano (ex: 2023)
 
     # Valores calculados
-    rent_amount = Column(Float, nullable=True)         # Valor do aluguel
-    calculation_base = Column(Float, nullable=True)    # Base de cálculo
+    rent_amount = Column(Money, nullable=True)         # Valor do aluguel
+    calculation_base = Column(Money, nullable=True)    # Base de cálculo
     tenant_payment = Column(
-        Float, nullable=True
+        Money, nullable=True
     )      # Valor pago pelo locatário
-    commission = Column(Float, nullable=True)          # Comissão
-    deposit_amount = Column(Float, nullable=True)      # Valor depósito
+    commission = Column(Money, nullable=True)          # Comissão
+    deposit_amount = Column(Money, nullable=True)      # Valor depósito
+
+    # Impressão digital dos valores de entrada usados no cálculo
+    input_fingerprint = Column(String(32), nullable=True)
 
     # Campos de controle
     created_at = Column(DateTime, default=datetime.now)
@@ -116,7 +150,11 @@ class MonthlyCalculation(Base):
 
     # Índice único para evitar duplicação (cliente + mês + ano)
     __table_args__ = (
-        # Unique constraint ensures only one calculation per client per month/year
+        Index(
+            'uix_calculation_client_month_year',
+            'client_id', 'month', 'year',
+            unique=True,
+        ),
         {'sqlite_autoincrement': True},
     )
 
@@ -136,17 +174,17 @@ class RetornoPagamento(Base):
     # Informações do boleto/pagamento
     due_date = Column(Date, nullable=False)          # Data de vencimento
     payment_date = Column(Date, nullable=False)      # Data de pagamento
-    rent_amount = Column(Float, nullable=False)      # Valor do aluguel (título)
-    amount_paid = Column(Float, nullable=False)      # Valor efetivamente pago
+    rent_amount = Column(Money, nullable=False)      # Valor do aluguel (título)
+    amount_paid = Column(Money, nullable=False)      # Valor efetivamente pago
     
     # Valores financeiros
-    interest = Column(Float, default=0.0)            # Juros
-    condo_fee = Column(Float, default=0.0)           # Condomínio
+    interest = Column(Money, default=0.0)            # Juros
+    condo_fee = Column(Money, default=0.0)           # Condomínio
     percentage = Column(Float, default=0.0)          # Percentual
-    commission = Column(Float, default=0.0)          # Comissão
-    delivery_fee = Column(Float, default=0.0)        # Taxa de envio
+    commission = Column(Money, default=0.0)          # Comissão
+    delivery_fee = Column(Money, default=0.0)        # Taxa de envio
     condo_paid = Column(Boolean, default=False)      # Pago condomínio
-    owner_payment_amount = Column(Float, default=0.0) # Valor a pagar ao proprietário
+    owner_payment_amount = Column(Money, default=0.0) # Valor a pagar ao proprietário
     
     # Campos de controle
     processed_at = Column(DateTime, default=datetime.now)
@@ -157,7 +195,13 @@ class RetornoPagamento(Base):
     
     # Índice único para evitar duplicação (cliente + mês + ano)
     __table_args__ = (
-        # Unique constraint ensures only one return per client per month/year
+        Index(
+            'uix_retorno_client_month_year',
+            'client_id', 'month', 'year',
+            unique=True,
+        ),
+        # Ordem das listagens (mais recentes primeiro, ver RetornoService)
+        Index('ix_retorno_processed_at_id', 'processed_at', 'id'),
         {'sqlite_autoincrement': True},
     )
     
@@ -175,11 +219,11 @@ class MonthlyVariableValues(Base):
     year = Column(Integer, nullable=False)   # Ano (ex: 2023)
 
     # Valores que podem variar mensalmente
-    water_bill = Column(Float, nullable=True)        # Conta de água
-    gas_bill = Column(Float, nullable=True)          # Conta de gás
-    insurance = Column(Float, nullable=True)         # Seguro
-    property_tax = Column(Float, nullable=True)      # IPTU
-    condo_fee = Column(Float, nullable=True)         # Condomínio
+    water_bill = Column(Money, nullable=True)        # Conta de água
+    gas_bill = Column(Money, nullable=True)          # Conta de gás
+    insurance = Column(Money, nullable=True)         # Seguro
+    property_tax = Column(Money, nullable=True)      # IPTU
+    condo_fee = Column(Money, nullable=True)         # Condomínio
     condo_paid_by_agency = Column(Boolean, default=False)  # Condomínio pago pela imobiliária
 
     # Campos de controle
@@ -209,9 +253,9 @@ class BankReturn(Base):
     payer_name = Column(String, nullable=True)
     due_date = Column(Date, nullable=True)
     payment_date = Column(Date, nullable=True)
-    title_amount = Column(Float, nullable=True)  # Valor do título
-    charged_amount = Column(Float, nullable=True)  # Valor cobrado
-    variation_amount = Column(Float, nullable=True)  # Valor da oscilação
+    title_amount = Column(Money, nullable=True)  # Valor do título
+    charged_amount = Column(Money, nullable=True)  # Valor cobrado
+    variation_amount = Column(Money, nullable=True)  # Valor da oscilação
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, onupdate=datetime.now)
 
@@ -225,3 +269,81 @@ class BankReturn(Base):
 
     def __repr__(self):
         return f"<BankReturn(id={self.id}, client_id={self.client_id}, month={self.month}, year={self.year})>"
+
+
+class OwnerMonthSummary(Base):
+    """
+    Totais materializados dos repasses e retornos bancários de um
+    proprietário em um mês (ver OwnerMonthSummaryService)
+    """
+    __tablename__ = 'owner_month_summary'
+
+    id = Column(Integer, primary_key=True, index=True)
+    owner_id = Column(Integer, ForeignKey('owners.id'), nullable=False)
+    month = Column(Integer, nullable=False)  # Mês (1-12)
+    year = Column(Integer, nullable=False)   # Ano (ex: 2023)
+
+    # Totais do repasse (MonthlyTransferService)
+    total_rent = Column(Money, nullable=False, default=0)
+    total_commission = Column(Money, nullable=False, default=0)
+    total_condo_fees = Column(Money, nullable=False, default=0)
+    total_delivery_fees = Column(Money, nullable=False, default=0)
+    total_deposit = Column(Money, nullable=False, default=0)
+    total_properties = Column(Integer, nullable=False, default=0)
+
+    # Totais dos retornos bancários (BankReturnService)
+    total_title_amount = Column(Money, nullable=False, default=0)
+    total_charged_amount = Column(Money, nullable=False, default=0)
+    total_variation_amount = Column(Money, nullable=False, default=0)
+    total_returns = Column(Integer, nullable=False, default=0)
+
+    # Campos de controle
+    updated_at = Column(DateTime, default=datetime.now)
+
+    # Garantir que só exista um resumo por proprietário/mês/ano
+    __table_args__ = (
+        UniqueConstraint(
+            'owner_id', 'month', 'year', name='uix_owner_month_summary'
+        ),
+    )
+
+    def __repr__(self):
+        return f"<OwnerMonthSummary(owner_id={self.owner_id}, month={self.month}, year={self.year})>"
+
+
+class ReconciliationResult(Base):
+    """
+    Resultado da conciliação de um cliente em um mês: valor cobrado pelo
+    banco (BankReturn) x aluguel calculado (MonthlyCalculation)
+    (ver ReconciliationService)
+    """
+    __tablename__ = 'reconciliation_results'
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey('clients.id'), nullable=False)
+    owner_id = Column(Integer, ForeignKey('owners.id'), nullable=False)
+    month = Column(Integer, nullable=False)  # Mês (1-12)
+    year = Column(Integer, nullable=False)   # Ano (ex: 2023)
+
+    # matched, underpaid, overpaid, missing_return ou missing_calculation
+    status = Column(String, nullable=False)
+    calculation_id = Column(Integer, nullable=True)
+    bank_return_id = Column(Integer, nullable=True)
+    expected_amount = Column(Money, nullable=True)  # Aluguel calculado
+    charged_amount = Column(Money, nullable=True)   # Valor cobrado
+    difference = Column(Money, nullable=True)       # Cobrado - calculado
+
+    # Campos de controle
+    reconciled_at = Column(DateTime, default=datetime.now)
+
+    # Garantir que só exista um resultado por cliente/mês/ano
+    __table_args__ = (
+        UniqueConstraint(
+            'client_id', 'month', 'year',
+            name='uix_reconciliation_client_month_year'
+        ),
+        Index('ix_reconciliation_month_year_status', 'year', 'month', 'status'),
+    )
+
+    def __repr__(self):
+        return f"<ReconciliationResult(client_id={self.client_id}, month={self.month}, year={self.year}, status='{self.status}')>"
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 
 from src.secret_garden.database.config import SessionLocal
 from src.secret_garden.database.models import Client, Owner
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameIndexService
 
 
 def seed_owners(db: Session):
@@ -149,6 +151,10 @@ def seed_clients(db: Session):
     for client in clients:
         db.add(client)
 
+    db.flush()
+    ClientNameIndexService.refresh_clients(
+        db, [client.id for client in clients]
+    )
     db.commit()
     print(f'Adicionados {len(clients)} clientes de exemplo ao banco de dados.')
 
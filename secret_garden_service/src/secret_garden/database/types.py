@@ -0,0 +1,24 @@
+from sqlalchemy import Integer
+from sqlalchemy.types import TypeDecorator
+
+from src.secret_garden.core.money import from_cents, to_cents
+
+
+class Money(TypeDecorator):
+    """
+    Valor monetário armazenado como centavos inteiros.
+
+    No banco a coluna é um INTEGER (somas exatas e compactas); no Python o
+    valor continua sendo lido e gravado em reais (float), então os serviços e
+    a API não precisam saber da conversão. Agregações como func.sum() sobre
+    a coluna também são convertidas de volta para reais.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return from_cents(value)
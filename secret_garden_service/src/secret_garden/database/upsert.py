@@ -0,0 +1,81 @@
+from typing import Any, Iterable
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Construtores de INSERT com suporte a ON CONFLICT por banco de dados
+_INSERT_BY_DIALECT = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_statement(
+    db: Session,
+    model: Any,
+    index_elements: Iterable[str],
+    update_columns: Iterable[str],
+    **extra_values: Any,
+) -> Any:
+    """
+    Monta um INSERT ... ON CONFLICT DO UPDATE para o modelo informado.
+
+    O comando pode ser executado com uma lista de linhas
+    (db.execute(stmt, linhas)), gravando todas em uma única ida ao banco.
+
+    Args:
+        db: Sessão do banco de dados (usada para identificar o banco)
+        model: Modelo SQLAlchemy
+        index_elements: Colunas da chave única usada para detectar o conflito
+        update_columns: Colunas atualizadas com os valores da nova linha
+            quando a chave já existe
+        **extra_values: Valores fixos gravados apenas na atualização
+            (ex: updated_at)
+
+    Returns:
+        Comando de inserção com a cláusula ON CONFLICT DO UPDATE
+    """
+    dialect = db.get_bind().dialect.name
+    insert_function = _INSERT_BY_DIALECT.get(dialect)
+    if insert_function is None:
+        raise NotImplementedError(
+            f'Upsert não suportado para o banco de dados {dialect}'
+        )
+
+    stmt = insert_function(model)
+    values = {name: stmt.excluded[name] for name in update_columns}
+    values.update(extra_values)
+
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements), set_=values
+    )
+
+
+def insert_ignore_statement(
+    db: Session, model: Any, index_elements: Iterable[str]
+) -> Any:
+    """
+    Monta um INSERT ... ON CONFLICT DO NOTHING para o modelo informado.
+
+    As linhas cuja chave já existe são ignoradas pelo banco; com RETURNING,
+    apenas as linhas realmente inseridas são retornadas.
+
+    Args:
+        db: Sessão do banco de dados (usada para identificar o banco)
+        model: Modelo SQLAlchemy
+        index_elements: Colunas da chave única usada para detectar o conflito
+
+    Returns:
+        Comando de inserção com a cláusula ON CONFLICT DO NOTHING
+    """
+    dialect = db.get_bind().dialect.name
+    insert_function = _INSERT_BY_DIALECT.get(dialect)
+    if insert_function is None:
+        raise NotImplementedError(
+            f'Insert com ON CONFLICT não suportado para o banco de dados '
+            f'{dialect}'
+        )
+
+    return insert_function(model).on_conflict_do_nothing(
+        index_elements=list(index_elements)
+    )
@@ -66,4 +66,64 @@ class BankReturnResponse(BaseModel):
     error: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class BankReturnImportLine(BaseModel):
+    """Resultado da importação de um título do arquivo de retorno"""
+    line: int
+    status: str
+    client_id: Optional[int] = None
+    month: Optional[int] = None
+    year: Optional[int] = None
+    message: Optional[str] = None
+
+
+class BankReturnImportResult(BaseModel):
+    """Resumo da importação de um arquivo de retorno"""
+    total_titles: int = 0
+    imported: int = 0
+    replaced: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    results: List[BankReturnImportLine] = []
+
+
+class BankReturnImportResponse(BaseModel):
+    """Resposta da importação de um arquivo de retorno"""
+    data: Optional[BankReturnImportResult] = None
+    error: Optional[str] = None
+
+
+class BankReturnBulkItem(BankReturnUpdate):
+    """Retorno bancário de um cliente/mês na gravação em lote"""
+    client_id: int
+    month: int = Field(..., ge=1, le=12)
+    year: int = Field(..., ge=2000, le=2100)
+
+
+class BankReturnBulkLine(BaseModel):
+    """Resultado da gravação de um item do lote"""
+    index: int
+    status: str
+    id: Optional[int] = None
+    client_id: Optional[int] = None
+    month: Optional[int] = None
+    year: Optional[int] = None
+    message: Optional[str] = None
+
+
+class BankReturnBulkResult(BaseModel):
+    """Resumo da gravação em lote de retornos bancários"""
+    total_items: int = 0
+    created: int = 0
+    updated: int = 0
+    replaced: int = 0
+    invalid: int = 0
+    results: List[BankReturnBulkLine] = []
+
+
+class BankReturnBulkResponse(BaseModel):
+    """Resposta da gravação em lote de retornos bancários"""
+    data: Optional[BankReturnBulkResult] = None
+    error: Optional[str] = None
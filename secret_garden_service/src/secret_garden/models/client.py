@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ClientBase(BaseModel):
@@ -95,6 +95,14 @@ class ClientResponse(BaseModel):
     error: Optional[str] = None
 
 
+class ClientNameMatchRequest(BaseModel):
+    """Nomes a buscar no índice de nomes dos clientes"""
+
+    names: List[str] = Field(..., min_length=1)
+    limit: int = Field(5, ge=1, le=50)          # Clientes por nome
+    min_score: float = Field(0.3, ge=0, le=1)   # Similaridade mínima
+
+
 class AdjustmentInfo(BaseModel):
     """Informações sobre um reajuste de contrato"""
     id: int
@@ -57,9 +57,60 @@ class MonthlyCalculationSummary(BaseModel):
     total_processed: int
     successful: int
     failed: int
+    skipped: int = 0
     message: str
 
 
+class MonthlyCalculationPeriodSummary(BaseModel):
+    """Contagens do cálculo de um mês dentro de um período"""
+
+    month: int
+    year: int
+    total_processed: int
+    successful: int
+    failed: int
+    skipped: int
+
+
+class MonthlyCalculationRangeSummary(MonthlyCalculationSummary):
+    """Resumo do cálculo de um período de vários meses"""
+
+    periods: List[MonthlyCalculationPeriodSummary] = []
+
+
+class MonthlyCalculationPreview(BaseModel):
+    """Simulação do cálculo mensal (valores que mudariam)"""
+
+    month: int
+    year: int
+    total_clients: int
+    changed_clients: int
+    new_clients: int
+    unchanged_clients: int
+    changes: List[Dict[str, Any]]
+    totals: Dict[str, Dict[str, float]]
+
+
+class MonthlyCalculationJob(BaseModel):
+    """Situação de um job de cálculo mensal em segundo plano"""
+
+    job_id: str
+    month: int
+    year: int
+    force: bool = False  # Recalcula também os clientes sem alterações
+    status: str  # pending, running, completed, failed
+    total: int = 0
+    processed: int = 0
+    successful: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed_seconds: float = 0
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
 class TenantInfo(BaseModel):
     """Informações do locatário para o repasse"""
     id: int
@@ -113,3 +164,44 @@ class MonthlyTransferResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class MonthlyTransferTotals(BaseModel):
+    """Totais acumulados dos repasses"""
+    total_rent: float = 0
+    total_commission: float = 0
+    total_condo_fees: float = 0
+    total_delivery_fees: float = 0
+    total_deposit: float = 0
+
+
+class MonthlyTransferHistoryTotals(MonthlyTransferTotals):
+    """Totais do histórico de repasses"""
+    calculated_properties: int = 0  # Imóveis com cálculo no período
+
+
+class MonthlyTransferHistoryPeriod(BaseModel):
+    """Repasse de um mês no histórico do proprietário"""
+    month: int
+    year: int
+    totals: MonthlyTransferHistoryTotals
+    running_totals: MonthlyTransferTotals
+    year_to_date: MonthlyTransferTotals
+    properties: List[MonthlyTransferItem]
+
+
+class MonthlyTransferHistoryMetadata(BaseModel):
+    """Metadados do histórico de repasses"""
+    owner_id: int
+    start_month: int
+    start_year: int
+    end_month: int
+    end_year: int
+    generated_at: datetime = Field(default_factory=datetime.now)
+
+
+class MonthlyTransferHistoryResponse(BaseModel):
+    """Histórico de repasses de um proprietário em um período"""
+    data: List[MonthlyTransferHistoryPeriod]
+    summary: MonthlyTransferHistoryTotals
+    metadata: MonthlyTransferHistoryMetadata
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -37,4 +37,33 @@ class MonthlyVariableValuesResponse(BaseModel):
     error: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+
+class MonthlyVariableValuesBulkLine(BaseModel):
+    """Resultado da gravação de uma linha da planilha"""
+    index: int
+    status: str
+    id: Optional[int] = None
+    client_id: Optional[int] = None
+    month: Optional[int] = None
+    year: Optional[int] = None
+    message: Optional[str] = None
+
+
+class MonthlyVariableValuesBulkResult(BaseModel):
+    """Resumo da gravação em lote de valores variáveis mensais"""
+    total_items: int = 0
+    created: int = 0
+    updated: int = 0
+    replaced: int = 0
+    invalid: int = 0
+    results: List[MonthlyVariableValuesBulkLine] = []
+    # Resultado do recálculo de cada mês/ano (quando solicitado)
+    recalculation: Optional[List[Dict[str, Any]]] = None
+
+
+class MonthlyVariableValuesBulkResponse(BaseModel):
+    """Resposta da gravação em lote de valores variáveis mensais"""
+    data: Optional[MonthlyVariableValuesBulkResult] = None
+    error: Optional[str] = None
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class ReconciliationItem(BaseModel):
+    """Conciliação de um cliente no mês"""
+    client: Dict[str, Any]
+    owner_id: int
+    status: str
+    calculation_id: Optional[int] = None
+    bank_return_id: Optional[int] = None
+    expected_amount: Optional[float] = None
+    charged_amount: Optional[float] = None
+    difference: Optional[float] = None
+
+
+class ReconciliationStatusSummary(BaseModel):
+    """Totais dos clientes de uma situação da conciliação"""
+    total_clients: int = 0
+    total_expected: float = 0
+    total_charged: float = 0
+    total_difference: float = 0
+
+
+class ReconciliationMetadata(BaseModel):
+    """Metadados do painel de conciliação"""
+    month: int
+    year: int
+    owner_id: Optional[int] = None
+    status: Optional[str] = None
+    reconciled_at: Optional[datetime] = None
+
+
+class ReconciliationResponse(BaseModel):
+    """Resposta do painel de conciliação"""
+    data: Optional[List[ReconciliationItem]] = None
+    summary: Optional[Dict[str, ReconciliationStatusSummary]] = None
+    metadata: Optional[ReconciliationMetadata] = None
+    error: Optional[str] = None
+
+
+class ReconciliationRunResult(BaseModel):
+    """Quantidade de clientes por situação em uma conciliação"""
+    month: int
+    year: int
+    total_clients: int = 0
+    matched: int = 0
+    underpaid: int = 0
+    overpaid: int = 0
+    missing_return: int = 0
+    missing_calculation: int = 0
+    reconciled_at: datetime
+
+
+class ReconciliationRunResponse(BaseModel):
+    """Resposta da execução da conciliação"""
+    data: Optional[ReconciliationRunResult] = None
+    error: Optional[str] = None
@@ -60,6 +60,7 @@ class RetornoPagamentoResponse(BaseModel):
     """Modelo de resposta para operações com retornos de pagamento"""
     data: Optional[Union[Dict[str, Any], List[Dict[str, Any]], str]] = None
     error: Optional[str] = None
+    next_cursor: Optional[str] = None  # Cursor da próxima página (listagens)
 
 
 class ProcessamentoRetornoRequest(BaseModel):
@@ -67,4 +68,12 @@ class ProcessamentoRetornoRequest(BaseModel):
     client_name_prefix: str            # Prefixo do nome do cliente para busca
     payment_date: date                 # Data de pagamento
     amount_paid: float                 # Valor pago
-    interest: float = 0.0              # Juros 
\ No newline at end of file
+    interest: float = 0.0              # Juros 
+
+
+class ProcessamentoRetornoLoteItem(BaseModel):
+    """Pagamento de um cliente no processamento de retornos em lote"""
+    client_id: int                     # ID do cliente
+    payment_date: date                 # Data de pagamento
+    amount_paid: float                 # Valor pago
+    interest: float = 0.0              # Juros
@@ -1,10 +1,26 @@
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
 from src.secret_garden.database.models import BankReturn, Client
+from src.secret_garden.database.upsert import upsert_statement
+from src.secret_garden.models.bank_return import BankReturnBulkItem
+from src.secret_garden.services.bulk_items import (BULK_UPDATED,
+                                                   bulk_totals,
+                                                   clients_by_period,
+                                                   prepare_bulk_items)
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+from src.secret_garden.services.report_cache import report_cache
+
+
+# Campos de BankReturnUpdate gravados pelo lote
+BULK_FIELDS = tuple(
+    name for name in BankReturnBulkItem.model_fields
+    if name not in ('client_id', 'month', 'year')
+)
 
 
 class BankReturnService:
@@ -56,14 +72,116 @@ class BankReturnService:
                 )
                 db.add(bank_return)
 
+            db.flush()
+            OwnerMonthSummaryService.refresh_clients(
+                db, [client_id], month, year
+            )
             db.commit()
             db.refresh(bank_return)
+            report_cache.invalidate_clients(db, [client_id], month, year)
             return bank_return
 
         except Exception as e:
             db.rollback()
             raise e
 
+    @staticmethod
+    def bulk_create_or_update_bank_returns(
+        db: Session, items: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Cria ou atualiza vários retornos bancários em uma única transação.
+
+        Cada item tem client_id, month, year e os campos de
+        BankReturnUpdate. Como em create_or_update_bank_return, apenas os
+        campos informados são alterados nos retornos existentes. Os itens
+        são gravados com um INSERT ... ON CONFLICT (client_id, month, year)
+        DO UPDATE por conjunto de campos informados, sem consultar antes os
+        retornos existentes.
+
+        Itens inválidos (campos inválidos ou cliente inexistente) não
+        impedem a gravação dos demais. Se o mesmo cliente/mês/ano aparecer
+        mais de uma vez, vale o último item (ver prepare_bulk_items).
+
+        Args:
+            db: Sessão do banco de dados
+            items: Itens a gravar
+
+        Returns:
+            Dicionário com os totais por situação e o resultado de cada item
+            (índice, situação, ID do retorno, cliente, mês/ano e mensagem)
+        """
+        results, valid = prepare_bulk_items(db, items, BankReturnBulkItem)
+
+        # Itens agrupados pelos campos informados: cada grupo é gravado com
+        # um upsert que altera apenas esses campos
+        now = datetime.now()
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for (client_id, month, year), (parsed, _) in valid.items():
+            values = parsed.model_dump(
+                include=set(BULK_FIELDS), exclude_unset=True
+            )
+            fields = tuple(name for name in BULK_FIELDS if name in values)
+            groups.setdefault(fields, []).append({
+                'client_id': client_id,
+                'month': month,
+                'year': year,
+                **values,
+                'created_at': now,
+            })
+
+        periods = clients_by_period(valid)
+
+        try:
+            # Usa a tabela (e não o modelo): com RETURNING, o upsert pelo
+            # ORM é executado linha a linha, e pelo Core, em um único
+            # comando. Retornos criados voltam sem updated_at (só a
+            # atualização o preenche), o que distingue criados de
+            # atualizados
+            table = BankReturn.__table__
+            for fields, rows in groups.items():
+                written = db.execute(
+                    upsert_statement(
+                        db,
+                        table,
+                        ('client_id', 'month', 'year'),
+                        fields,
+                        updated_at=now,
+                    ).returning(
+                        table.c.id,
+                        table.c.client_id,
+                        table.c.month,
+                        table.c.year,
+                        table.c.updated_at,
+                    ),
+                    rows,
+                )
+                for bank_return_id, client_id, month, year, updated_at in (
+                    written
+                ):
+                    result = valid[(client_id, month, year)][1]
+                    result['id'] = bank_return_id
+                    if updated_at is not None:
+                        result['status'] = BULK_UPDATED
+
+            for (month, year), period_clients in periods.items():
+                OwnerMonthSummaryService.refresh_clients(
+                    db, period_clients, month, year
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+        for (month, year), period_clients in periods.items():
+            report_cache.invalidate_clients(db, period_clients, month, year)
+
+        return {
+            'total_items': len(results),
+            **bulk_totals(results),
+            'results': results,
+        }
+
     @staticmethod
     def get_owner_bank_returns(
         db: Session,
@@ -74,6 +192,9 @@ class BankReturnService:
         """
         Retorna os dados de retorno bancário para um proprietário específico.
 
+        O resultado fica em cache até que os dados do proprietário/mês sejam
+        alterados.
+
         Args:
             db: Sessão do banco de dados
             owner_id: ID do proprietário
@@ -89,86 +210,80 @@ class BankReturnService:
             month = month or now.month
             year = year or now.year
 
-        # Buscar todos os clientes ativos do proprietário
-        clients = (
-            db.query(Client)
+        cache_key = ('bank_returns', owner_id, month, year)
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(owner_id, month, year)
+
+        # Retornos do mês dos clientes ativos do proprietário, com os totais
+        # calculados na mesma consulta (funções de janela sobre todas as
+        # linhas do resultado)
+        totals = {
+            "total_title_amount": BankReturn.title_amount,
+            "total_charged_amount": BankReturn.charged_amount,
+            "total_variation_amount": BankReturn.variation_amount,
+        }
+        rows = (
+            db.query(
+                BankReturn.id,
+                Client.id.label("client_id"),
+                Client.name.label("client_name"),
+                BankReturn.payer_name,
+                BankReturn.due_date,
+                BankReturn.payment_date,
+                BankReturn.title_amount,
+                BankReturn.charged_amount,
+                BankReturn.variation_amount,
+                BankReturn.created_at,
+                BankReturn.updated_at,
+                *[
+                    func.coalesce(func.sum(column).over(), 0).label(name)
+                    for name, column in totals.items()
+                ],
+                func.count().over().label("total_returns"),
+            )
+            .join(Client, Client.id == BankReturn.client_id)
             .filter(
                 Client.owner_id == owner_id,
-                Client.is_active.is_(True)
+                Client.is_active.is_(True),
+                BankReturn.month == month,
+                BankReturn.year == year
             )
+            .order_by(Client.id)
             .all()
         )
 
-        if not clients:
-            return {
-                "data": [],
-                "summary": {
-                    "total_title_amount": 0,
-                    "total_charged_amount": 0,
-                    "total_variation_amount": 0,
-                    "total_returns": 0
+        return_items = [
+            {
+                "id": row.id,
+                "client": {
+                    "id": row.client_id,
+                    "name": row.client_name
                 },
-                "metadata": {
-                    "owner_id": owner_id,
-                    "month": month,
-                    "year": year,
-                    "generated_at": datetime.now()
-                }
+                "month": month,
+                "year": year,
+                "payer_name": row.payer_name,
+                "due_date": row.due_date,
+                "payment_date": row.payment_date,
+                "title_amount": row.title_amount,
+                "charged_amount": row.charged_amount,
+                "variation_amount": row.variation_amount,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at
             }
+            for row in rows
+        ]
 
-        # Lista para armazenar os dados de retorno
-        return_items = []
-        
-        # Variáveis para o resumo
-        summary = {
-            "total_title_amount": 0,
-            "total_charged_amount": 0,
-            "total_variation_amount": 0,
-            "total_returns": 0
-        }
-
-        # Para cada cliente, buscar os retornos bancários do mês
-        for client in clients:
-            bank_return = (
-                db.query(BankReturn)
-                .filter(
-                    and_(
-                        BankReturn.client_id == client.id,
-                        BankReturn.month == month,
-                        BankReturn.year == year
-                    )
-                )
-                .first()
-            )
-
-            if bank_return:
-                return_item = {
-                    "id": bank_return.id,
-                    "client": {
-                        "id": client.id,
-                        "name": client.name
-                    },
-                    "month": month,
-                    "year": year,
-                    "payer_name": bank_return.payer_name,
-                    "due_date": bank_return.due_date,
-                    "payment_date": bank_return.payment_date,
-                    "title_amount": bank_return.title_amount,
-                    "charged_amount": bank_return.charged_amount,
-                    "variation_amount": bank_return.variation_amount,
-                    "created_at": bank_return.created_at,
-                    "updated_at": bank_return.updated_at
-                }
-
-                return_items.append(return_item)
-
-                # Atualizar resumo
-                summary["total_title_amount"] += (bank_return.title_amount or 0)
-                summary["total_charged_amount"] += (bank_return.charged_amount or 0)
-                summary["total_variation_amount"] += (bank_return.variation_amount or 0)
-                summary["total_returns"] += 1
+        if rows:
+            summary = {
+                name: getattr(rows[0], name)
+                for name in (*totals, "total_returns")
+            }
+        else:
+            summary = {name: 0 for name in (*totals, "total_returns")}
 
-        return {
+        result = {
             "data": return_items,
             "summary": summary,
             "metadata": {
@@ -177,4 +292,6 @@ class BankReturnService:
                 "year": year,
                 "generated_at": datetime.now()
             }
-        } 
\ No newline at end of file
+        }
+        report_cache.set(cache_key, result, generation)
+        return result 
\ No newline at end of file
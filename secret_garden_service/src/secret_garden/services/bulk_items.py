@@ -0,0 +1,113 @@
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from src.secret_garden.database.models import Client
+
+# Situação de cada item nas gravações em lote (cliente/mês/ano)
+BULK_CREATED = 'created'
+BULK_UPDATED = 'updated'
+BULK_REPLACED = 'replaced'
+BULK_INVALID = 'invalid'
+
+BULK_STATUSES = (BULK_CREATED, BULK_UPDATED, BULK_REPLACED, BULK_INVALID)
+
+# Chave de cada item: (client_id, month, year)
+BulkKey = Tuple[int, int, int]
+
+
+def validation_message(error: ValidationError) -> str:
+    """Resume os erros de validação de um item em uma linha"""
+    return '; '.join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def prepare_bulk_items(
+    db: Session, items: Iterable[Dict[str, Any]], model: Type[BaseModel]
+) -> Tuple[List[Dict[str, Any]], Dict[BulkKey, Tuple[Any, Dict[str, Any]]]]:
+    """
+    Valida os itens de uma gravação em lote por cliente/mês/ano.
+
+    Cada item é validado com o modelo (que tem client_id, month e year).
+    Itens inválidos e de clientes inexistentes (uma consulta) são marcados
+    como invalid. Se o mesmo cliente/mês/ano aparecer mais de uma vez, vale
+    o último item e os anteriores são marcados como replaced.
+
+    Args:
+        db: Sessão do banco de dados
+        items: Itens recebidos
+        model: Modelo Pydantic de cada item
+
+    Returns:
+        Tupla (resultados, válidos): o resultado de cada item, na ordem
+        recebida (índice, situação, cliente, mês/ano e mensagem, com a
+        situação inicial created), e o item validado e o seu resultado por
+        cliente/mês/ano, apenas para os itens a gravar
+    """
+    results: List[Dict[str, Any]] = []
+    valid: Dict[BulkKey, Tuple[Any, Dict[str, Any]]] = {}
+
+    for index, item in enumerate(items):
+        try:
+            parsed = model.model_validate(item)
+        except ValidationError as e:
+            results.append({
+                'index': index,
+                'status': BULK_INVALID,
+                'message': validation_message(e),
+            })
+            continue
+
+        key = (parsed.client_id, parsed.month, parsed.year)
+        result = {
+            'index': index,
+            'status': BULK_CREATED,
+            'client_id': parsed.client_id,
+            'month': parsed.month,
+            'year': parsed.year,
+            'message': None,
+        }
+        if key in valid:
+            replaced = valid[key][1]
+            replaced['status'] = BULK_REPLACED
+            replaced['message'] = f'Substituído pelo item {index}'
+
+        valid[key] = (parsed, result)
+        results.append(result)
+
+    # Clientes inexistentes
+    client_ids = {client_id for client_id, _, _ in valid}
+    existing_clients = set()
+    if client_ids:
+        existing_clients = {
+            client_id for client_id, in db.query(Client.id).filter(
+                Client.id.in_(client_ids)
+            )
+        }
+    for key in [key for key in valid if key[0] not in existing_clients]:
+        _, result = valid.pop(key)
+        result['status'] = BULK_INVALID
+        result['message'] = f'Cliente com ID {key[0]} não encontrado'
+
+    return results, valid
+
+
+def clients_by_period(
+    keys: Iterable[BulkKey],
+) -> Dict[Tuple[int, int], set]:
+    """Agrupa os clientes das chaves cliente/mês/ano por (mês, ano)"""
+    periods: Dict[Tuple[int, int], set] = {}
+    for client_id, month, year in keys:
+        periods.setdefault((month, year), set()).add(client_id)
+    return periods
+
+
+def bulk_totals(results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Quantidade de itens por situação"""
+    totals = dict.fromkeys(BULK_STATUSES, 0)
+    for result in results:
+        totals[result['status']] += 1
+    return totals
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.secret_garden.database.config import SessionLocal
+from src.secret_garden.database.models import Client
+from src.secret_garden.services.monthly_calculation_service import \
+    MonthlyCalculationService
+
+logger = logging.getLogger(__name__)
+
+# Número de clientes calculados (e gravados) por vez em um job
+JOB_CHUNK_SIZE = 500
+
+# Quantidade de jobs finalizados mantidos em memória para consulta
+MAX_FINISHED_JOBS = 100
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+# Jobs pendentes ou em execução por (mês, ano, force)
+_active_jobs: Dict[tuple, str] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix='calculation-job'
+)
+
+
+class CalculationJobService:
+    """Serviço para executar cálculos mensais em segundo plano"""
+
+    @staticmethod
+    def submit(
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Agenda o cálculo mensal de todos os clientes ativos em segundo plano.
+
+        Se já existir um job pendente ou em execução para o mesmo mês/ano,
+        retorna esse job em vez de iniciar outro. Um job com force só é
+        reaproveitado por outro com force, e um job com force em andamento
+        também atende aos pedidos sem force.
+
+        Args:
+            month: Mês para calcular (1-12). Se não for fornecido, usa o mês atual
+            year: Ano para calcular. Se não for fornecido, usa o ano atual
+            force: Recalcula também os clientes sem alterações
+
+        Returns:
+            Situação atual do job
+        """
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        with _lock:
+            active_id = _active_jobs.get((month, year, True))
+            if not force:
+                active_id = active_id or _active_jobs.get(
+                    (month, year, False)
+                )
+            if active_id:
+                return CalculationJobService._snapshot(_jobs[active_id])
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'month': month,
+                'year': year,
+                'force': force,
+                'status': 'pending',
+                'total': 0,
+                'processed': 0,
+                'successful': 0,
+                'failed': 0,
+                'skipped': 0,
+                'submitted_at': datetime.now(),
+                'started_at': None,
+                'finished_at': None,
+                'error': None,
+                '_started': None,
+                '_finished': None,
+            }
+            _jobs[job_id] = job
+            _active_jobs[(month, year, force)] = job_id
+            CalculationJobService._prune_finished_jobs()
+            snapshot = CalculationJobService._snapshot(job)
+
+        _executor.submit(CalculationJobService._run, job_id, force)
+        return snapshot
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca a situação de um job.
+
+        Args:
+            job_id: ID do job
+
+        Returns:
+            Situação atual do job ou None se não encontrado
+        """
+        with _lock:
+            job = _jobs.get(job_id)
+            return CalculationJobService._snapshot(job) if job else None
+
+    @staticmethod
+    def _run(job_id: str, force: bool) -> None:
+        """Executa o cálculo de um job, em blocos de JOB_CHUNK_SIZE clientes"""
+        job = _jobs[job_id]
+        month, year = job['month'], job['year']
+        db = SessionLocal()
+
+        try:
+            client_ids = [
+                client_id
+                for (client_id,) in db.query(Client.id)
+                .filter(Client.is_active.is_(True))
+                .order_by(Client.id)
+            ]
+
+            with _lock:
+                job['status'] = 'running'
+                job['started_at'] = datetime.now()
+                job['_started'] = time.monotonic()
+                job['total'] = len(client_ids)
+
+            for start in range(0, len(client_ids), JOB_CHUNK_SIZE):
+                chunk = client_ids[start:start + JOB_CHUNK_SIZE]
+                result = (
+                    MonthlyCalculationService.calculate_for_all_clients_bulk(
+                        db, month, year, client_ids=chunk, force=force
+                    )
+                )
+
+                with _lock:
+                    job['processed'] += result['total_processed']
+                    job['successful'] += result['successful']
+                    job['failed'] += result['failed']
+                    job['skipped'] += result['skipped']
+
+            status, error = 'completed', None
+        except Exception as e:
+            logger.error(
+                f'Erro no job de cálculo {job_id} ({month}/{year}): {str(e)}'
+            )
+            status, error = 'failed', str(e)
+        finally:
+            db.close()
+
+        with _lock:
+            job['status'] = status
+            job['error'] = error
+            job['finished_at'] = datetime.now()
+            job['_finished'] = time.monotonic()
+            if job['_started'] is None:
+                job['_started'] = job['_finished']
+            _active_jobs.pop((month, year, force), None)
+
+    @staticmethod
+    def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Cópia pública da situação do job, com o tempo decorrido"""
+        snapshot = {
+            key: value for key, value in job.items()
+            if not key.startswith('_')
+        }
+
+        elapsed = 0.0
+        if job['_started'] is not None:
+            end = job['_finished'] or time.monotonic()
+            elapsed = end - job['_started']
+        snapshot['elapsed_seconds'] = round(elapsed, 3)
+
+        return snapshot
+
+    @staticmethod
+    def _prune_finished_jobs() -> None:
+        """Remove os jobs finalizados mais antigos (chamado com o lock)"""
+        finished = [
+            job_id for job_id, job in _jobs.items()
+            if job['status'] in ('completed', 'failed')
+        ]
+        for job_id in finished[:-MAX_FINISHED_JOBS]:
+            del _jobs[job_id]
@@ -0,0 +1,106 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Campos de saída do cálculo mensal, na ordem em que são calculados
+OUTPUT_FIELDS = (
+    'rent_amount',
+    'calculation_base',
+    'tenant_payment',
+    'commission',
+    'deposit_amount',
+)
+
+
+def _to_array(values: Sequence[Optional[float]]) -> np.ndarray:
+    """
+    Converte uma sequência de valores monetários em um array de float,
+    tratando None como 0 (mesma regra do `or 0` usado nos serviços).
+    """
+    array = np.asarray(values, dtype=float)
+    return np.nan_to_num(array, nan=0.0)
+
+
+def round_money(values: np.ndarray) -> np.ndarray:
+    """
+    Arredonda um array para 2 casas decimais com a mesma semântica do
+    `round(valor, 2)` do Python.
+
+    O np.round multiplica por 100 antes de arredondar, o que pode transformar
+    valores muito próximos de meio centavo (ex: 1.115) em um empate exato e
+    arredondar para o lado oposto do round() do Python. Esses casos raros são
+    recalculados com o round() nativo.
+    """
+    scaled = values * 100.0
+    rounded = np.rint(scaled) / 100.0
+
+    near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_half.any():
+        indexes = np.nonzero(near_half)[0]
+        rounded[indexes] = [round(float(values[i]), 2) for i in indexes]
+
+    return rounded
+
+
+def calculate_monthly_values(
+    amount_paid: Sequence[Optional[float]],
+    property_tax: Sequence[Optional[float]],
+    utilities: Sequence[Optional[float]],
+    condo_fee: Sequence[Optional[float]],
+    insurance: Sequence[Optional[float]],
+    percentage: Sequence[Optional[float]],
+    delivery_fee: Sequence[Optional[float]],
+    condo_paid: Sequence[Optional[bool]],
+) -> Dict[str, np.ndarray]:
+    """
+    Calcula os valores mensais de vários clientes de uma só vez.
+
+    Cada argumento é uma coluna com um valor por cliente (todas do mesmo
+    tamanho). Valores None são tratados como 0 (ou False para condo_paid).
+    As fórmulas e o arredondamento são os mesmos de
+    MonthlyCalculationService._compute_values.
+
+    Returns:
+        Dicionário com um array por campo calculado (rent_amount,
+        calculation_base, tenant_payment, commission, deposit_amount)
+    """
+    amount_paid = _to_array(amount_paid)
+    property_tax = _to_array(property_tax)
+    utilities = _to_array(utilities)
+    condo_fee = _to_array(condo_fee)
+    insurance = _to_array(insurance)
+    percentage = _to_array(percentage)
+    delivery_fee = _to_array(delivery_fee)
+    condo_paid = np.asarray(
+        [bool(value) for value in condo_paid], dtype=bool
+    )
+
+    # Valor do aluguel = Valor pago + IPTU + Água/Gás
+    rent_amount = round_money(amount_paid + property_tax + utilities)
+
+    # Base de cálculo = IPTU + Água/Gás + Condomínio + Seguro
+    calculation_base = round_money(
+        property_tax + utilities + condo_fee + insurance
+    )
+
+    # Valor pago pelo locatário = Valor aluguel - Base cálculo
+    tenant_payment = round_money(rent_amount - calculation_base)
+
+    # Comissão = Valor pago pelo locatário * (Percentual / 100)
+    commission = round_money(tenant_payment * (percentage / 100))
+
+    # Valor depósito = Valor aluguel - Comissão - Taxa envio - Condo pago
+    deposit_amount = round_money(
+        rent_amount
+        - commission
+        - delivery_fee
+        - np.where(condo_paid, condo_fee, 0.0)
+    )
+
+    return {
+        'rent_amount': rent_amount,
+        'calculation_base': calculation_base,
+        'tenant_payment': tenant_payment,
+        'commission': commission,
+        'deposit_amount': deposit_amount,
+    }
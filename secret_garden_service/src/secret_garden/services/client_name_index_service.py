@@ -0,0 +1,329 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from src.secret_garden.core.names import (client_name_index_rows,
+                                          name_trigrams, normalize_name,
+                                          trigram_similarity)
+from src.secret_garden.database.models import (Client, ClientNameIndex,
+                                               ClientNameTrigram)
+
+# Quantidade padrão de clientes retornados por nome buscado
+DEFAULT_MATCH_LIMIT = 5
+
+# Similaridade mínima padrão (0 a 1) para um cliente ser sugerido
+DEFAULT_MIN_SCORE = 0.3
+
+
+def _match_result(
+    client_id: int, name: str, owner_id: int, score: float
+) -> Dict[str, Any]:
+    """Monta um cliente sugerido pela busca por nome"""
+    return {
+        'client_id': client_id,
+        'name': name,
+        'owner_id': owner_id,
+        'score': round(score, 4),
+    }
+
+
+class ClientNameMatcher:
+    """
+    Índice de nomes em memória, carregado de uma só vez da tabela de
+    trigramas, para resolver muitos nomes seguidos (ex: os pagadores de um
+    arquivo de retorno) sem uma consulta por nome.
+
+    Cada trigrama guarda um array com as posições dos clientes que o têm.
+    Os trigramas em comum de todos os clientes com um nome são contados de
+    uma vez com numpy (bincount), sem laço por cliente.
+    """
+
+    def __init__(
+        self,
+        clients: Iterable[Tuple[int, str, int, str]],
+        trigrams: Iterable[Tuple[str, int]],
+    ):
+        """
+        Args:
+            clients: (client_id, nome, owner_id, nome normalizado)
+            trigrams: (trigrama, client_id)
+        """
+        self._clients: List[Tuple[int, str, int]] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._names: Dict[int, str] = {}
+        positions: Dict[int, int] = {}
+        for client_id, name, owner_id, normalized_name in clients:
+            positions[client_id] = len(self._clients)
+            self._clients.append((client_id, name, owner_id))
+            self._by_name.setdefault(normalized_name, []).append(client_id)
+            self._names[client_id] = normalized_name
+
+        postings: Dict[str, List[int]] = {}
+        for trigram, client_id in trigrams:
+            position = positions.get(client_id)
+            if position is not None:
+                postings.setdefault(trigram, []).append(position)
+
+        self._postings = {
+            trigram: np.asarray(items, dtype=np.int32)
+            for trigram, items in postings.items()
+        }
+        self._sizes = np.zeros(len(self._clients), dtype=np.int32)
+        for items in self._postings.values():
+            self._sizes[items] += 1
+
+        # Posição de cada cliente na ordem alfabética (desempate)
+        self._name_rank = np.argsort(
+            np.argsort([name for _, name, _ in self._clients], kind='stable')
+        )
+
+    @classmethod
+    def from_db(cls, db: Session) -> 'ClientNameMatcher':
+        """Carrega o índice dos clientes ativos (duas consultas)"""
+        clients = (
+            db.query(
+                Client.id,
+                Client.name,
+                Client.owner_id,
+                ClientNameIndex.normalized_name,
+            )
+            .join(ClientNameIndex, ClientNameIndex.client_id == Client.id)
+            .filter(Client.is_active.is_(True))
+            .all()
+        )
+        trigrams = db.query(
+            ClientNameTrigram.trigram, ClientNameTrigram.client_id
+        ).all()
+        return cls(clients, trigrams)
+
+    def exact(self, name: Optional[str]) -> List[int]:
+        """IDs dos clientes com o mesmo nome normalizado"""
+        return list(self._by_name.get(normalize_name(name), []))
+
+    def similarity(self, name: Optional[str], client_id: int) -> float:
+        """
+        Similaridade (0 a 1) entre o nome e o nome de um cliente (0 se o
+        cliente não estiver no índice)
+        """
+        normalized_name = self._names.get(client_id)
+        if normalized_name is None:
+            return 0.0
+        return trigram_similarity(
+            name_trigrams(normalize_name(name)),
+            name_trigrams(normalized_name),
+        )
+
+    def match(
+        self,
+        name: Optional[str],
+        limit: int = DEFAULT_MATCH_LIMIT,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna os clientes mais parecidos com o nome, do mais para o menos
+        parecido (nomes iguais após a normalização têm score 1).
+        """
+        query_trigrams = name_trigrams(normalize_name(name))
+        postings = [
+            self._postings[trigram]
+            for trigram in query_trigrams
+            if trigram in self._postings
+        ]
+        if not postings:
+            return []
+
+        shared = np.bincount(
+            np.concatenate(postings), minlength=len(self._clients)
+        )
+        scores = shared / (len(query_trigrams) + self._sizes - shared)
+        candidates = np.flatnonzero((shared > 0) & (scores >= min_score))
+        order = np.lexsort(
+            (self._name_rank[candidates], -scores[candidates])
+        )[:limit]
+
+        return [
+            _match_result(*self._clients[position], float(scores[position]))
+            for position in candidates[order]
+        ]
+
+
+class ClientNameIndexService:
+    """
+    Serviço para manter e consultar o índice de nomes dos clientes (nomes
+    sem acentos e em minúsculas, e seus trigramas).
+
+    O índice é atualizado na mesma transação em que os clientes são criados
+    ou renomeados (refresh_clients). Clientes gravados por outros caminhos
+    são indexados pela migração build_client_name_index na inicialização do
+    banco, ou com rebuild.
+    """
+
+    @staticmethod
+    def refresh_clients(db: Session, client_ids: Iterable[int]) -> None:
+        """
+        Recria as entradas do índice dos clientes informados.
+        Não faz commit (a transação é de quem chama).
+
+        Args:
+            db: Sessão do banco de dados
+            client_ids: IDs dos clientes criados ou alterados
+        """
+        client_ids = list(set(client_ids))
+        if not client_ids:
+            return
+
+        ClientNameIndexService._delete(db, client_ids)
+        clients = db.query(Client.id, Client.name).filter(
+            Client.id.in_(client_ids)
+        )
+        ClientNameIndexService._insert(db, clients)
+
+    @staticmethod
+    def remove_clients(db: Session, client_ids: Iterable[int]) -> None:
+        """
+        Remove as entradas do índice dos clientes informados (antes de
+        excluí-los). Não faz commit.
+
+        Args:
+            db: Sessão do banco de dados
+            client_ids: IDs dos clientes excluídos
+        """
+        client_ids = list(set(client_ids))
+        if client_ids:
+            ClientNameIndexService._delete(db, client_ids)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """
+        Recria o índice de todos os clientes, para reparar as tabelas.
+
+        Args:
+            db: Sessão do banco de dados
+
+        Returns:
+            Quantidade de clientes indexados
+        """
+        db.execute(
+            delete(ClientNameTrigram).execution_options(
+                synchronize_session=False
+            )
+        )
+        db.execute(
+            delete(ClientNameIndex).execution_options(
+                synchronize_session=False
+            )
+        )
+        total = ClientNameIndexService._insert(
+            db, db.query(Client.id, Client.name)
+        )
+        db.commit()
+        return total
+
+    @staticmethod
+    def search_prefix(
+        db: Session, prefix: str, active_only: bool = True
+    ) -> List[Client]:
+        """
+        Busca os clientes cujo nome começa com o prefixo, sem diferenciar
+        acentos e maiúsculas. Usa o índice de normalized_name (consulta por
+        intervalo, sem LIKE).
+
+        Args:
+            db: Sessão do banco de dados
+            prefix: Início do nome
+            active_only: Retornar apenas clientes ativos
+
+        Returns:
+            Clientes encontrados, ordenados pelo nome
+        """
+        normalized_prefix = normalize_name(prefix)
+        query = db.query(Client).join(
+            ClientNameIndex, ClientNameIndex.client_id == Client.id
+        )
+        if normalized_prefix:
+            query = query.filter(
+                ClientNameIndex.normalized_name >= normalized_prefix,
+                ClientNameIndex.normalized_name < normalized_prefix + '\uffff',
+            )
+        if active_only:
+            query = query.filter(Client.is_active.is_(True))
+
+        return query.order_by(ClientNameIndex.normalized_name).all()
+
+    @staticmethod
+    def match(
+        db: Session,
+        name: str,
+        limit: int = DEFAULT_MATCH_LIMIT,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca os clientes ativos com nome parecido (similaridade de
+        trigramas), do mais para o menos parecido (ver match_many).
+
+        Args:
+            db: Sessão do banco de dados
+            name: Nome buscado (ex: nome do pagador de um retorno)
+            limit: Quantidade máxima de clientes retornados
+            min_score: Similaridade mínima (0 a 1)
+
+        Returns:
+            Lista de clientes (client_id, name, owner_id, score)
+        """
+        return ClientNameIndexService.match_many(
+            db, [name], limit, min_score
+        )[0]['matches']
+
+    @staticmethod
+    def match_many(
+        db: Session,
+        names: Iterable[str],
+        limit: int = DEFAULT_MATCH_LIMIT,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca os clientes ativos parecidos com cada um dos nomes. O índice
+        é carregado uma única vez para todos os nomes (ver
+        ClientNameMatcher).
+
+        Args:
+            db: Sessão do banco de dados
+            names: Nomes buscados
+            limit: Quantidade máxima de clientes por nome
+            min_score: Similaridade mínima (0 a 1)
+
+        Returns:
+            Lista com o nome buscado e os clientes encontrados (matches),
+            na ordem dos nomes recebidos
+        """
+        names = list(names)
+        if not names:
+            return []
+
+        matcher = ClientNameMatcher.from_db(db)
+        return [
+            {'name': name, 'matches': matcher.match(name, limit, min_score)}
+            for name in names
+        ]
+
+    @staticmethod
+    def _delete(db: Session, client_ids: List[int]) -> None:
+        """Remove as entradas do índice dos clientes"""
+        for model in (ClientNameTrigram, ClientNameIndex):
+            db.execute(
+                delete(model)
+                .where(model.client_id.in_(client_ids))
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def _insert(db: Session, clients: Iterable[Tuple[int, str]]) -> int:
+        """Grava o nome normalizado e os trigramas dos clientes"""
+        name_rows, trigram_rows = client_name_index_rows(clients)
+        if name_rows:
+            db.execute(insert(ClientNameIndex), name_rows)
+        if trigram_rows:
+            db.execute(insert(ClientNameTrigram), trigram_rows)
+        return len(name_rows)
@@ -6,6 +6,11 @@ from sqlalchemy.orm import Session
 
 from src.secret_garden.database.models import Client
 from src.secret_garden.models.client import ClientCreate, ClientUpdate
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameIndexService
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+from src.secret_garden.services.report_cache import report_cache
 
 
 class ClientService:
@@ -17,8 +22,12 @@ class ClientService:
         db_client = Client(**client_dict, created_at=datetime.now())
 
         db.add(db_client)
+        db.flush()
+        ClientNameIndexService.refresh_clients(db, [db_client.id])
+        OwnerMonthSummaryService.invalidate_owners(db, [db_client.owner_id])
         db.commit()
         db.refresh(db_client)
+        report_cache.invalidate(owner_id=db_client.owner_id)
 
         return db_client
 
@@ -65,13 +74,21 @@ class ClientService:
             return None
 
         update_data = client_data.dict(exclude_unset=True)
+        previous_owner_id = db_client.owner_id
 
         for key, value in update_data.items():
             setattr(db_client, key, value)
 
         db_client.updated_at = datetime.now()
+        if 'name' in update_data:
+            db.flush()
+            ClientNameIndexService.refresh_clients(db, [client_id])
+        OwnerMonthSummaryService.invalidate_owners(
+            db, [previous_owner_id, db_client.owner_id]
+        )
         db.commit()
         db.refresh(db_client)
+        report_cache.invalidate_owners([previous_owner_id, db_client.owner_id])
 
         return db_client
 
@@ -93,7 +110,9 @@ class ClientService:
             
         db_client.is_active = False
         db_client.updated_at = datetime.now()
+        OwnerMonthSummaryService.invalidate_owners(db, [db_client.owner_id])
         db.commit()
+        report_cache.invalidate(owner_id=db_client.owner_id)
         
         return True
 
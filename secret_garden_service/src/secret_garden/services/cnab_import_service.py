@@ -0,0 +1,469 @@
+import logging
+from datetime import date, datetime
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.secret_garden.core.money import from_cents
+from src.secret_garden.database.models import BankReturn, Client
+from src.secret_garden.database.upsert import upsert_statement
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameMatcher
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+from src.secret_garden.services.report_cache import report_cache
+
+logger = logging.getLogger(__name__)
+
+# Layouts suportados (tamanho da linha -> nome do layout)
+CNAB_LAYOUTS = {240: 'cnab240', 400: 'cnab400'}
+
+# Quantidade de títulos gravados por transação
+CNAB_IMPORT_CHUNK_SIZE = 500
+
+# Similaridade mínima do nome do pagador para associar um título a um
+# cliente sem o seu número
+CNAB_PAYER_MIN_SCORE = 0.6
+
+# Campos do retorno bancário gravados pela importação
+IMPORT_FIELDS = (
+    'payer_name',
+    'due_date',
+    'payment_date',
+    'title_amount',
+    'charged_amount',
+    'variation_amount',
+)
+
+# Situação de cada linha de detalhe no relatório da importação
+STATUS_IMPORTED = 'imported'
+STATUS_REPLACED = 'replaced'
+STATUS_UNMATCHED = 'unmatched'
+STATUS_INVALID = 'invalid'
+
+
+def _parse_date(value: str) -> Optional[date]:
+    """Converte DDMMAAAA ou DDMMAA em data (zeros/brancos -> None)"""
+    value = value.strip()
+    if not value or not value.strip('0'):
+        return None
+    date_format = '%d%m%y' if len(value) == 6 else '%d%m%Y'
+    try:
+        return datetime.strptime(value, date_format).date()
+    except ValueError:
+        raise ValueError(f"Data inválida: '{value}'")
+
+
+def _parse_cents(value: str) -> int:
+    """Converte um valor numérico do arquivo (2 casas implícitas) em centavos"""
+    value = value.strip()
+    if value and not value.isdigit():
+        raise ValueError(f"Valor inválido: '{value}'")
+    return int(value) if value else 0
+
+
+def _title(
+    line_number: int,
+    company_number: str,
+    document_number: str,
+    payer_name: str,
+    due_date: Optional[date],
+    payment_date: Optional[date],
+    title_cents: int,
+    paid_cents: int,
+) -> Dict[str, Any]:
+    """Monta o título lido do arquivo (valores em centavos)"""
+    return {
+        'line': line_number,
+        'company_number': company_number.strip(),
+        'document_number': document_number.strip(),
+        'payer_name': payer_name.strip() or None,
+        'due_date': due_date,
+        'payment_date': payment_date,
+        'title_cents': title_cents,
+        'paid_cents': paid_cents,
+    }
+
+
+def _iter_cnab240(lines: Iterator[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os títulos de um retorno CNAB 240 (FEBRABAN).
+
+    Cada título ocupa um segmento T (dados do título) seguido de um segmento U
+    (valores pagos e datas). Os demais registros (headers e trailers) são
+    ignorados.
+    """
+    segment_t = None
+    for line_number, line in lines:
+        # Tipo de registro (posição 8): 3 = detalhe
+        if line[7:8] != '3':
+            continue
+
+        segment = line[13:14]
+        if segment == 'T':
+            if segment_t is not None:
+                yield {
+                    'line': segment_t[0],
+                    'error': 'Segmento T sem o segmento U correspondente',
+                }
+            segment_t = (line_number, line)
+            continue
+        if segment != 'U':
+            continue
+        if segment_t is None:
+            yield {
+                'line': line_number,
+                'error': 'Segmento U sem o segmento T correspondente',
+            }
+            continue
+
+        t_line_number, t_line = segment_t
+        segment_t = None
+        try:
+            yield _title(
+                line_number=t_line_number,
+                company_number=t_line[105:130],
+                document_number=t_line[58:73],
+                payer_name=t_line[148:188],
+                due_date=_parse_date(t_line[73:81]),
+                payment_date=(
+                    _parse_date(line[145:153]) or _parse_date(line[137:145])
+                ),
+                title_cents=_parse_cents(t_line[81:96]),
+                paid_cents=_parse_cents(line[77:92]),
+            )
+        except ValueError as e:
+            yield {'line': t_line_number, 'error': str(e)}
+
+    if segment_t is not None:
+        yield {
+            'line': segment_t[0],
+            'error': 'Segmento T sem o segmento U correspondente',
+        }
+
+
+def _iter_cnab400(lines: Iterator[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os títulos de um retorno CNAB 400.
+
+    Usa as posições comuns aos layouts de retorno dos principais bancos
+    (número de controle da empresa, número do documento, vencimento, valor
+    do título, valor pago e data do crédito). O nome do pagador é lido das
+    posições 325-354, preenchidas apenas pelos bancos que o informam.
+    """
+    for line_number, line in lines:
+        # Tipo de registro (posição 1): 1 = detalhe
+        if line[:1] != '1':
+            continue
+
+        try:
+            yield _title(
+                line_number=line_number,
+                company_number=line[37:62],
+                document_number=line[116:126],
+                payer_name=line[324:354],
+                due_date=_parse_date(line[146:152]),
+                payment_date=(
+                    _parse_date(line[295:301]) or _parse_date(line[110:116])
+                ),
+                title_cents=_parse_cents(line[152:165]),
+                paid_cents=_parse_cents(line[253:266]),
+            )
+        except ValueError as e:
+            yield {'line': line_number, 'error': str(e)}
+
+
+def iter_cnab_titles(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Lê os títulos de um arquivo de retorno CNAB linha a linha.
+
+    O layout (240 ou 400) é identificado pelo tamanho da primeira linha.
+    Títulos que não puderam ser lidos são gerados com a chave 'error'.
+
+    Args:
+        lines: Linhas do arquivo (ex: o próprio arquivo aberto em modo texto)
+
+    Returns:
+        Gerador de títulos, com o número da linha, o "seu número"
+        (company_number: uso da empresa; document_number: número do
+        documento), o nome do pagador, as datas e os
+        valores em centavos
+    """
+    numbered = (
+        (line_number, line.rstrip('\r\n'))
+        for line_number, line in enumerate(lines, start=1)
+    )
+    numbered = (item for item in numbered if item[1].strip())
+
+    first = next(numbered, None)
+    if first is None:
+        return
+
+    layout = CNAB_LAYOUTS.get(len(first[1]))
+    if layout is None:
+        raise ValueError(
+            f'Layout CNAB não reconhecido: linha com {len(first[1])} '
+            'posições (esperado 240 ou 400)'
+        )
+
+    parser = _iter_cnab240 if layout == 'cnab240' else _iter_cnab400
+    yield from parser(chain([first], numbered))
+
+
+class CnabImportService:
+    """Serviço para importar arquivos de retorno bancário CNAB 240/400"""
+
+    @staticmethod
+    def import_file(
+        db: Session,
+        lines: Iterable[str],
+        chunk_size: int = CNAB_IMPORT_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Importa um arquivo de retorno CNAB para a tabela de retornos
+        bancários.
+
+        O arquivo é lido linha a linha e os títulos são gravados em lotes de
+        chunk_size, cada um em uma transação (INSERT ... ON CONFLICT pela
+        chave cliente/mês/ano). O mês/ano do retorno é o do vencimento do
+        título (ou do pagamento, se não houver vencimento).
+
+        O cliente de cada título é o informado no "seu número" (número de
+        controle da empresa ou número do documento, com o ID do cliente),
+        desde que seja um cliente ativo e que o nome do pagador, quando
+        informado, o confirme (similaridade mínima CNAB_PAYER_MIN_SCORE).
+        Caso contrário, o título é associado pelo nome do pagador (sem
+        diferenciar acentos e maiúsculas) ao único cliente ativo com o mesmo
+        nome ou, não havendo nenhum, ao cliente de nome mais parecido (índice
+        de trigramas, similaridade mínima CNAB_PAYER_MIN_SCORE e sem empate).
+        Títulos sem cliente identificado são informados como unmatched.
+
+        Args:
+            db: Sessão do banco de dados
+            lines: Linhas do arquivo
+            chunk_size: Quantidade de títulos por transação
+
+        Returns:
+            Dicionário com os totais por situação e o resultado de cada
+            título (linha, situação, cliente, mês/ano e mensagem)
+        """
+        clients_by_id = {
+            client_id
+            for client_id, in db.query(Client.id).filter(
+                Client.is_active.is_(True)
+            )
+        }
+        matcher = ClientNameMatcher.from_db(db)
+
+        results: List[Dict[str, Any]] = []
+        # Resultado do último título gravado de cada cliente/mês/ano, para
+        # marcar como substituídos os títulos repetidos em lotes diferentes
+        imported: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        titles = iter_cnab_titles(lines)
+        while True:
+            chunk = list(islice(titles, chunk_size))
+            if not chunk:
+                break
+            results.extend(
+                CnabImportService._import_chunk(
+                    db, chunk, clients_by_id, matcher, imported
+                )
+            )
+
+        totals = {
+            status: 0
+            for status in (
+                STATUS_IMPORTED,
+                STATUS_REPLACED,
+                STATUS_UNMATCHED,
+                STATUS_INVALID,
+            )
+        }
+        for result in results:
+            totals[result['status']] += 1
+
+        return {
+            'total_titles': len(results),
+            **totals,
+            'results': results,
+        }
+
+    @staticmethod
+    def _match_client(
+        title: Dict[str, Any],
+        clients_by_id: set,
+        matcher: ClientNameMatcher,
+    ) -> Optional[int]:
+        """
+        Identifica o cliente do título pelo seu número ou pelo pagador.
+
+        Os bancos também usam esses campos para números próprios
+        (sequenciais), então um número igual ao ID de um cliente só é aceito
+        se o nome do pagador, quando informado, confirmar o cliente.
+        """
+        payer_name = (title['payer_name'] or '').strip()
+        for number in (title['company_number'], title['document_number']):
+            if (
+                number.isdigit()
+                and int(number) in clients_by_id
+                and (
+                    not payer_name
+                    or matcher.similarity(payer_name, int(number))
+                    >= CNAB_PAYER_MIN_SCORE
+                )
+            ):
+                return int(number)
+
+        if not payer_name:
+            return None
+
+        exact = matcher.exact(payer_name)
+        if exact:
+            return exact[0] if len(exact) == 1 else None
+
+        matches = matcher.match(
+            payer_name, limit=2, min_score=CNAB_PAYER_MIN_SCORE
+        )
+        if len(matches) == 1 or (
+            len(matches) == 2 and matches[0]['score'] > matches[1]['score']
+        ):
+            return matches[0]['client_id']
+        return None
+
+    @staticmethod
+    def _import_chunk(
+        db: Session,
+        chunk: List[Dict[str, Any]],
+        clients_by_id: set,
+        matcher: ClientNameMatcher,
+        imported: Dict[Tuple[int, int, int], Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Grava um lote de títulos em uma transação.
+
+        imported tem o resultado dos títulos gravados nos lotes anteriores
+        (por cliente/mês/ano): os substituídos por um título deste lote são
+        marcados como replaced, e imported é atualizado com os deste lote.
+        """
+        results = []
+        # Títulos de lotes anteriores substituídos por este lote
+        replaced_before: List[Dict[str, Any]] = []
+        rows: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        row_results: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+        now = datetime.now()
+
+        for title in chunk:
+            if 'error' in title:
+                results.append({
+                    'line': title['line'],
+                    'status': STATUS_INVALID,
+                    'message': title['error'],
+                })
+                continue
+
+            reference_date = title['due_date'] or title['payment_date']
+            if reference_date is None:
+                results.append({
+                    'line': title['line'],
+                    'status': STATUS_INVALID,
+                    'message': 'Título sem data de vencimento ou pagamento',
+                })
+                continue
+
+            client_id = CnabImportService._match_client(
+                title, clients_by_id, matcher
+            )
+            if client_id is None:
+                results.append({
+                    'line': title['line'],
+                    'status': STATUS_UNMATCHED,
+                    'message': (
+                        'Cliente não encontrado (seu número '
+                        f"'{title['document_number'] or title['company_number']}', "
+                        f"pagador '{title['payer_name'] or ''}')"
+                    ),
+                })
+                continue
+
+            key = (client_id, reference_date.month, reference_date.year)
+            result = {
+                'line': title['line'],
+                'status': STATUS_IMPORTED,
+                'client_id': client_id,
+                'month': reference_date.month,
+                'year': reference_date.year,
+                'message': None,
+            }
+
+            # Títulos repetidos no lote: vale o último
+            previous = row_results.get(key)
+            if previous is None and key in imported:
+                previous = imported.pop(key)
+                replaced_before.append(previous)
+            if previous is not None:
+                previous['status'] = STATUS_REPLACED
+                previous['message'] = (
+                    f"Substituído pela linha {title['line']}"
+                )
+
+            rows[key] = {
+                'client_id': client_id,
+                'month': reference_date.month,
+                'year': reference_date.year,
+                'payer_name': title['payer_name'],
+                'due_date': title['due_date'],
+                'payment_date': title['payment_date'],
+                'title_amount': from_cents(title['title_cents']),
+                'charged_amount': from_cents(title['paid_cents']),
+                'variation_amount': from_cents(
+                    title['paid_cents'] - title['title_cents']
+                ),
+                'created_at': now,
+            }
+            row_results[key] = result
+            results.append(result)
+
+        if not rows:
+            return results
+
+        periods: Dict[Tuple[int, int], set] = {}
+        for client_id, month, year in rows:
+            periods.setdefault((month, year), set()).add(client_id)
+
+        try:
+            db.execute(
+                upsert_statement(
+                    db,
+                    BankReturn,
+                    ('client_id', 'month', 'year'),
+                    IMPORT_FIELDS,
+                    updated_at=now,
+                ),
+                list(rows.values()),
+            )
+            for (month, year), client_ids in periods.items():
+                OwnerMonthSummaryService.refresh_clients(
+                    db, client_ids, month, year
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f'Erro ao gravar lote de retornos bancários: {e}')
+            for result in row_results.values():
+                result['status'] = STATUS_INVALID
+                result['message'] = str(e)
+            # Os títulos dos lotes anteriores continuam gravados
+            for previous in replaced_before:
+                previous['status'] = STATUS_IMPORTED
+                previous['message'] = None
+                imported[
+                    (previous['client_id'], previous['month'], previous['year'])
+                ] = previous
+            return results
+
+        imported.update(row_results)
+        for (month, year), client_ids in periods.items():
+            report_cache.invalidate_clients(db, client_ids, month, year)
+
+        return results
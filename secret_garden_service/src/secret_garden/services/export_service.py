@@ -0,0 +1,262 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from src.secret_garden.database.models import (BankReturn, Client,
+                                               MonthlyCalculation,
+                                               MonthlyVariableValues,
+                                               RetornoPagamento)
+
+# Linhas buscadas do banco por vez (e gravadas por bloco na saída)
+EXPORT_BATCH_SIZE = 1000
+
+# Formatos de exportação suportados
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+
+def _transfers_select() -> Any:
+    """Repasses: um item por cálculo mensal de cliente ativo"""
+    return (
+        select(
+            MonthlyCalculation.id,
+            Client.owner_id,
+            Client.id.label('client_id'),
+            Client.name.label('client_name'),
+            MonthlyCalculation.month,
+            MonthlyCalculation.year,
+            Client.due_date,
+            MonthlyCalculation.rent_amount,
+            Client.amount_paid,
+            Client.payment_date,
+            # Condomínio variável tem prioridade sobre o fixo
+            func.coalesce(
+                MonthlyVariableValues.condo_fee, Client.condo_fee
+            ).label('condo_fee'),
+            func.coalesce(
+                MonthlyVariableValues.condo_paid_by_agency,
+                Client.condo_paid,
+                False,
+            ).label('condo_paid_by_agency'),
+            MonthlyCalculation.calculation_base,
+            Client.percentage,
+            MonthlyCalculation.commission,
+            Client.delivery_fee,
+            MonthlyCalculation.deposit_amount,
+            MonthlyCalculation.created_at,
+            MonthlyCalculation.updated_at,
+        )
+        .join(Client, Client.id == MonthlyCalculation.client_id)
+        .outerjoin(
+            MonthlyVariableValues,
+            and_(
+                MonthlyVariableValues.client_id == Client.id,
+                MonthlyVariableValues.month == MonthlyCalculation.month,
+                MonthlyVariableValues.year == MonthlyCalculation.year,
+                Client.has_monthly_variation.is_(True),
+            ),
+        )
+        .where(Client.is_active.is_(True))
+    )
+
+
+def _calculations_select() -> Any:
+    """Cálculos mensais (mesmos campos de /api/monthly-calculations/)"""
+    return select(
+        MonthlyCalculation.id,
+        MonthlyCalculation.client_id,
+        MonthlyCalculation.month,
+        MonthlyCalculation.year,
+        MonthlyCalculation.rent_amount,
+        MonthlyCalculation.calculation_base,
+        MonthlyCalculation.tenant_payment,
+        MonthlyCalculation.commission,
+        MonthlyCalculation.deposit_amount,
+        MonthlyCalculation.created_at,
+        MonthlyCalculation.updated_at,
+    ).join(Client, Client.id == MonthlyCalculation.client_id)
+
+
+def _bank_returns_select() -> Any:
+    """Retornos bancários de clientes ativos"""
+    return (
+        select(
+            BankReturn.id,
+            BankReturn.client_id,
+            Client.name.label('client_name'),
+            BankReturn.month,
+            BankReturn.year,
+            BankReturn.payer_name,
+            BankReturn.due_date,
+            BankReturn.payment_date,
+            BankReturn.title_amount,
+            BankReturn.charged_amount,
+            BankReturn.variation_amount,
+            BankReturn.created_at,
+            BankReturn.updated_at,
+        )
+        .join(Client, Client.id == BankReturn.client_id)
+        .where(Client.is_active.is_(True))
+    )
+
+
+def _retornos_select() -> Any:
+    """Retornos de pagamento (mesmos campos de /api/retornos/)"""
+    return select(
+        RetornoPagamento.id,
+        RetornoPagamento.client_id,
+        RetornoPagamento.month,
+        RetornoPagamento.year,
+        RetornoPagamento.due_date,
+        RetornoPagamento.payment_date,
+        RetornoPagamento.rent_amount,
+        RetornoPagamento.amount_paid,
+        RetornoPagamento.interest,
+        RetornoPagamento.condo_fee,
+        RetornoPagamento.percentage,
+        RetornoPagamento.commission,
+        RetornoPagamento.delivery_fee,
+        RetornoPagamento.condo_paid,
+        RetornoPagamento.owner_payment_amount,
+        RetornoPagamento.processed_at,
+        RetornoPagamento.updated_at,
+    ).join(Client, Client.id == RetornoPagamento.client_id)
+
+
+# Conjuntos de dados exportáveis: nome -> (consulta, modelo com month/year)
+EXPORT_DATASETS = {
+    'transfers': (_transfers_select, MonthlyCalculation),
+    'monthly-calculations': (_calculations_select, MonthlyCalculation),
+    'bank-returns': (_bank_returns_select, BankReturn),
+    'retornos': (_retornos_select, RetornoPagamento),
+}
+
+
+def _format_value(value: Any) -> Any:
+    """Converte datas para ISO 8601 (demais valores ficam como estão)"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """Serviço para exportar dados em CSV ou NDJSON em streaming"""
+
+    @staticmethod
+    def build_query(
+        dataset: str,
+        client_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        start_month: Optional[int] = None,
+        start_year: Optional[int] = None,
+        end_month: Optional[int] = None,
+        end_year: Optional[int] = None,
+    ) -> Any:
+        """
+        Monta a consulta de exportação de um conjunto de dados.
+
+        O período é inclusivo e pode ser aberto em qualquer uma das pontas.
+        Sem mês, o período começa em janeiro do ano inicial e termina em
+        dezembro do ano final.
+
+        Args:
+            dataset: Nome do conjunto de dados (ver EXPORT_DATASETS)
+            client_id: Filtrar por cliente (opcional)
+            owner_id: Filtrar pelos clientes de um proprietário (opcional)
+            start_month: Mês inicial (opcional)
+            start_year: Ano inicial (opcional)
+            end_month: Mês final (opcional)
+            end_year: Ano final (opcional)
+
+        Returns:
+            Consulta ordenada por ano, mês e cliente
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f'Conjunto de dados desconhecido: {dataset}')
+
+        build_select, model = EXPORT_DATASETS[dataset]
+        query = build_select()
+
+        if client_id:
+            query = query.where(Client.id == client_id)
+        if owner_id:
+            query = query.where(Client.owner_id == owner_id)
+
+        period_index = model.year * 12 + (model.month - 1)
+        if start_year:
+            query = query.where(
+                period_index >= start_year * 12 + (start_month or 1) - 1
+            )
+        if end_year:
+            query = query.where(
+                period_index <= end_year * 12 + (end_month or 12) - 1
+            )
+
+        return query.order_by(model.year, model.month, model.client_id)
+
+    @staticmethod
+    def iter_csv(
+        db: Session, query: Any, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[str]:
+        """
+        Gera a exportação em CSV. O cabeçalho e a primeira linha são
+        enviados assim que a consulta retorna e as demais linhas seguem em
+        blocos de batch_size, buscadas com yield_per (sem carregar o
+        resultado inteiro em memória).
+        """
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        try:
+            writer.writerow(list(result.keys()))
+            for index, row in enumerate(result, start=1):
+                writer.writerow([_format_value(value) for value in row])
+                if index == 1 or index % batch_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            result.close()
+
+    @staticmethod
+    def iter_ndjson(
+        db: Session, query: Any, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[str]:
+        """
+        Gera a exportação em NDJSON (um objeto JSON por linha). Como em
+        iter_csv, a primeira linha é enviada imediatamente e as demais em
+        blocos de batch_size buscados com yield_per.
+        """
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        buffer = io.StringIO()
+
+        try:
+            keys = list(result.keys())
+            for index, row in enumerate(result, start=1):
+                buffer.write(
+                    json.dumps(
+                        {
+                            key: _format_value(value)
+                            for key, value in zip(keys, row)
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+                buffer.write('\n')
+                if index == 1 or index % batch_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            result.close()
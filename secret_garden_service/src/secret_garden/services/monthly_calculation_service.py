@@ -1,15 +1,91 @@
 import asyncio
+import hashlib
 import logging
+import os
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy import and_
+from sqlalchemy import and_, create_engine, literal
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from src.secret_garden.database.models import Client, MonthlyCalculation, MonthlyVariableValues
+from src.secret_garden.database.upsert import upsert_statement
+from src.secret_garden.services.calculation_kernel import (
+    OUTPUT_FIELDS, calculate_monthly_values
+)
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+from src.secret_garden.services.report_cache import report_cache
 
 logger = logging.getLogger(__name__)
 
+# Campos de entrada que compõem a impressão digital de um cálculo: valores
+# fixos do cliente e valores variáveis do mês (ver _load_calculation_inputs).
+# Alterar FINGERPRINT_VERSION invalida todas as impressões já gravadas, o que
+# deve ser feito sempre que as fórmulas do cálculo mudarem.
+FINGERPRINT_VERSION = 1
+FINGERPRINT_FIELDS = (
+    'amount_paid',
+    'property_tax',
+    'utilities',
+    'condo_fee',
+    'insurance',
+    'percentage',
+    'delivery_fee',
+    'condo_paid',
+    'variable_id',
+    'water_bill',
+    'gas_bill',
+    'var_property_tax',
+    'var_condo_fee',
+    'var_insurance',
+    'condo_paid_by_agency',
+)
+
+# Linha de entrada do cálculo montada em memória (mesmos campos das linhas
+# retornadas por MonthlyCalculationService._load_calculation_inputs)
+CalculationInput = namedtuple(
+    'CalculationInput', ('id', 'month', 'year') + FINGERPRINT_FIELDS
+)
+
+
+@lru_cache(maxsize=None)
+def _worker_engine(database_url: str) -> Engine:
+    """Engine do banco de dados para um processo worker (um por processo)"""
+    connect_args = (
+        {'check_same_thread': False}
+        if database_url.startswith('sqlite')
+        else {}
+    )
+    return create_engine(database_url, connect_args=connect_args)
+
+
+def _calculate_partition(
+    bind: Union[Engine, str],
+    month: int,
+    year: int,
+    client_ids: List[int],
+    force: bool = False,
+) -> Dict:
+    """
+    Calcula uma partição de clientes com uma sessão própria.
+
+    Executado pelos workers de calculate_for_all_clients_parallel. Recebe a
+    engine (threads) ou a URL do banco (processos).
+    """
+    engine = bind if isinstance(bind, Engine) else _worker_engine(bind)
+    db = Session(bind=engine, autoflush=False)
+    try:
+        return MonthlyCalculationService.calculate_for_all_clients_bulk(
+            db, month, year, client_ids=client_ids, force=force
+        )
+    finally:
+        db.close()
+
 
 class MonthlyCalculationService:
     """Serviço para cálculo financeiro mensal de clientes"""
@@ -72,6 +148,859 @@ class MonthlyCalculationService:
             'message': f'Processamento concluído. {successful} sucessos, {failed} falhas.',
         }
 
+    @staticmethod
+    def calculate_for_all_clients_bulk(
+        db: Session,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        client_ids: Optional[List[int]] = None,
+        force: bool = False,
+    ) -> Dict:
+        """
+        Calcula os valores financeiros mensais de todos os clientes ativos
+        em lote.
+
+        Os valores fixos dos clientes e os valores variáveis do mês são lidos
+        em uma única consulta, os cálculos são feitos em memória de forma
+        vetorizada (ver calculation_kernel) e todas as linhas são gravadas em
+        uma única transação com um INSERT ... ON CONFLICT DO UPDATE em lote,
+        em vez de três consultas e um commit por cliente.
+
+        Cada cálculo guarda uma impressão digital dos seus valores de entrada.
+        Clientes cuja impressão digital não mudou desde o último cálculo são
+        ignorados (e contados em 'skipped'), a menos que force seja True.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês para calcular (1-12). Se não for fornecido, usa o mês atual
+            year: Ano para calcular. Se não for fornecido, usa o ano atual
+            client_ids: Restringe o cálculo a estes clientes (opcional)
+            force: Recalcula também os clientes sem alterações
+
+        Returns:
+            Dict com informações sobre o processamento (mesmo formato de
+            calculate_for_all_clients, com a contagem 'skipped')
+        """
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        rows = MonthlyCalculationService._load_calculation_inputs(
+            db, month, year, client_ids
+        )
+
+        if not rows:
+            return {
+                'total_processed': 0,
+                'successful': 0,
+                'failed': 0,
+                'skipped': 0,
+                'message': 'Nenhum cliente ativo encontrado.',
+            }
+
+        # Impressões digitais dos cálculos já existentes para o mês/ano
+        existing_query = db.query(
+            MonthlyCalculation.client_id,
+            MonthlyCalculation.month,
+            MonthlyCalculation.year,
+            MonthlyCalculation.input_fingerprint,
+        ).filter(
+            MonthlyCalculation.month == month,
+            MonthlyCalculation.year == year,
+        )
+        if client_ids is not None:
+            existing_query = existing_query.filter(
+                MonthlyCalculation.client_id.in_(client_ids)
+            )
+        existing = MonthlyCalculationService._index_existing(existing_query)
+
+        calculation_rows, outcomes = (
+            MonthlyCalculationService._build_calculation_rows(
+                rows, existing, force
+            )
+        )
+        skipped = outcomes.count('skipped')
+        failed = outcomes.count('failed')
+        computed_ids = [row['client_id'] for row in calculation_rows]
+
+        try:
+            if calculation_rows:
+                db.execute(
+                    MonthlyCalculationService._upsert_statement(db),
+                    calculation_rows,
+                )
+                OwnerMonthSummaryService.refresh_clients(
+                    db, computed_ids, month, year
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f'Erro ao gravar cálculos em lote: {str(e)}')
+            failed = len(rows) - skipped
+        else:
+            report_cache.invalidate_clients(db, computed_ids, month, year)
+
+        successful = len(rows) - skipped - failed
+
+        return {
+            'total_processed': len(rows),
+            'successful': successful,
+            'failed': failed,
+            'skipped': skipped,
+            'message': (
+                f'Processamento concluído. {successful} sucessos, '
+                f'{failed} falhas, {skipped} sem alterações.'
+            ),
+        }
+
+    @staticmethod
+    def calculate_for_all_clients_parallel(
+        db: Session,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        force: bool = False,
+    ) -> Dict:
+        """
+        Calcula os valores financeiros mensais de todos os clientes ativos
+        em paralelo.
+
+        Os clientes são particionados por proprietário e cada partição é
+        calculada em lote por um worker com a sua própria sessão. Os
+        resultados são somados no mesmo resumo de calculate_for_all_clients.
+
+        Args:
+            db: Sessão do banco de dados (usada apenas para particionar)
+            month: Mês para calcular (1-12). Se não for fornecido, usa o mês atual
+            year: Ano para calcular. Se não for fornecido, usa o ano atual
+            max_workers: Número de workers (padrão: número de CPUs)
+            use_processes: Usa um pool de processos em vez de threads
+            force: Recalcula também os clientes sem alterações
+
+        Returns:
+            Dict com informações sobre o processamento
+        """
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        max_workers = max_workers or os.cpu_count() or 1
+        partitions = MonthlyCalculationService._partition_clients_by_owner(
+            db, max_workers
+        )
+
+        if not partitions:
+            return {
+                'total_processed': 0,
+                'successful': 0,
+                'failed': 0,
+                'skipped': 0,
+                'message': 'Nenhum cliente ativo encontrado.',
+            }
+
+        engine = db.get_bind()
+        if use_processes:
+            executor_class = ProcessPoolExecutor
+            bind = engine.url.render_as_string(hide_password=False)
+        else:
+            executor_class = ThreadPoolExecutor
+            bind = engine
+
+        total_processed = 0
+        successful = 0
+        failed = 0
+        skipped = 0
+
+        with executor_class(max_workers=len(partitions)) as executor:
+            futures = {
+                executor.submit(
+                    _calculate_partition, bind, month, year, client_ids, force
+                ): client_ids
+                for client_ids in partitions
+            }
+
+            for future, client_ids in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(
+                        f'Erro ao calcular partição de {len(client_ids)} '
+                        f'clientes: {str(e)}'
+                    )
+                    total_processed += len(client_ids)
+                    failed += len(client_ids)
+                    continue
+
+                total_processed += result['total_processed']
+                successful += result['successful']
+                failed += result['failed']
+                skipped += result['skipped']
+
+        # Os workers em outros processos não têm acesso ao cache deste
+        if use_processes and successful:
+            report_cache.invalidate(month=month, year=year)
+
+        return {
+            'total_processed': total_processed,
+            'successful': successful,
+            'failed': failed,
+            'skipped': skipped,
+            'message': (
+                f'Processamento concluído. {successful} sucessos, '
+                f'{failed} falhas, {skipped} sem alterações.'
+            ),
+        }
+
+    @staticmethod
+    def calculate_for_period_range(
+        db: Session,
+        start_month: int,
+        start_year: int,
+        end_month: int,
+        end_year: int,
+        client_ids: Optional[List[int]] = None,
+        owner_ids: Optional[List[int]] = None,
+        force: bool = False,
+        chunk_size: int = 1000,
+    ) -> Dict:
+        """
+        Calcula os valores financeiros de todos os meses de um período de
+        uma só vez (ex: ao cadastrar um cliente com data de início antiga).
+
+        Clientes, valores variáveis e cálculos existentes do período são
+        lidos em três consultas, todos os cálculos cliente/mês são feitos em
+        uma única passada e as linhas são gravadas em uma transação por bloco
+        de chunk_size linhas. Meses anteriores à data de início (start_date)
+        do cliente são ignorados.
+
+        Args:
+            db: Sessão do banco de dados
+            start_month: Mês inicial (1-12)
+            start_year: Ano inicial
+            end_month: Mês final (1-12), inclusive
+            end_year: Ano final
+            client_ids: Restringe o cálculo a estes clientes (inclui clientes
+                inativos informados explicitamente)
+            owner_ids: Restringe o cálculo aos clientes destes proprietários
+            force: Recalcula também os meses sem alterações
+            chunk_size: Número de linhas gravadas por transação
+
+        Returns:
+            Dict com os totais do processamento e as contagens por mês em
+            'periods'
+        """
+        start_index = start_year * 12 + start_month - 1
+        end_index = end_year * 12 + end_month - 1
+        if end_index < start_index:
+            raise ValueError('O período final não pode ser anterior ao inicial.')
+
+        periods = [
+            (index % 12 + 1, index // 12)
+            for index in range(start_index, end_index + 1)
+        ]
+
+        # Filtro de clientes usado nas três consultas
+        client_filters = []
+        if client_ids is not None:
+            client_filters.append(Client.id.in_(client_ids))
+        else:
+            client_filters.append(Client.is_active.is_(True))
+        if owner_ids is not None:
+            client_filters.append(Client.owner_id.in_(owner_ids))
+
+        clients = (
+            db.query(
+                Client.id,
+                Client.owner_id,
+                Client.start_date,
+                Client.has_monthly_variation,
+                Client.amount_paid,
+                Client.property_tax,
+                Client.utilities,
+                Client.condo_fee,
+                Client.insurance,
+                Client.percentage,
+                Client.delivery_fee,
+                Client.condo_paid,
+            )
+            .filter(*client_filters)
+            .order_by(Client.id)
+            .all()
+        )
+        owner_by_client = {client.id: client.owner_id for client in clients}
+
+        period_index = MonthlyVariableValues.year * 12 + (
+            MonthlyVariableValues.month - 1
+        )
+        variable_values = {
+            (row.client_id, row.month, row.year): row
+            for row in db.query(MonthlyVariableValues)
+            .join(Client, Client.id == MonthlyVariableValues.client_id)
+            .filter(
+                period_index.between(start_index, end_index),
+                Client.has_monthly_variation.is_(True),
+                *client_filters,
+            )
+        }
+
+        calculation_index = MonthlyCalculation.year * 12 + (
+            MonthlyCalculation.month - 1
+        )
+        existing = MonthlyCalculationService._index_existing(
+            db.query(
+                MonthlyCalculation.client_id,
+                MonthlyCalculation.month,
+                MonthlyCalculation.year,
+                MonthlyCalculation.input_fingerprint,
+            )
+            .join(Client, Client.id == MonthlyCalculation.client_id)
+            .filter(
+                calculation_index.between(start_index, end_index),
+                *client_filters,
+            )
+        )
+
+        # Montar as linhas de entrada de cada cliente/mês
+        rows: List[CalculationInput] = []
+        for client in clients:
+            first_index = start_index
+            if client.start_date:
+                first_index = max(
+                    start_index,
+                    client.start_date.year * 12 + client.start_date.month - 1,
+                )
+
+            for month, year in periods:
+                if year * 12 + month - 1 < first_index:
+                    continue
+
+                variable = variable_values.get((client.id, month, year))
+                rows.append(
+                    CalculationInput(
+                        id=client.id,
+                        month=month,
+                        year=year,
+                        amount_paid=client.amount_paid,
+                        property_tax=client.property_tax,
+                        utilities=client.utilities,
+                        condo_fee=client.condo_fee,
+                        insurance=client.insurance,
+                        percentage=client.percentage,
+                        delivery_fee=client.delivery_fee,
+                        condo_paid=client.condo_paid,
+                        variable_id=variable.id if variable else None,
+                        water_bill=variable.water_bill if variable else None,
+                        gas_bill=variable.gas_bill if variable else None,
+                        var_property_tax=(
+                            variable.property_tax if variable else None
+                        ),
+                        var_condo_fee=variable.condo_fee if variable else None,
+                        var_insurance=variable.insurance if variable else None,
+                        condo_paid_by_agency=(
+                            variable.condo_paid_by_agency if variable else None
+                        ),
+                    )
+                )
+
+        calculation_rows, outcomes = (
+            MonthlyCalculationService._build_calculation_rows(
+                rows, existing, force
+            )
+        )
+
+        # Contagens por mês
+        counts = {
+            (month, year): {
+                'month': month,
+                'year': year,
+                'total_processed': 0,
+                'successful': 0,
+                'failed': 0,
+                'skipped': 0,
+            }
+            for month, year in periods
+        }
+        for row, outcome in zip(rows, outcomes):
+            period = counts[(row.month, row.year)]
+            period['total_processed'] += 1
+            if outcome == 'computed':
+                period['successful'] += 1
+            else:
+                period[outcome] += 1
+
+        # Gravar em blocos, uma transação por bloco
+        upsert = MonthlyCalculationService._upsert_statement(db)
+        for start in range(0, len(calculation_rows), chunk_size):
+            chunk = calculation_rows[start:start + chunk_size]
+            clients_by_period = defaultdict(list)
+            for row in chunk:
+                clients_by_period[(row['month'], row['year'])].append(
+                    row['client_id']
+                )
+            try:
+                db.execute(upsert, chunk)
+                for (period_month, period_year), period_client_ids in (
+                    clients_by_period.items()
+                ):
+                    OwnerMonthSummaryService.refresh_clients(
+                        db, period_client_ids, period_month, period_year
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f'Erro ao gravar bloco de cálculos: {str(e)}')
+                for period, period_client_ids in clients_by_period.items():
+                    counts[period]['successful'] -= len(period_client_ids)
+                    counts[period]['failed'] += len(period_client_ids)
+            else:
+                for (period_month, period_year), period_client_ids in (
+                    clients_by_period.items()
+                ):
+                    report_cache.invalidate_owners(
+                        (
+                            owner_by_client[client_id]
+                            for client_id in period_client_ids
+                        ),
+                        period_month,
+                        period_year,
+                    )
+
+        period_counts = list(counts.values())
+        total_processed = sum(p['total_processed'] for p in period_counts)
+        successful = sum(p['successful'] for p in period_counts)
+        failed = sum(p['failed'] for p in period_counts)
+        skipped = sum(p['skipped'] for p in period_counts)
+
+        return {
+            'total_processed': total_processed,
+            'successful': successful,
+            'failed': failed,
+            'skipped': skipped,
+            'message': (
+                f'Processamento concluído. {successful} sucessos, '
+                f'{failed} falhas, {skipped} sem alterações.'
+            ),
+            'periods': period_counts,
+        }
+
+    @staticmethod
+    def preview_calculations(
+        db: Session, month: Optional[int] = None, year: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Simula o cálculo mensal de todos os clientes ativos sem gravar nada.
+
+        Lê as entradas e os cálculos já gravados em uma única consulta,
+        calcula os novos valores em lote e compara com os valores gravados.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês para simular (1-12). Se não for fornecido, usa o mês atual
+            year: Ano para simular. Se não for fornecido, usa o ano atual
+
+        Returns:
+            Dict com as contagens, os campos alterados de cada cliente em
+            'changes' (valor atual, novo valor e diferença) e as diferenças
+            agregadas por campo em 'totals'
+        """
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        rows = MonthlyCalculationService._load_calculation_inputs(
+            db, month, year, with_stored=True
+        )
+
+        columns: Dict[str, List[Any]] = {}
+        for row in rows:
+            inputs = MonthlyCalculationService._resolve_inputs(row)
+            for field, value in inputs.items():
+                columns.setdefault(field, []).append(value)
+
+        results = calculate_monthly_values(**columns) if rows else {}
+
+        totals = {
+            field: {'current': 0.0, 'new': 0.0, 'delta': 0.0}
+            for field in OUTPUT_FIELDS
+        }
+        changes: List[Dict[str, Any]] = []
+        new_clients = 0
+
+        for index, row in enumerate(rows):
+            is_new = row.calculation_id is None
+            new_clients += is_new
+
+            fields = {}
+            for field in OUTPUT_FIELDS:
+                new_value = float(results[field][index])
+                current = getattr(row, f'stored_{field}')
+
+                totals[field]['current'] += current or 0
+                totals[field]['new'] += new_value
+
+                if current is None or round(current, 2) != new_value:
+                    fields[field] = {
+                        'current': current,
+                        'new': new_value,
+                        'delta': round(new_value - (current or 0), 2),
+                    }
+
+            if fields:
+                changes.append({
+                    'client_id': row.id,
+                    'calculation_id': row.calculation_id,
+                    'is_new': is_new,
+                    'fields': fields,
+                })
+
+        for field_totals in totals.values():
+            field_totals['current'] = round(field_totals['current'], 2)
+            field_totals['new'] = round(field_totals['new'], 2)
+            field_totals['delta'] = round(
+                field_totals['new'] - field_totals['current'], 2
+            )
+
+        return {
+            'month': month,
+            'year': year,
+            'total_clients': len(rows),
+            'changed_clients': len(changes),
+            'new_clients': new_clients,
+            'unchanged_clients': len(rows) - len(changes),
+            'changes': changes,
+            'totals': totals,
+        }
+
+    @staticmethod
+    def _partition_clients_by_owner(
+        db: Session, partitions: int
+    ) -> List[List[int]]:
+        """
+        Divide os clientes ativos em até `partitions` grupos de tamanho
+        parecido, sem separar os clientes de um mesmo proprietário.
+
+        Args:
+            db: Sessão do banco de dados
+            partitions: Número máximo de grupos
+
+        Returns:
+            Lista de listas de IDs de clientes
+        """
+        clients_by_owner: Dict[int, List[int]] = defaultdict(list)
+        for client_id, owner_id in (
+            db.query(Client.id, Client.owner_id)
+            .filter(Client.is_active.is_(True))
+            .all()
+        ):
+            clients_by_owner[owner_id].append(client_id)
+
+        # Distribuir os maiores proprietários primeiro no grupo menos cheio
+        groups: List[List[int]] = [[] for _ in range(partitions)]
+        for client_ids in sorted(
+            clients_by_owner.values(), key=len, reverse=True
+        ):
+            min(groups, key=len).extend(client_ids)
+
+        return [group for group in groups if group]
+
+    @staticmethod
+    def _index_existing(query: Any) -> Dict[tuple, Optional[str]]:
+        """
+        Indexa os cálculos existentes por (client_id, mês, ano).
+
+        Args:
+            query: Consulta com client_id, month, year e input_fingerprint
+
+        Returns:
+            Dicionário (client_id, mês, ano) -> impressão digital
+        """
+        return {
+            (client_id, month, year): fingerprint
+            for client_id, month, year, fingerprint in query
+        }
+
+    @staticmethod
+    def _upsert_statement(db: Session) -> Any:
+        """
+        Monta o INSERT ... ON CONFLICT DO UPDATE dos cálculos mensais,
+        usando o índice único (client_id, month, year). Pode ser executado
+        com uma lista de linhas geradas por _build_calculation_rows.
+        """
+        return upsert_statement(
+            db,
+            MonthlyCalculation,
+            index_elements=('client_id', 'month', 'year'),
+            update_columns=OUTPUT_FIELDS + ('input_fingerprint',),
+            updated_at=datetime.now(),
+        )
+
+    @staticmethod
+    def _build_calculation_rows(
+        rows: List[Any], existing: Dict[tuple, Optional[str]], force: bool
+    ) -> tuple:
+        """
+        Calcula os valores de um conjunto de linhas de entrada (uma por
+        cliente/mês) e monta as linhas a gravar com _upsert_statement.
+
+        Args:
+            rows: Linhas de entrada com id, month, year e os campos de
+                FINGERPRINT_FIELDS
+            existing: Cálculos existentes indexados por _index_existing
+            force: Recalcula também as linhas sem alterações
+
+        Returns:
+            Tupla (linhas a gravar, resultados), em que resultados tem,
+            para cada linha de entrada, 'computed', 'skipped' ou 'failed'
+        """
+        computed: List[tuple] = []
+        columns: Dict[str, List[Any]] = {}
+        outcomes: List[str] = []
+
+        for row in rows:
+            key = (row.id, row.month, row.year)
+            fingerprint = MonthlyCalculationService._fingerprint_inputs(row)
+            if (
+                not force
+                and key in existing
+                and existing[key] == fingerprint
+            ):
+                outcomes.append('skipped')
+                continue
+
+            try:
+                inputs = MonthlyCalculationService._resolve_inputs(row)
+            except Exception as e:
+                outcomes.append('failed')
+                logger.error(
+                    f'Erro ao calcular para cliente {row.id} no mês '
+                    f'{row.month}/{row.year}: {str(e)}'
+                )
+                continue
+
+            outcomes.append('computed')
+            computed.append((key, fingerprint))
+            for field, value in inputs.items():
+                columns.setdefault(field, []).append(value)
+
+        # Calcular todas as linhas de uma vez
+        results = calculate_monthly_values(**columns) if computed else {}
+
+        now = datetime.now()
+        calculation_rows: List[Dict[str, Any]] = []
+
+        for index, ((client_id, month, year), fingerprint) in enumerate(
+            computed
+        ):
+            calculation_rows.append({
+                'client_id': client_id,
+                'month': month,
+                'year': year,
+                **{
+                    field: float(results[field][index])
+                    for field in OUTPUT_FIELDS
+                },
+                'input_fingerprint': fingerprint,
+                'created_at': now,
+            })
+
+        return calculation_rows, outcomes
+
+    @staticmethod
+    def _load_calculation_inputs(
+        db: Session,
+        month: int,
+        year: int,
+        client_ids: Optional[List[int]] = None,
+        with_stored: bool = False,
+    ) -> List:
+        """
+        Busca, em uma única consulta, os valores fixos de todos os clientes
+        ativos junto com os valores variáveis do mês (quando o cliente tem
+        variação mensal).
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12)
+            year: Ano
+            client_ids: Restringe a busca a estes clientes (opcional)
+            with_stored: Inclui o cálculo já gravado para o mês (colunas
+                calculation_id e stored_<campo>)
+
+        Returns:
+            Lista de linhas com os campos de entrada do cálculo
+        """
+        query = (
+            db.query(
+                Client.id,
+                literal(month).label('month'),
+                literal(year).label('year'),
+                Client.amount_paid,
+                Client.property_tax,
+                Client.utilities,
+                Client.condo_fee,
+                Client.insurance,
+                Client.percentage,
+                Client.delivery_fee,
+                Client.condo_paid,
+                MonthlyVariableValues.id.label('variable_id'),
+                MonthlyVariableValues.water_bill,
+                MonthlyVariableValues.gas_bill,
+                MonthlyVariableValues.property_tax.label('var_property_tax'),
+                MonthlyVariableValues.condo_fee.label('var_condo_fee'),
+                MonthlyVariableValues.insurance.label('var_insurance'),
+                MonthlyVariableValues.condo_paid_by_agency,
+            )
+            .outerjoin(
+                MonthlyVariableValues,
+                and_(
+                    MonthlyVariableValues.client_id == Client.id,
+                    MonthlyVariableValues.month == month,
+                    MonthlyVariableValues.year == year,
+                    Client.has_monthly_variation.is_(True),
+                ),
+            )
+            .filter(Client.is_active.is_(True))
+        )
+
+        if client_ids is not None:
+            query = query.filter(Client.id.in_(client_ids))
+
+        if with_stored:
+            query = query.outerjoin(
+                MonthlyCalculation,
+                and_(
+                    MonthlyCalculation.client_id == Client.id,
+                    MonthlyCalculation.month == month,
+                    MonthlyCalculation.year == year,
+                ),
+            ).add_columns(
+                MonthlyCalculation.id.label('calculation_id'),
+                *(
+                    getattr(MonthlyCalculation, field).label(f'stored_{field}')
+                    for field in OUTPUT_FIELDS
+                ),
+            )
+
+        return query.order_by(Client.id).all()
+
+    @staticmethod
+    def _resolve_inputs(row: Any) -> Dict[str, Any]:
+        """
+        Aplica os valores variáveis do mês sobre os valores fixos do cliente,
+        com as mesmas regras de _calculate_for_client.
+
+        Args:
+            row: Linha retornada por _load_calculation_inputs
+
+        Returns:
+            Dicionário com os argumentos de _compute_values (e colunas de
+            calculate_monthly_values)
+        """
+        property_tax = row.property_tax or 0
+        utilities = row.utilities or 0
+        condo_fee = row.condo_fee or 0
+        insurance = row.insurance or 0
+        condo_paid = row.condo_paid
+
+        if row.variable_id is not None:
+            if row.var_property_tax is not None:
+                property_tax = row.var_property_tax
+            if row.water_bill is not None or row.gas_bill is not None:
+                utilities = (row.water_bill or 0) + (row.gas_bill or 0)
+            if row.var_condo_fee is not None:
+                condo_fee = row.var_condo_fee
+            if row.var_insurance is not None:
+                insurance = row.var_insurance
+            if row.condo_paid_by_agency is not None:
+                condo_paid = row.condo_paid_by_agency
+
+        return {
+            'amount_paid': row.amount_paid or 0,
+            'property_tax': property_tax,
+            'utilities': utilities,
+            'condo_fee': condo_fee,
+            'insurance': insurance,
+            'percentage': row.percentage or 0,
+            'delivery_fee': row.delivery_fee or 0,
+            'condo_paid': condo_paid,
+        }
+
+    @staticmethod
+    def _fingerprint_inputs(row: Any) -> str:
+        """
+        Calcula a impressão digital dos valores de entrada de um cliente.
+
+        Args:
+            row: Linha retornada por _load_calculation_inputs
+
+        Returns:
+            Hash hexadecimal de 32 caracteres
+        """
+        payload = repr(
+            (FINGERPRINT_VERSION,)
+            + tuple(getattr(row, field) for field in FINGERPRINT_FIELDS)
+        )
+        return hashlib.blake2b(
+            payload.encode('utf-8'), digest_size=16
+        ).hexdigest()
+
+    @staticmethod
+    def _compute_values(
+        amount_paid: float,
+        property_tax: float,
+        utilities: float,
+        condo_fee: float,
+        insurance: float,
+        percentage: float,
+        delivery_fee: float,
+        condo_paid: Optional[bool],
+    ) -> Dict[str, float]:
+        """
+        Aplica as fórmulas do cálculo mensal a um conjunto de valores de
+        entrada já resolvidos.
+
+        Returns:
+            Dicionário com rent_amount, calculation_base, tenant_payment,
+            commission e deposit_amount
+        """
+        # Valor do aluguel = Valor pago + IPTU + Água/Gás
+        rent_amount = round(amount_paid + property_tax + utilities, 2)
+
+        # Base de cálculo = IPTU + Água/Gás + Condomínio + Seguro
+        calculation_base = round(
+            property_tax + utilities + condo_fee + insurance, 2
+        )
+
+        # Valor pago pelo locatário = Valor aluguel - Base cálculo
+        tenant_payment = round(rent_amount - calculation_base, 2)
+
+        # Comissão = Valor pago pelo locatário * (Percentual / 100)
+        commission = round(tenant_payment * (percentage / 100), 2)
+
+        # Valor depósito = Valor aluguel - Comissão - Taxa envio - Condo pago
+        deposit_amount = round(
+            rent_amount
+            - commission
+            - delivery_fee
+            - (condo_fee if condo_paid else 0),
+            2,
+        )
+
+        return {
+            'rent_amount': rent_amount,
+            'calculation_base': calculation_base,
+            'tenant_payment': tenant_payment,
+            'commission': commission,
+            'deposit_amount': deposit_amount,
+        }
+
     @staticmethod
     async def _calculate_for_client(
         db: Session, client: Client, month: int, year: int
@@ -89,19 +1018,6 @@ class MonthlyCalculationService:
             True se o cálculo foi bem-sucedido, False caso contrário
         """
         try:
-            # Verificar se já existe um cálculo para este cliente/mês/ano
-            existing = (
-                db.query(MonthlyCalculation)
-                .filter(
-                    and_(
-                        MonthlyCalculation.client_id == client.id,
-                        MonthlyCalculation.month == month,
-                        MonthlyCalculation.year == year,
-                    )
-                )
-                .first()
-            )
-
             # Definir valores padrão (valores fixos do cliente)
             property_tax = client.property_tax or 0
             utilities = client.utilities or 0
@@ -143,63 +1059,36 @@ class MonthlyCalculationService:
                         condo_paid = variable_values.condo_paid_by_agency
 
             # Calcular os valores
-            # Valor do aluguel = Valor pago + IPTU + Água/Gás
-            rent_amount = round(
-                (client.amount_paid or 0)
-                + property_tax
-                + utilities,
-                2,
-            )
-
-            # Base de cálculo = IPTU + Água/Gás + Condomínio + Seguro
-            calculation_base = round(
-                property_tax
-                + utilities
-                + condo_fee
-                + insurance,
-                2,
-            )
-
-            # Valor pago pelo locatário = Valor aluguel - Base cálculo
-            tenant_payment = round(rent_amount - calculation_base, 2)
-
-            # Comissão = Valor pago pelo locatário * (Percentual / 100)
-            commission = round(
-                tenant_payment * ((client.percentage or 0) / 100), 2
-            )
-
-            # Valor depósito = Valor aluguel - Comissão - Taxa envio - Condo pago
-            deposit_amount = round(
-                rent_amount
-                - commission
-                - (client.delivery_fee or 0)
-                - (condo_fee if condo_paid else 0),
-                2,
-            )
-
-            # Se já existe, atualizar
-            if existing:
-                existing.rent_amount = rent_amount
-                existing.calculation_base = calculation_base
-                existing.tenant_payment = tenant_payment
-                existing.commission = commission
-                existing.deposit_amount = deposit_amount
-                existing.updated_at = datetime.now()
-            else:
-                # Se não existe, criar novo
-                new_calculation = MonthlyCalculation(
-                    client_id=client.id,
-                    month=month,
-                    year=year,
-                    rent_amount=rent_amount,
-                    calculation_base=calculation_base,
-                    tenant_payment=tenant_payment,
-                    commission=commission,
-                    deposit_amount=deposit_amount,
-                )
-                db.add(new_calculation)
+            values = MonthlyCalculationService._compute_values(
+                amount_paid=client.amount_paid or 0,
+                property_tax=property_tax,
+                utilities=utilities,
+                condo_fee=condo_fee,
+                insurance=insurance,
+                percentage=client.percentage or 0,
+                delivery_fee=client.delivery_fee or 0,
+                condo_paid=condo_paid,
+            )
 
+            # Criar ou atualizar o cálculo do cliente/mês/ano em um único
+            # comando (sem impressão digital, o próximo cálculo em lote
+            # recalcula este cliente)
+            db.execute(
+                MonthlyCalculationService._upsert_statement(db),
+                [{
+                    'client_id': client.id,
+                    'month': month,
+                    'year': year,
+                    **values,
+                    'input_fingerprint': None,
+                    'created_at': datetime.now(),
+                }],
+            )
+            OwnerMonthSummaryService.refresh_owners(
+                db, [client.owner_id], month, year
+            )
             db.commit()
+            report_cache.invalidate(client.owner_id, month, year)
             return True
 
         except Exception as e:
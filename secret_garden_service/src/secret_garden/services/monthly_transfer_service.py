@@ -1,12 +1,16 @@
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from itertools import groupby
+from operator import attrgetter
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Query, Session
 
+from src.secret_garden.core.money import from_cents, to_cents
 from src.secret_garden.database.models import (
-    Client, MonthlyCalculation, MonthlyVariableValues
+    Client, MonthlyCalculation, MonthlyVariableValues, Owner
 )
+from src.secret_garden.services.report_cache import report_cache
 
 
 class MonthlyTransferService:
@@ -22,6 +26,9 @@ class MonthlyTransferService:
         """
         Retorna os dados de repasse mensal para um proprietário específico.
 
+        O resultado fica em cache até que os dados do proprietário/mês sejam
+        alterados.
+
         Args:
             db: Sessão do banco de dados
             owner_id: ID do proprietário
@@ -37,136 +44,414 @@ class MonthlyTransferService:
             month = month or now.month
             year = year or now.year
 
-        # Buscar todos os clientes ativos do proprietário
-        clients = (
-            db.query(Client)
-            .filter(
-                Client.owner_id == owner_id,
-                Client.is_active.is_(True)
-            )
+        cache_key = ('transfers', owner_id, month, year)
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(owner_id, month, year)
+
+        # Buscar, em uma única consulta, os clientes ativos do proprietário
+        # com o cálculo e os valores variáveis do mês
+        rows = (
+            MonthlyTransferService._transfer_rows_query(db, month, year)
+            .filter(Client.owner_id == owner_id)
             .all()
         )
 
-        if not clients:
-            return {
-                "data": [],
-                "summary": {
-                    "total_rent": 0,
-                    "total_commission": 0,
-                    "total_condo_fees": 0,
-                    "total_delivery_fees": 0,
-                    "total_deposit": 0,
-                    "total_properties": 0
-                },
+        transfer_items, summary = MonthlyTransferService._build_report(
+            rows, month, year
+        )
+
+        result = {
+            "data": transfer_items,
+            "summary": summary,
+            "metadata": {
+                "owner_id": owner_id,
+                "month": month,
+                "year": year,
+                "generated_at": datetime.now()
+            }
+        }
+        report_cache.set(cache_key, result, generation)
+        return result
+
+    @staticmethod
+    def iter_all_owner_transfers(
+        db: Session,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Gera os repasses mensais de todos os proprietários em uma única
+        passada pelos dados.
+
+        Os clientes de todos os proprietários são lidos em uma única consulta,
+        ordenada por proprietário e buscada em lotes de batch_size linhas, de
+        modo que apenas os clientes de um proprietário ficam em memória por
+        vez. Proprietários sem clientes ativos não são incluídos.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês para filtrar (opcional)
+            year: Ano para filtrar (opcional)
+            batch_size: Quantidade de linhas buscadas por vez
+
+        Returns:
+            Iterador com um repasse por proprietário, no mesmo formato de
+            get_owner_transfers (com o nome do proprietário nos metadados)
+        """
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        rows = (
+            MonthlyTransferService._transfer_rows_query(db, month, year)
+            .join(Owner, Owner.id == Client.owner_id)
+            .add_columns(Owner.name.label("owner_name"))
+            .order_by(None)
+            .order_by(Client.owner_id, Client.id)
+            .yield_per(batch_size)
+        )
+
+        generated_at = datetime.now()
+        for owner_id, owner_rows in groupby(rows, key=attrgetter("owner_id")):
+            owner_rows = list(owner_rows)
+            transfer_items, summary = MonthlyTransferService._build_report(
+                owner_rows, month, year
+            )
+
+            yield {
+                "data": transfer_items,
+                "summary": summary,
                 "metadata": {
                     "owner_id": owner_id,
+                    "owner_name": owner_rows[0].owner_name,
                     "month": month,
                     "year": year,
-                    "generated_at": datetime.now()
+                    "generated_at": generated_at
                 }
             }
 
-        # Lista para armazenar os dados de repasse
-        transfer_items = []
-        
-        # Variáveis para o resumo
-        summary = {
-            "total_rent": 0,
-            "total_commission": 0,
-            "total_condo_fees": 0,
-            "total_delivery_fees": 0,
-            "total_deposit": 0,
-            "total_properties": len(clients)
-        }
+    @staticmethod
+    def get_owner_transfer_history(
+        db: Session,
+        owner_id: int,
+        start_month: int,
+        start_year: int,
+        end_month: int,
+        end_year: int
+    ) -> Dict[str, Any]:
+        """
+        Retorna o histórico de repasses de um proprietário em um período.
 
-        # Para cada cliente, buscar os cálculos e valores variáveis do mês
-        for client in clients:
-            # Buscar cálculo mensal
-            calculation = (
-                db.query(MonthlyCalculation)
-                .filter(
-                    and_(
-                        MonthlyCalculation.client_id == client.id,
-                        MonthlyCalculation.month == month,
-                        MonthlyCalculation.year == year
-                    )
-                )
-                .first()
-            )
+        Os itens de repasse de todos os meses e os totais de cada mês,
+        acumulados no período (running_totals) e acumulados no ano
+        (year_to_date) vêm de uma única consulta, com os totais calculados
+        por funções de janela no banco.
 
-            # Buscar valores variáveis se o cliente tiver variação mensal
-            variable_values = None
-            if client.has_monthly_variation:
-                variable_values = (
-                    db.query(MonthlyVariableValues)
-                    .filter(
-                        and_(
-                            MonthlyVariableValues.client_id == client.id,
-                            MonthlyVariableValues.month == month,
-                            MonthlyVariableValues.year == year
-                        )
-                    )
-                    .first()
-                )
+        Args:
+            db: Sessão do banco de dados
+            owner_id: ID do proprietário
+            start_month: Mês inicial (1-12)
+            start_year: Ano inicial
+            end_month: Mês final (1-12)
+            end_year: Ano final
 
-            # Se encontrou cálculo, criar item de repasse
-            if calculation:
-                # Determinar valor do condomínio (fixo ou variável)
-                condo_fee = (
-                    variable_values.condo_fee
-                    if variable_values and variable_values.condo_fee is not None
-                    else client.condo_fee
-                )
+        Returns:
+            Dicionário com um item por mês com repasse (totais e imóveis),
+            resumo do período e metadados
+        """
+        start_index = start_year * 12 + start_month - 1
+        end_index = end_year * 12 + end_month - 1
+        if end_index < start_index:
+            raise ValueError('O período final não pode ser anterior ao inicial.')
 
-                # Determinar se condomínio é pago pela imobiliária
-                condo_paid = (
-                    variable_values.condo_paid_by_agency
-                    if variable_values and variable_values.condo_paid_by_agency is not None
-                    else client.condo_paid
-                )
+        year = MonthlyCalculation.year
+        month = MonthlyCalculation.month
+        condo_fee = func.coalesce(
+            MonthlyVariableValues.condo_fee, Client.condo_fee
+        )
+        amounts = {
+            "total_rent": MonthlyCalculation.rent_amount,
+            "total_commission": MonthlyCalculation.commission,
+            "total_condo_fees": condo_fee,
+            "total_delivery_fees": Client.delivery_fee,
+            "total_deposit": MonthlyCalculation.deposit_amount,
+        }
+        # Totais do mês, acumulados no período (inclui todos os imóveis do
+        # mês atual, que são pares na ordenação) e acumulados no ano
+        windows = {
+            "month": {"partition_by": [year, month]},
+            "running": {"order_by": [year, month]},
+            "ytd": {"partition_by": [year], "order_by": [month]},
+        }
+        window_columns = [
+            func.coalesce(func.sum(expression).over(**window), 0)
+            .label(f"{name}_{field}")
+            for name, window in windows.items()
+            for field, expression in amounts.items()
+        ]
 
-                # Garantir que condo_paid seja sempre um booleano
-                condo_paid = bool(condo_paid) if condo_paid is not None else False
+        rows = (
+            db.query(
+                MonthlyCalculation.id,
+                Client.id.label("client_id"),
+                Client.name,
+                month,
+                year,
+                Client.due_date,
+                MonthlyCalculation.rent_amount,
+                Client.amount_paid,
+                Client.payment_date,
+                condo_fee.label("condo_fee"),
+                MonthlyVariableValues.condo_paid_by_agency,
+                Client.condo_paid,
+                MonthlyCalculation.calculation_base,
+                Client.percentage,
+                MonthlyCalculation.commission,
+                Client.delivery_fee,
+                MonthlyCalculation.deposit_amount,
+                MonthlyCalculation.created_at,
+                MonthlyCalculation.updated_at,
+                func.count().over(partition_by=[year, month])
+                .label("month_calculated_properties"),
+                *window_columns,
+            )
+            .join(Client, Client.id == MonthlyCalculation.client_id)
+            .outerjoin(
+                MonthlyVariableValues,
+                and_(
+                    MonthlyVariableValues.client_id == Client.id,
+                    MonthlyVariableValues.month == month,
+                    MonthlyVariableValues.year == year,
+                    Client.has_monthly_variation.is_(True)
+                )
+            )
+            .filter(
+                Client.owner_id == owner_id,
+                Client.is_active.is_(True),
+                (year * 12 + month - 1).between(start_index, end_index)
+            )
+            .order_by(year, month, Client.id)
+            .all()
+        )
 
-                transfer_item = {
-                    "id": calculation.id,
-                    "tenant": {
-                        "id": client.id,
-                        "name": client.name
-                    },
-                    "month": month,
-                    "year": year,
-                    "due_date": client.due_date,
-                    "rent_amount": calculation.rent_amount,
-                    "amount_paid": client.amount_paid,
-                    "payment_date": client.payment_date,
-                    "condo_fee": condo_fee,
-                    "condo_paid_by_agency": condo_paid,
-                    "calculation_base": calculation.calculation_base,
-                    "percentage": client.percentage,
-                    "commission": calculation.commission,
-                    "delivery_fee": client.delivery_fee,
-                    "deposit_amount": calculation.deposit_amount,
-                    "created_at": calculation.created_at,
-                    "updated_at": calculation.updated_at
+        periods = []
+        for (period_year, period_month), period_rows in groupby(
+            rows, key=attrgetter("year", "month")
+        ):
+            period_rows = list(period_rows)
+            first = period_rows[0]
+            window_totals = {
+                name: {
+                    field: getattr(first, f"{name}_{field}")
+                    for field in amounts
                 }
+                for name in windows
+            }
 
-                transfer_items.append(transfer_item)
+            periods.append({
+                "month": period_month,
+                "year": period_year,
+                "totals": {
+                    **window_totals["month"],
+                    "calculated_properties": first.month_calculated_properties
+                },
+                "running_totals": window_totals["running"],
+                "year_to_date": window_totals["ytd"],
+                "properties": [
+                    {
+                        "id": row.id,
+                        "tenant": {
+                            "id": row.client_id,
+                            "name": row.name
+                        },
+                        "month": row.month,
+                        "year": row.year,
+                        "due_date": row.due_date,
+                        "rent_amount": row.rent_amount,
+                        "amount_paid": row.amount_paid,
+                        "payment_date": row.payment_date,
+                        "condo_fee": row.condo_fee,
+                        "condo_paid_by_agency": bool(
+                            row.condo_paid_by_agency
+                            if row.condo_paid_by_agency is not None
+                            else row.condo_paid
+                        ),
+                        "calculation_base": row.calculation_base,
+                        "percentage": row.percentage,
+                        "commission": row.commission,
+                        "delivery_fee": row.delivery_fee,
+                        "deposit_amount": row.deposit_amount,
+                        "created_at": row.created_at,
+                        "updated_at": row.updated_at
+                    }
+                    for row in period_rows
+                ]
+            })
 
-                # Atualizar resumo
-                summary["total_rent"] += calculation.rent_amount
-                summary["total_commission"] += calculation.commission
-                summary["total_condo_fees"] += (condo_fee or 0)
-                summary["total_delivery_fees"] += (client.delivery_fee or 0)
-                summary["total_deposit"] += calculation.deposit_amount
+        # Resumo do período: total acumulado do último mês
+        summary = {field: 0.0 for field in amounts}
+        if periods:
+            summary = dict(periods[-1]["running_totals"])
+        summary["calculated_properties"] = len(
+            {row.client_id for row in rows}
+        )
 
         return {
-            "data": transfer_items,
+            "data": periods,
             "summary": summary,
             "metadata": {
                 "owner_id": owner_id,
-                "month": month,
-                "year": year,
+                "start_month": start_month,
+                "start_year": start_year,
+                "end_month": end_month,
+                "end_year": end_year,
                 "generated_at": datetime.now()
             }
-        } 
\ No newline at end of file
+        }
+
+    @staticmethod
+    def _transfer_rows_query(db: Session, month: int, year: int) -> Query:
+        """
+        Monta a consulta dos clientes ativos com o cálculo mensal e os valores
+        variáveis do mês (quando o cliente tem variação mensal).
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12)
+            year: Ano
+
+        Returns:
+            Consulta com uma linha por cliente, ordenada pelo ID do cliente
+        """
+        return (
+            db.query(
+                Client.id,
+                Client.owner_id,
+                Client.name,
+                Client.due_date,
+                Client.amount_paid,
+                Client.payment_date,
+                Client.condo_fee,
+                Client.condo_paid,
+                Client.percentage,
+                Client.delivery_fee,
+                MonthlyCalculation.id.label("calculation_id"),
+                MonthlyCalculation.rent_amount,
+                MonthlyCalculation.calculation_base,
+                MonthlyCalculation.commission,
+                MonthlyCalculation.deposit_amount,
+                MonthlyCalculation.created_at,
+                MonthlyCalculation.updated_at,
+                MonthlyVariableValues.condo_fee.label("var_condo_fee"),
+                MonthlyVariableValues.condo_paid_by_agency,
+            )
+            .outerjoin(
+                MonthlyCalculation,
+                and_(
+                    MonthlyCalculation.client_id == Client.id,
+                    MonthlyCalculation.month == month,
+                    MonthlyCalculation.year == year
+                )
+            )
+            .outerjoin(
+                MonthlyVariableValues,
+                and_(
+                    MonthlyVariableValues.client_id == Client.id,
+                    MonthlyVariableValues.month == month,
+                    MonthlyVariableValues.year == year,
+                    Client.has_monthly_variation.is_(True)
+                )
+            )
+            .filter(Client.is_active.is_(True))
+            .order_by(Client.id)
+        )
+
+    @staticmethod
+    def _build_report(
+        rows: List[Any], month: int, year: int
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Monta os itens de repasse e o resumo a partir das linhas de
+        _transfer_rows_query.
+
+        Args:
+            rows: Linhas de um proprietário (uma por cliente ativo)
+            month: Mês do repasse
+            year: Ano do repasse
+
+        Returns:
+            Tupla (itens de repasse, resumo)
+        """
+        # Lista para armazenar os dados de repasse
+        transfer_items = []
+
+        # Variáveis para o resumo (somadas em centavos, sem erro de arredondamento)
+        totals = {
+            "total_rent": 0,
+            "total_commission": 0,
+            "total_condo_fees": 0,
+            "total_delivery_fees": 0,
+            "total_deposit": 0
+        }
+
+        for row in rows:
+            # Clientes sem cálculo no mês não entram no repasse
+            if row.calculation_id is None:
+                continue
+
+            # Determinar valor do condomínio (fixo ou variável)
+            condo_fee = (
+                row.var_condo_fee
+                if row.var_condo_fee is not None
+                else row.condo_fee
+            )
+
+            # Determinar se condomínio é pago pela imobiliária
+            condo_paid = (
+                row.condo_paid_by_agency
+                if row.condo_paid_by_agency is not None
+                else row.condo_paid
+            )
+
+            # Garantir que condo_paid seja sempre um booleano
+            condo_paid = bool(condo_paid) if condo_paid is not None else False
+
+            transfer_items.append({
+                "id": row.calculation_id,
+                "tenant": {
+                    "id": row.id,
+                    "name": row.name
+                },
+                "month": month,
+                "year": year,
+                "due_date": row.due_date,
+                "rent_amount": row.rent_amount,
+                "amount_paid": row.amount_paid,
+                "payment_date": row.payment_date,
+                "condo_fee": condo_fee,
+                "condo_paid_by_agency": condo_paid,
+                "calculation_base": row.calculation_base,
+                "percentage": row.percentage,
+                "commission": row.commission,
+                "delivery_fee": row.delivery_fee,
+                "deposit_amount": row.deposit_amount,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at
+            })
+
+            # Atualizar resumo
+            totals["total_rent"] += to_cents(row.rent_amount or 0)
+            totals["total_commission"] += to_cents(row.commission or 0)
+            totals["total_condo_fees"] += to_cents(condo_fee or 0)
+            totals["total_delivery_fees"] += to_cents(row.delivery_fee or 0)
+            totals["total_deposit"] += to_cents(row.deposit_amount or 0)
+
+        summary = {key: from_cents(cents) for key, cents in totals.items()}
+        summary["total_properties"] = len(rows)
+
+        return transfer_items, summary
@@ -1,14 +1,38 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import and_, exists, insert, literal, or_, select
 from sqlalchemy.orm import Session
 
 from src.secret_garden.database.models import (
     Client, MonthlyVariableValues
 )
+from src.secret_garden.database.upsert import upsert_statement
 from src.secret_garden.models.monthly_variable_values import (
     MonthlyVariableValuesCreate, MonthlyVariableValuesUpdate
 )
+from src.secret_garden.services.bulk_items import (BULK_UPDATED,
+                                                   bulk_totals,
+                                                   clients_by_period,
+                                                   prepare_bulk_items)
+from src.secret_garden.services.monthly_calculation_service import \
+    MonthlyCalculationService
+from src.secret_garden.services.owner_month_summary_service import \
+    OwnerMonthSummaryService
+from src.secret_garden.services.report_cache import report_cache
+
+# Campos que precisam ser preenchidos todo mês (ver
+# check_and_create_pending_values)
+PENDING_VALUE_FIELDS = (
+    'water_bill', 'gas_bill', 'insurance', 'property_tax', 'condo_fee'
+)
+
+# Campos gravados pelo lote (substituem todos os valores do mês, como em
+# create_or_update_monthly_values)
+BULK_FIELDS = PENDING_VALUE_FIELDS + ('condo_paid_by_agency',)
+
+# Linhas gravadas por comando INSERT ... ON CONFLICT
+BULK_CHUNK_SIZE = 500
 
 
 class MonthlyVariableValuesService:
@@ -99,8 +123,17 @@ class MonthlyVariableValuesService:
             # Se existir, atualizar os valores
             for field, value in monthly_values.dict(exclude={'client_id'}).items():
                 setattr(existing_values, field, value)
+            db.flush()
+            OwnerMonthSummaryService.refresh_clients(
+                db, [monthly_values.client_id],
+                monthly_values.month, monthly_values.year
+            )
             db.commit()
             db.refresh(existing_values)
+            report_cache.invalidate_clients(
+                db, [monthly_values.client_id],
+                monthly_values.month, monthly_values.year
+            )
             return existing_values
 
         # Se não existir, criar novo registro
@@ -116,10 +149,129 @@ class MonthlyVariableValuesService:
             condo_paid_by_agency=monthly_values.condo_paid_by_agency
         )
         db.add(db_monthly_values)
+        db.flush()
+        OwnerMonthSummaryService.refresh_clients(
+            db, [monthly_values.client_id],
+            monthly_values.month, monthly_values.year
+        )
         db.commit()
         db.refresh(db_monthly_values)
+        report_cache.invalidate_clients(
+            db, [monthly_values.client_id],
+            monthly_values.month, monthly_values.year
+        )
         return db_monthly_values
 
+    @staticmethod
+    def bulk_upsert_monthly_values(
+        db: Session,
+        items: List[Dict[str, Any]],
+        recalculate: bool = False,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Cria ou atualiza os valores variáveis de vários clientes (a planilha
+        do mês) em uma única transação.
+
+        As linhas (MonthlyVariableValuesCreate) são validadas em uma
+        passagem e gravadas com um INSERT ... ON CONFLICT (client_id, month,
+        year) DO UPDATE por lote de chunk_size linhas. Como em
+        create_or_update_monthly_values, todos os valores do mês são
+        substituídos nos registros existentes.
+
+        Linhas inválidas (campos inválidos ou cliente inexistente) não
+        impedem a gravação das demais. Se o mesmo cliente/mês/ano aparecer
+        mais de uma vez, vale a última linha (ver prepare_bulk_items).
+
+        Args:
+            db: Sessão do banco de dados
+            items: Linhas a gravar
+            recalculate: Recalcula, após a gravação, os cálculos mensais dos
+                clientes gravados (apenas eles)
+            chunk_size: Linhas por comando de gravação
+
+        Returns:
+            Dicionário com os totais por situação, o resultado de cada linha
+            (índice, situação, ID do registro, cliente, mês/ano e mensagem) e
+            o resultado do recálculo de cada mês/ano (se solicitado)
+        """
+        results, valid = prepare_bulk_items(
+            db, items, MonthlyVariableValuesCreate
+        )
+
+        now = datetime.now()
+        rows = [
+            {
+                'client_id': parsed.client_id,
+                'month': parsed.month,
+                'year': parsed.year,
+                **parsed.model_dump(include=set(BULK_FIELDS)),
+                'created_at': now,
+            }
+            for parsed, _ in valid.values()
+        ]
+        periods = clients_by_period(valid)
+
+        try:
+            # Usa a tabela (e não o modelo): com RETURNING, o upsert pelo
+            # ORM é executado linha a linha, e pelo Core, em um único
+            # comando por lote. Registros criados voltam sem updated_at (só
+            # a atualização o preenche), o que distingue criados de
+            # atualizados
+            table = MonthlyVariableValues.__table__
+            stmt = upsert_statement(
+                db,
+                table,
+                ('client_id', 'month', 'year'),
+                BULK_FIELDS,
+                updated_at=now,
+            ).returning(
+                table.c.id,
+                table.c.client_id,
+                table.c.month,
+                table.c.year,
+                table.c.updated_at,
+            )
+            for start in range(0, len(rows), chunk_size):
+                written = db.execute(stmt, rows[start:start + chunk_size])
+                for values_id, client_id, month, year, updated_at in written:
+                    result = valid[(client_id, month, year)][1]
+                    result['id'] = values_id
+                    if updated_at is not None:
+                        result['status'] = BULK_UPDATED
+
+            for (month, year), period_clients in periods.items():
+                OwnerMonthSummaryService.refresh_clients(
+                    db, period_clients, month, year
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+        for (month, year), period_clients in periods.items():
+            report_cache.invalidate_clients(db, period_clients, month, year)
+
+        recalculation = None
+        if recalculate:
+            recalculation = [
+                {
+                    'month': month,
+                    'year': year,
+                    **MonthlyCalculationService.calculate_for_all_clients_bulk(
+                        db, month, year, client_ids=sorted(period_clients)
+                    ),
+                }
+                for (month, year), period_clients in sorted(periods.items())
+            ]
+
+        return {
+            'total_items': len(results),
+            **bulk_totals(results),
+            'results': results,
+            'recalculation': recalculation,
+        }
+
     @staticmethod
     def update_monthly_values(
         db: Session,
@@ -152,8 +304,15 @@ class MonthlyVariableValuesService:
         for field, value in monthly_values.dict(exclude_unset=True).items():
             setattr(db_monthly_values, field, value)
             
+        db.flush()
+        OwnerMonthSummaryService.refresh_clients(
+            db, [client_id], db_monthly_values.month, db_monthly_values.year
+        )
         db.commit()
         db.refresh(db_monthly_values)
+        report_cache.invalidate_clients(
+            db, [client_id], db_monthly_values.month, db_monthly_values.year
+        )
         return db_monthly_values
 
     @staticmethod
@@ -183,7 +342,10 @@ class MonthlyVariableValuesService:
             return False
             
         db.delete(db_monthly_values)
+        db.flush()
+        OwnerMonthSummaryService.refresh_clients(db, [client_id], month, year)
         db.commit()
+        report_cache.invalidate_clients(db, [client_id], month, year)
         return True
 
     @staticmethod
@@ -227,6 +389,11 @@ class MonthlyVariableValuesService:
         (has_monthly_variation=True) e cria registros vazios para o mês atual
         se ainda não existirem.
         
+        Os registros que faltam são criados por um único INSERT ... SELECT
+        (clientes sem registro no mês, por anti-join), e os campos vazios de
+        todos os clientes são verificados no banco (IS NULL) em uma consulta,
+        sem consultas por cliente.
+        
         Args:
             db: Sessão do banco de dados
             current_month: Mês atual (opcional, padrão usa o mês atual)
@@ -240,76 +407,75 @@ class MonthlyVariableValuesService:
             today = datetime.now()
             current_month = current_month or today.month
             current_year = current_year or today.year
-            
-        # Buscar todos os clientes ativos com variação mensal
-        clients_with_variation = db.query(Client).filter(
+
+        pending_client = (
             Client.is_active.is_(True),
-            Client.has_monthly_variation.is_(True)
-        ).all()
-        
-        # Lista de clientes com valores pendentes
-        pending_clients = []
-        
-        for client in clients_with_variation:
-            # Verificar se já existe registro para este mês/ano
-            existing_values = MonthlyVariableValuesService.get_monthly_value(
-                db, client.id, current_month, current_year
-            )
-            
-            campos_verificados = [
-                "water_bill", "gas_bill", "insurance", 
-                "property_tax", "condo_fee"
-            ]
-            
-            # Se não existir, criar um registro vazio
-            if not existing_values:
-                # Criar valores padrão vazios
-                new_values = MonthlyVariableValuesCreate(
-                    client_id=client.id,
-                    month=current_month,
-                    year=current_year,
-                    water_bill=None,
-                    gas_bill=None,
-                    insurance=None,
-                    property_tax=None,
-                    condo_fee=None,
-                    condo_paid_by_agency=False
+            Client.has_monthly_variation.is_(True),
+        )
+        values_of_month = and_(
+            MonthlyVariableValues.client_id == Client.id,
+            MonthlyVariableValues.month == current_month,
+            MonthlyVariableValues.year == current_year,
+        )
+
+        # Criar registros vazios para os clientes sem registro no mês
+        missing_clients = select(
+            Client.id,
+            literal(current_month),
+            literal(current_year),
+            literal(False),
+            literal(datetime.now()),
+        ).where(*pending_client, ~exists().where(values_of_month))
+        try:
+            created_ids = db.execute(
+                insert(MonthlyVariableValues)
+                .from_select(
+                    [
+                        'client_id', 'month', 'year',
+                        'condo_paid_by_agency', 'created_at',
+                    ],
+                    missing_clients,
                 )
-                
-                # Criar o registro no banco
-                MonthlyVariableValuesService.create_or_update_monthly_values(
-                    db, new_values
+                .returning(MonthlyVariableValues.client_id)
+            ).scalars().all()
+            if created_ids:
+                OwnerMonthSummaryService.refresh_clients(
+                    db, created_ids, current_month, current_year
                 )
-                
-                # Adicionar à lista de pendentes
-                client_info = {
-                    "id": client.id,
-                    "name": client.name,
-                    "owner_id": client.owner_id,
-                    "month": current_month,
-                    "year": current_year,
-                    "needs_filling": True,
-                    "empty_fields": campos_verificados.copy()
-                }
-                pending_clients.append(client_info)
-            else:
-                # Verificar quais campos estão vazios
-                campos_vazios = []
-                for campo in campos_verificados:
-                    if getattr(existing_values, campo) is None:
-                        campos_vazios.append(campo)
-                
-                # Se houver campos vazios, adicionar à lista de pendentes
-                if campos_vazios:
-                    client_info = {
-                        "id": client.id,
-                        "name": client.name,
-                        "owner_id": client.owner_id,
-                        "month": current_month,
-                        "year": current_year,
-                        "needs_filling": True,
-                        "empty_fields": campos_vazios
-                    }
-                    pending_clients.append(client_info)
-                
-        return pending_clients 
\ No newline at end of file
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+        if created_ids:
+            report_cache.invalidate_clients(
+                db, created_ids, current_month, current_year
+            )
+
+        # Verificar quais campos estão vazios (no banco)
+        empty_flags = [
+            getattr(MonthlyVariableValues, campo).is_(None).label(campo)
+            for campo in PENDING_VALUE_FIELDS
+        ]
+        rows = (
+            db.query(Client.id, Client.name, Client.owner_id, *empty_flags)
+            .join(MonthlyVariableValues, values_of_month)
+            .filter(*pending_client, or_(*empty_flags))
+            .order_by(Client.id)
+            .all()
+        )
+
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "owner_id": row.owner_id,
+                "month": current_month,
+                "year": current_year,
+                "needs_filling": True,
+                "empty_fields": [
+                    campo for campo in PENDING_VALUE_FIELDS
+                    if getattr(row, campo)
+                ]
+            }
+            for row in rows
+        ]
@@ -0,0 +1,377 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import (and_, case, delete, func, insert, literal, select,
+                        true, union)
+from sqlalchemy.orm import Session, aliased
+
+from src.secret_garden.database.models import (BankReturn, Client,
+                                               MonthlyCalculation,
+                                               MonthlyVariableValues, Owner,
+                                               OwnerMonthSummary)
+
+# Totais do repasse (mesmos campos do resumo de MonthlyTransferService)
+TRANSFER_FIELDS = (
+    'total_rent',
+    'total_commission',
+    'total_condo_fees',
+    'total_delivery_fees',
+    'total_deposit',
+    'total_properties',
+)
+
+# Totais dos retornos bancários (mesmos campos do resumo de BankReturnService)
+BANK_RETURN_FIELDS = (
+    'total_title_amount',
+    'total_charged_amount',
+    'total_variation_amount',
+    'total_returns',
+)
+
+
+class OwnerMonthSummaryService:
+    """
+    Serviço para manter a tabela owner_month_summary, com os totais de
+    repasse e de retornos bancários de cada proprietário/mês.
+
+    Os serviços que gravam cálculos mensais, retornos bancários e valores
+    variáveis atualizam, na mesma transação, apenas as linhas dos
+    proprietários/mês afetados (refresh_clients/refresh_owners). Alterações
+    em clientes afetam todos os meses do proprietário e removem as suas linhas
+    (invalidate_owners), que são recalculadas na próxima leitura.
+    """
+
+    @staticmethod
+    def refresh_owners(
+        db: Session, owner_ids: Iterable[int], month: int, year: int
+    ) -> None:
+        """
+        Recalcula o resumo dos proprietários informados no mês/ano.
+        Não faz commit (a transação é de quem chama).
+
+        Args:
+            db: Sessão do banco de dados
+            owner_ids: IDs dos proprietários
+            month: Mês (1-12)
+            year: Ano
+        """
+        owner_ids = list(set(owner_ids))
+        if not owner_ids:
+            return
+
+        OwnerMonthSummaryService._refresh(db, month, year, owner_ids)
+
+    @staticmethod
+    def refresh_clients(
+        db: Session, client_ids: Iterable[int], month: int, year: int
+    ) -> None:
+        """
+        Recalcula o resumo dos proprietários dos clientes informados no
+        mês/ano. Não faz commit (a transação é de quem chama).
+
+        Args:
+            db: Sessão do banco de dados
+            client_ids: IDs dos clientes alterados
+            month: Mês (1-12)
+            year: Ano
+        """
+        client_ids = list(set(client_ids))
+        if not client_ids:
+            return
+
+        changed_client = aliased(Client)
+        owners_of_clients = select(changed_client.owner_id).where(
+            changed_client.id.in_(client_ids)
+        )
+        OwnerMonthSummaryService._refresh(db, month, year, owners_of_clients)
+
+    @staticmethod
+    def invalidate_owners(db: Session, owner_ids: Iterable[int]) -> None:
+        """
+        Remove os resumos de todos os meses dos proprietários informados
+        (usado quando os dados de um cliente mudam). Os resumos são
+        recalculados na próxima leitura. Não faz commit.
+
+        Args:
+            db: Sessão do banco de dados
+            owner_ids: IDs dos proprietários
+        """
+        owner_ids = list(set(owner_ids))
+        if not owner_ids:
+            return
+
+        db.execute(
+            delete(OwnerMonthSummary)
+            .where(OwnerMonthSummary.owner_id.in_(owner_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def get_summary(
+        db: Session, owner_id: int, month: int, year: int
+    ) -> Dict[str, Any]:
+        """
+        Retorna o resumo de um proprietário no mês/ano, calculando e gravando
+        a linha caso ela ainda não exista.
+
+        Args:
+            db: Sessão do banco de dados
+            owner_id: ID do proprietário
+            month: Mês (1-12)
+            year: Ano
+
+        Returns:
+            Dicionário com os totais de repasse e de retornos bancários
+        """
+        query = db.query(OwnerMonthSummary).filter(
+            OwnerMonthSummary.owner_id == owner_id,
+            OwnerMonthSummary.month == month,
+            OwnerMonthSummary.year == year,
+        )
+
+        summary = query.first()
+        if summary is None:
+            OwnerMonthSummaryService.refresh_owners(
+                db, [owner_id], month, year
+            )
+            db.commit()
+            summary = query.first()
+
+        if summary is None:
+            # Proprietário sem clientes ativos
+            return OwnerMonthSummaryService._empty_summary(
+                owner_id, month, year
+            )
+
+        return OwnerMonthSummaryService._summary_to_dict(summary)
+
+    @staticmethod
+    def list_month_summaries(
+        db: Session, month: int, year: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Retorna os resumos de todos os proprietários com clientes ativos no
+        mês/ano, calculando em uma única consulta os que ainda não existem.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12)
+            year: Ano
+
+        Returns:
+            Lista de resumos (com o nome do proprietário), ordenada pelo ID
+            do proprietário
+        """
+        materialized = select(OwnerMonthSummary.owner_id).where(
+            OwnerMonthSummary.month == month,
+            OwnerMonthSummary.year == year,
+        )
+        inserted = OwnerMonthSummaryService._insert_summaries(
+            db, month, year, Client.owner_id.notin_(materialized)
+        )
+        if inserted:
+            db.commit()
+
+        rows = (
+            db.query(OwnerMonthSummary, Owner.name)
+            .join(Owner, Owner.id == OwnerMonthSummary.owner_id)
+            .filter(
+                OwnerMonthSummary.month == month,
+                OwnerMonthSummary.year == year,
+            )
+            .order_by(OwnerMonthSummary.owner_id)
+            .all()
+        )
+
+        return [
+            {
+                **OwnerMonthSummaryService._summary_to_dict(summary),
+                'owner_name': owner_name,
+            }
+            for summary, owner_name in rows
+        ]
+
+    @staticmethod
+    def rebuild(
+        db: Session, month: Optional[int] = None, year: Optional[int] = None
+    ) -> int:
+        """
+        Recria os resumos a partir dos cálculos e retornos bancários, para
+        reparar a tabela. Sem mês/ano, recria todos os meses que têm cálculos
+        ou retornos bancários.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12) (opcional, junto com year)
+            year: Ano (opcional, junto com month)
+
+        Returns:
+            Quantidade de resumos gravados
+        """
+        if month and year:
+            periods = [(month, year)]
+            db.execute(
+                delete(OwnerMonthSummary)
+                .where(
+                    OwnerMonthSummary.month == month,
+                    OwnerMonthSummary.year == year,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            periods = db.execute(
+                union(
+                    select(MonthlyCalculation.month, MonthlyCalculation.year),
+                    select(BankReturn.month, BankReturn.year),
+                )
+            ).all()
+            db.execute(
+                delete(OwnerMonthSummary)
+                .execution_options(synchronize_session=False)
+            )
+
+        total = 0
+        for period_month, period_year in periods:
+            total += OwnerMonthSummaryService._insert_summaries(
+                db, period_month, period_year, true()
+            )
+
+        db.commit()
+        return total
+
+    @staticmethod
+    def _refresh(db: Session, month: int, year: int, owner_ids: Any) -> None:
+        """
+        Remove e recalcula as linhas do mês dos proprietários informados
+        (lista de IDs ou subconsulta)
+        """
+        db.execute(
+            delete(OwnerMonthSummary)
+            .where(
+                OwnerMonthSummary.month == month,
+                OwnerMonthSummary.year == year,
+                OwnerMonthSummary.owner_id.in_(owner_ids),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        OwnerMonthSummaryService._insert_summaries(
+            db, month, year, Client.owner_id.in_(owner_ids)
+        )
+
+    @staticmethod
+    def _insert_summaries(
+        db: Session, month: int, year: int, owner_filter: Any
+    ) -> int:
+        """
+        Calcula, em uma única instrução INSERT ... SELECT, os resumos do
+        mês/ano dos proprietários (com clientes ativos) que atendem ao filtro.
+
+        Os totais seguem as mesmas regras dos relatórios: os valores do
+        repasse somam apenas os clientes com cálculo no mês (o condomínio
+        variável tem prioridade sobre o fixo) e total_properties conta todos
+        os clientes ativos.
+
+        Returns:
+            Quantidade de linhas gravadas
+        """
+        has_calculation = MonthlyCalculation.id.isnot(None)
+
+        totals = (
+            select(
+                Client.owner_id,
+                literal(month),
+                literal(year),
+                func.coalesce(func.sum(MonthlyCalculation.rent_amount), 0),
+                func.coalesce(func.sum(MonthlyCalculation.commission), 0),
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (
+                                has_calculation,
+                                func.coalesce(
+                                    MonthlyVariableValues.condo_fee,
+                                    Client.condo_fee,
+                                ),
+                            )
+                        )
+                    ),
+                    0,
+                ),
+                func.coalesce(
+                    func.sum(case((has_calculation, Client.delivery_fee))), 0
+                ),
+                func.coalesce(func.sum(MonthlyCalculation.deposit_amount), 0),
+                func.count(Client.id),
+                func.coalesce(func.sum(BankReturn.title_amount), 0),
+                func.coalesce(func.sum(BankReturn.charged_amount), 0),
+                func.coalesce(func.sum(BankReturn.variation_amount), 0),
+                func.count(BankReturn.id),
+                literal(datetime.now()),
+            )
+            .select_from(Client)
+            .outerjoin(
+                MonthlyCalculation,
+                and_(
+                    MonthlyCalculation.client_id == Client.id,
+                    MonthlyCalculation.month == month,
+                    MonthlyCalculation.year == year,
+                ),
+            )
+            .outerjoin(
+                MonthlyVariableValues,
+                and_(
+                    MonthlyVariableValues.client_id == Client.id,
+                    MonthlyVariableValues.month == month,
+                    MonthlyVariableValues.year == year,
+                    Client.has_monthly_variation.is_(True),
+                ),
+            )
+            .outerjoin(
+                BankReturn,
+                and_(
+                    BankReturn.client_id == Client.id,
+                    BankReturn.month == month,
+                    BankReturn.year == year,
+                ),
+            )
+            .where(Client.is_active.is_(True), owner_filter)
+            .group_by(Client.owner_id)
+        )
+
+        columns = (
+            ['owner_id', 'month', 'year']
+            + list(TRANSFER_FIELDS)
+            + list(BANK_RETURN_FIELDS)
+            + ['updated_at']
+        )
+        result = db.execute(
+            insert(OwnerMonthSummary).from_select(columns, totals)
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _summary_to_dict(summary: OwnerMonthSummary) -> Dict[str, Any]:
+        """Converte uma linha de owner_month_summary em dicionário"""
+        return {
+            'owner_id': summary.owner_id,
+            'month': summary.month,
+            'year': summary.year,
+            **{
+                field: getattr(summary, field)
+                for field in TRANSFER_FIELDS + BANK_RETURN_FIELDS
+            },
+            'updated_at': summary.updated_at,
+        }
+
+    @staticmethod
+    def _empty_summary(owner_id: int, month: int, year: int) -> Dict[str, Any]:
+        """Resumo zerado de um proprietário sem clientes ativos"""
+        return {
+            'owner_id': owner_id,
+            'month': month,
+            'year': year,
+            **{
+                field: 0 for field in TRANSFER_FIELDS + BANK_RETURN_FIELDS
+            },
+            'updated_at': None,
+        }
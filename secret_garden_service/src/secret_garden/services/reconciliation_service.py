@@ -0,0 +1,348 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from src.secret_garden.core.money import from_cents, to_cents
+from src.secret_garden.database.models import (BankReturn, Client,
+                                               MonthlyCalculation,
+                                               ReconciliationResult)
+
+# Situações da conciliação de um cliente no mês
+STATUS_MATCHED = 'matched'
+STATUS_UNDERPAID = 'underpaid'
+STATUS_OVERPAID = 'overpaid'
+STATUS_MISSING_RETURN = 'missing_return'
+STATUS_MISSING_CALCULATION = 'missing_calculation'
+
+RECONCILIATION_STATUSES = (
+    STATUS_MATCHED,
+    STATUS_UNDERPAID,
+    STATUS_OVERPAID,
+    STATUS_MISSING_RETURN,
+    STATUS_MISSING_CALCULATION,
+)
+
+
+def _cents_array(values: List[Optional[float]]) -> np.ndarray:
+    """Converte valores em reais (None -> 0) em um array de centavos"""
+    array = np.asarray(values, dtype=float)
+    return np.rint(np.nan_to_num(array, nan=0.0) * 100).astype(np.int64)
+
+
+def classify(
+    expected_cents: np.ndarray,
+    charged_cents: np.ndarray,
+    has_calculation: np.ndarray,
+    has_return: np.ndarray,
+    tolerance_cents: int = 0,
+) -> np.ndarray:
+    """
+    Classifica a conciliação de vários clientes de uma só vez.
+
+    Args:
+        expected_cents: Aluguel calculado de cada cliente (centavos)
+        charged_cents: Valor cobrado pelo banco de cada cliente (centavos)
+        has_calculation: Se o cliente tem cálculo no mês
+        has_return: Se o cliente tem retorno bancário no mês
+        tolerance_cents: Diferença (em centavos) aceita como conciliada
+
+    Returns:
+        Array com a situação de cada cliente (ver RECONCILIATION_STATUSES)
+    """
+    difference = charged_cents - expected_cents
+    return np.select(
+        [
+            ~has_calculation,
+            ~has_return,
+            np.abs(difference) <= tolerance_cents,
+            difference < 0,
+        ],
+        [
+            STATUS_MISSING_CALCULATION,
+            STATUS_MISSING_RETURN,
+            STATUS_MATCHED,
+            STATUS_UNDERPAID,
+        ],
+        default=STATUS_OVERPAID,
+    )
+
+
+class ReconciliationService:
+    """
+    Serviço para conciliar o valor cobrado pelo banco (retornos bancários)
+    com o aluguel calculado (cálculos mensais) de cada cliente no mês.
+
+    Os resultados ficam gravados em reconciliation_results e são lidos pelo
+    painel de conciliação. Eles refletem os dados do momento da conciliação
+    (reconciled_at): depois de importar retornos ou recalcular o mês, a
+    conciliação deve ser executada novamente.
+    """
+
+    @staticmethod
+    def reconcile(
+        db: Session, month: int, year: int, tolerance: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Concilia os clientes ativos no mês/ano e grava os resultados,
+        substituindo os da conciliação anterior do mesmo mês.
+
+        Os cálculos e os retornos do mês são lidos em duas consultas e
+        comparados em memória com numpy, sem laço por cliente.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12)
+            year: Ano
+            tolerance: Diferença (em reais) aceita como conciliada
+
+        Returns:
+            Dicionário com a quantidade de clientes por situação e a data da
+            conciliação
+        """
+        calculations = (
+            db.query(
+                MonthlyCalculation.client_id,
+                Client.owner_id,
+                MonthlyCalculation.id,
+                MonthlyCalculation.rent_amount,
+            )
+            .join(Client, Client.id == MonthlyCalculation.client_id)
+            .filter(
+                Client.is_active.is_(True),
+                MonthlyCalculation.month == month,
+                MonthlyCalculation.year == year,
+            )
+            .all()
+        )
+        bank_returns = (
+            db.query(
+                BankReturn.client_id,
+                Client.owner_id,
+                BankReturn.id,
+                BankReturn.charged_amount,
+            )
+            .join(Client, Client.id == BankReturn.client_id)
+            .filter(
+                Client.is_active.is_(True),
+                BankReturn.month == month,
+                BankReturn.year == year,
+            )
+            .all()
+        )
+
+        # Clientes dos dois lados (ordenados) e a posição de cada linha
+        calc_clients = np.asarray(
+            [row.client_id for row in calculations], dtype=np.int64
+        )
+        return_clients = np.asarray(
+            [row.client_id for row in bank_returns], dtype=np.int64
+        )
+        client_ids = np.union1d(calc_clients, return_clients)
+        calc_positions = np.searchsorted(client_ids, calc_clients)
+        return_positions = np.searchsorted(client_ids, return_clients)
+
+        size = len(client_ids)
+        has_calculation = np.zeros(size, dtype=bool)
+        has_calculation[calc_positions] = True
+        has_return = np.zeros(size, dtype=bool)
+        has_return[return_positions] = True
+
+        expected_cents = np.zeros(size, dtype=np.int64)
+        expected_cents[calc_positions] = _cents_array(
+            [row.rent_amount for row in calculations]
+        )
+        charged_cents = np.zeros(size, dtype=np.int64)
+        charged_cents[return_positions] = _cents_array(
+            [row.charged_amount for row in bank_returns]
+        )
+
+        statuses = classify(
+            expected_cents,
+            charged_cents,
+            has_calculation,
+            has_return,
+            to_cents(tolerance),
+        )
+
+        owner_ids = np.zeros(size, dtype=np.int64)
+        owner_ids[return_positions] = [row.owner_id for row in bank_returns]
+        owner_ids[calc_positions] = [row.owner_id for row in calculations]
+        calculation_ids: List[Optional[int]] = [None] * size
+        for position, row in zip(calc_positions.tolist(), calculations):
+            calculation_ids[position] = row.id
+        bank_return_ids: List[Optional[int]] = [None] * size
+        for position, row in zip(return_positions.tolist(), bank_returns):
+            bank_return_ids[position] = row.id
+
+        reconciled_at = datetime.now()
+        rows = [
+            {
+                'client_id': client_id,
+                'owner_id': owner_id,
+                'month': month,
+                'year': year,
+                'status': status,
+                'calculation_id': calculation_id,
+                'bank_return_id': bank_return_id,
+                'expected_amount': from_cents(expected) if calculated else None,
+                'charged_amount': from_cents(charged) if returned else None,
+                'difference': (
+                    from_cents(charged - expected)
+                    if calculated and returned else None
+                ),
+                'reconciled_at': reconciled_at,
+            }
+            for (
+                client_id, owner_id, status, calculation_id, bank_return_id,
+                expected, charged, calculated, returned,
+            ) in zip(
+                client_ids.tolist(),
+                owner_ids.tolist(),
+                statuses.tolist(),
+                calculation_ids,
+                bank_return_ids,
+                expected_cents.tolist(),
+                charged_cents.tolist(),
+                has_calculation.tolist(),
+                has_return.tolist(),
+            )
+        ]
+
+        try:
+            db.execute(
+                delete(ReconciliationResult)
+                .where(
+                    ReconciliationResult.month == month,
+                    ReconciliationResult.year == year,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if rows:
+                db.execute(insert(ReconciliationResult), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+        counts = dict.fromkeys(RECONCILIATION_STATUSES, 0)
+        for status in statuses.tolist():
+            counts[status] += 1
+
+        return {
+            'month': month,
+            'year': year,
+            'total_clients': size,
+            **counts,
+            'reconciled_at': reconciled_at,
+        }
+
+    @staticmethod
+    def get_dashboard(
+        db: Session,
+        month: int,
+        year: int,
+        status: Optional[str] = None,
+        owner_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retorna o painel de conciliação do mês a partir dos resultados
+        gravados, sem gravar nada. Se o mês ainda não foi conciliado, os
+        itens vêm vazios e reconciled_at, nulo.
+
+        Args:
+            db: Sessão do banco de dados
+            month: Mês (1-12)
+            year: Ano
+            status: Filtrar os itens por situação (opcional)
+            owner_id: Filtrar por proprietário (opcional)
+
+        Returns:
+            Dicionário com os itens (clientes), o resumo por situação e os
+            metadados da conciliação
+        """
+        period = (
+            ReconciliationResult.month == month,
+            ReconciliationResult.year == year,
+        )
+        reconciled_at = (
+            db.query(func.max(ReconciliationResult.reconciled_at))
+            .filter(*period)
+            .scalar()
+        )
+
+        filters = list(period)
+        if owner_id:
+            filters.append(ReconciliationResult.owner_id == owner_id)
+
+        # Resumo por situação (sem o filtro de situação)
+        summary = {
+            status_name: {
+                'total_clients': 0,
+                'total_expected': 0.0,
+                'total_charged': 0.0,
+                'total_difference': 0.0,
+            }
+            for status_name in RECONCILIATION_STATUSES
+        }
+        totals = (
+            db.query(
+                ReconciliationResult.status,
+                func.count(),
+                func.coalesce(
+                    func.sum(ReconciliationResult.expected_amount), 0
+                ),
+                func.coalesce(
+                    func.sum(ReconciliationResult.charged_amount), 0
+                ),
+                func.coalesce(func.sum(ReconciliationResult.difference), 0),
+            )
+            .filter(*filters)
+            .group_by(ReconciliationResult.status)
+            .all()
+        )
+        for status_name, count, expected, charged, difference in totals:
+            summary[status_name] = {
+                'total_clients': count,
+                'total_expected': expected,
+                'total_charged': charged,
+                'total_difference': difference,
+            }
+
+        if status:
+            filters.append(ReconciliationResult.status == status)
+        rows = (
+            db.query(ReconciliationResult, Client.name)
+            .join(Client, Client.id == ReconciliationResult.client_id)
+            .filter(*filters)
+            .order_by(ReconciliationResult.client_id)
+            .all()
+        )
+
+        items = [
+            {
+                'client': {'id': result.client_id, 'name': client_name},
+                'owner_id': result.owner_id,
+                'status': result.status,
+                'calculation_id': result.calculation_id,
+                'bank_return_id': result.bank_return_id,
+                'expected_amount': result.expected_amount,
+                'charged_amount': result.charged_amount,
+                'difference': result.difference,
+            }
+            for result, client_name in rows
+        ]
+
+        return {
+            'data': items,
+            'summary': summary,
+            'metadata': {
+                'month': month,
+                'year': year,
+                'owner_id': owner_id,
+                'status': status,
+                'reconciled_at': reconciled_at,
+            },
+        }
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict
+from itertools import product
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.secret_garden.database.models import Client
+
+# Número máximo de relatórios mantidos em memória
+DEFAULT_MAX_SIZE = 2048
+
+_MISSING = object()
+
+
+class ReportCache:
+    """
+    Cache em memória (LRU) dos relatórios por proprietário/mês.
+
+    As chaves são (relatório, owner_id, mês, ano). As entradas são removidas
+    pelos caminhos de escrita dos serviços sempre que os dados de um
+    proprietário/mês mudam (ver invalidate e invalidate_clients).
+
+    Os valores armazenados são compartilhados entre as requisições e não
+    devem ser alterados por quem os lê.
+
+    Cada invalidação também incrementa um contador (geração) do filtro
+    usado. Quem monta um relatório lê a geração do proprietário/mês antes
+    da consulta (generation) e a informa ao gravar (set): se houve uma
+    invalidação nesse meio tempo, o relatório pode ter sido montado com os
+    dados anteriores e não é armazenado.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        # Invalidações por filtro (owner_id, mês, ano; None = qualquer)
+        self._generations: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def _generation(self, owner_id: int, month: int, year: int) -> int:
+        """Invalidações que alcançam o proprietário/mês (com o lock)"""
+        return sum(
+            self._generations.get(key, 0)
+            for key in product((owner_id, None), (month, None), (year, None))
+        )
+
+    def generation(self, owner_id: int, month: int, year: int) -> int:
+        """
+        Geração atual do proprietário/mês, a ser lida antes de consultar os
+        dados de um relatório e informada em set
+        """
+        with self._lock:
+            return self._generation(owner_id, month, year)
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna a entrada da chave (ou None) e a marca como recente"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(
+        self, key: Hashable, value: Any, generation: Optional[int] = None
+    ) -> None:
+        """
+        Armazena uma entrada, removendo a menos usada se necessário.
+
+        Se generation for informada e o proprietário/mês da chave tiver sido
+        invalidado depois dela, a entrada não é armazenada.
+        """
+        with self._lock:
+            if (
+                generation is not None
+                and self._generation(*key[1:4]) != generation
+            ):
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(
+        self,
+        owner_id: Optional[int] = None,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+    ) -> int:
+        """
+        Remove as entradas do proprietário e/ou mês/ano informados (e
+        descarta os relatórios desses filtros que estiverem em montagem).
+        Filtros não informados valem para qualquer valor.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            filters = (owner_id, month, year)
+            self._generations[filters] = self._generations.get(filters, 0) + 1
+            stale = [
+                key for key in self._entries
+                if (owner_id is None or key[1] == owner_id)
+                and (month is None or key[2] == month)
+                and (year is None or key[3] == year)
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def invalidate_owners(
+        self,
+        owner_ids: Iterable[int],
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+    ) -> None:
+        """Remove as entradas de vários proprietários"""
+        for owner_id in set(owner_ids):
+            self.invalidate(owner_id, month, year)
+
+    def invalidate_clients(
+        self,
+        db: Session,
+        client_ids: Iterable[int],
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+    ) -> None:
+        """Remove as entradas dos proprietários dos clientes informados"""
+        client_ids = list(set(client_ids))
+        if not client_ids:
+            return
+        if not self._entries:
+            # Nada a remover: basta descartar os relatórios em montagem
+            self.invalidate(month=month, year=year)
+            return
+
+        owner_ids = [
+            owner_id for (owner_id,) in db.query(Client.owner_id)
+            .filter(Client.id.in_(client_ids))
+            .distinct()
+        ]
+        self.invalidate_owners(owner_ids, month, year)
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        self.invalidate()
+
+
+# Cache compartilhado pelos serviços de relatório
+report_cache = ReportCache()
@@ -1,11 +1,41 @@
-from typing import List, Dict, Any, Optional
+import base64
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, tuple_
 
 from src.secret_garden.database.models import Client, RetornoPagamento, MonthlyCalculation
+from src.secret_garden.database.upsert import insert_ignore_statement
 from src.secret_garden.models.retorno_pagamento import RetornoPagamentoCreate
+from src.secret_garden.services.client_name_index_service import ClientNameIndexService
+
+
+def _codificar_cursor(retorno: RetornoPagamento) -> str:
+    """Cursor de paginação apontando para o retorno (processed_at e id)"""
+    valor = f"{retorno.processed_at.isoformat()}|{retorno.id}"
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+
+def _decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Lê o cursor de paginação (ValueError se for inválido)"""
+    try:
+        valor = base64.urlsafe_b64decode(cursor.encode()).decode()
+        processed_at, retorno_id = valor.split("|")
+        return datetime.fromisoformat(processed_at), int(retorno_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor de paginação inválido")
+
+
+def _mensagem_cliente_invalido(client_id: int) -> str:
+    """Mensagem do pagamento recusado por cliente inexistente ou inativo"""
+    return f"Cliente com ID {client_id} não encontrado ou inativo"
+
+
+def _mensagem_retorno_existente(month: int, year: int) -> str:
+    """Mensagem do pagamento recusado por já haver retorno no mês"""
+    return f"Já existe um retorno processado para este cliente no mês {month}/{year}"
 
 
 class RetornoService:
@@ -16,7 +46,8 @@ class RetornoService:
         db: Session, nome_prefixo: str
     ) -> List[Dict[str, Any]]:
         """
-        Busca clientes cujo nome começa com o prefixo informado
+        Busca clientes cujo nome começa com o prefixo informado, sem
+        diferenciar acentos e maiúsculas (usa o índice de nomes normalizados)
         
         Args:
             db: Sessão do banco de dados
@@ -25,10 +56,7 @@ class RetornoService:
         Returns:
             Lista de clientes que correspondem ao prefixo fornecido
         """
-        clientes = db.query(Client).filter(
-            Client.name.like(f"{nome_prefixo}%"),
-            Client.is_active == True
-        ).all()
+        clientes = ClientNameIndexService.search_prefix(db, nome_prefixo)
         
         result = []
         for cliente in clientes:
@@ -66,12 +94,14 @@ class RetornoService:
         Returns:
             Informações sobre o retorno processado
         """
-        # Buscar o cliente
-        cliente = db.query(Client).filter(Client.id == client_id).first()
+        # Buscar o cliente (apenas ativos)
+        cliente = db.query(Client).filter(
+            Client.id == client_id, Client.is_active.is_(True)
+        ).first()
         if not cliente:
             return {
                 "success": False,
-                "message": f"Cliente com ID {client_id} não encontrado"
+                "message": _mensagem_cliente_invalido(client_id)
             }
             
         # Obter o mês e ano do pagamento
@@ -90,7 +120,7 @@ class RetornoService:
         if retorno_existente:
             return {
                 "success": False,
-                "message": f"Já existe um retorno processado para este cliente no mês {month}/{year}"
+                "message": _mensagem_retorno_existente(month, year)
             }
             
         # Buscar o cálculo mensal correspondente para obter valores previstos
@@ -102,6 +132,200 @@ class RetornoService:
             )
         ).first()
         
+        valores = RetornoService._montar_retorno(
+            cliente, calc_mensal, payment_date, amount_paid, interest
+        )
+        novo_retorno = RetornoPagamento(**valores)
+        
+        db.add(novo_retorno)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Outro processamento gravou o retorno do mês ao mesmo tempo
+            # (índice único cliente + mês + ano)
+            db.rollback()
+            return {
+                "success": False,
+                "message": _mensagem_retorno_existente(month, year)
+            }
+        db.refresh(novo_retorno)
+        
+        return {
+            "success": True,
+            "message": "Retorno processado com sucesso",
+            "retorno_id": novo_retorno.id,
+            "owner_payment_amount": valores["owner_payment_amount"]
+        }
+
+    @staticmethod
+    def processar_retornos_lote(
+        db: Session, pagamentos: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Processa os retornos de pagamento de vários clientes de uma vez.
+        
+        Os clientes, os retornos já existentes e os cálculos mensais de
+        todos os pagamentos são buscados em três consultas, e os retornos
+        são gravados em uma única transação. Cada pagamento segue as mesmas
+        regras de processar_retorno; os recusados (cliente não encontrado,
+        cliente inativo ou retorno do mês já existente) não impedem a
+        gravação dos demais.
+        
+        Args:
+            db: Sessão do banco de dados
+            pagamentos: Lista de pagamentos (client_id, payment_date,
+                amount_paid e interest opcional)
+            
+        Returns:
+            Totais de processados e recusados e o resultado de cada
+            pagamento, na ordem recebida
+        """
+        def chave(pagamento: Dict[str, Any]) -> tuple:
+            payment_date = pagamento["payment_date"]
+            return (
+                pagamento["client_id"], payment_date.month, payment_date.year
+            )
+
+        chaves = {chave(pagamento) for pagamento in pagamentos}
+        client_ids = {client_id for client_id, _, _ in chaves}
+
+        clientes = {}
+        existentes = set()
+        calculos = {}
+        if chaves:
+            clientes = {
+                cliente.id: cliente
+                for cliente in db.query(Client).filter(
+                    Client.id.in_(client_ids), Client.is_active.is_(True)
+                )
+            }
+            existentes = set(
+                db.query(
+                    RetornoPagamento.client_id,
+                    RetornoPagamento.month,
+                    RetornoPagamento.year,
+                ).filter(
+                    tuple_(
+                        RetornoPagamento.client_id,
+                        RetornoPagamento.month,
+                        RetornoPagamento.year,
+                    ).in_(chaves)
+                ).all()
+            )
+            calculos = {
+                (calc.client_id, calc.month, calc.year): calc
+                for calc in db.query(MonthlyCalculation).filter(
+                    tuple_(
+                        MonthlyCalculation.client_id,
+                        MonthlyCalculation.month,
+                        MonthlyCalculation.year,
+                    ).in_(chaves)
+                )
+            }
+
+        itens = []
+        linhas = {}
+        for index, pagamento in enumerate(pagamentos):
+            client_id, month, year = key = chave(pagamento)
+            item = {
+                "index": index,
+                "client_id": client_id,
+                "month": month,
+                "year": year,
+                "success": False,
+                "message": None,
+                "retorno_id": None,
+                "owner_payment_amount": None,
+            }
+            itens.append(item)
+
+            cliente = clientes.get(client_id)
+            if cliente is None:
+                item["message"] = _mensagem_cliente_invalido(client_id)
+                continue
+            if key in existentes or key in linhas:
+                item["message"] = _mensagem_retorno_existente(month, year)
+                continue
+
+            valores = RetornoService._montar_retorno(
+                cliente,
+                calculos.get(key),
+                pagamento["payment_date"],
+                pagamento["amount_paid"],
+                pagamento.get("interest") or 0.0,
+            )
+            linhas[key] = valores
+            item["owner_payment_amount"] = valores["owner_payment_amount"]
+
+        # Os retornos gravados por outro processamento depois da consulta
+        # são ignorados pelo índice único e não aparecem no RETURNING
+        retorno_ids = {}
+        try:
+            if linhas:
+                stmt = insert_ignore_statement(
+                    db, RetornoPagamento, ["client_id", "month", "year"]
+                ).returning(
+                    RetornoPagamento.id,
+                    RetornoPagamento.client_id,
+                    RetornoPagamento.month,
+                    RetornoPagamento.year,
+                )
+                for row in db.execute(stmt, list(linhas.values())):
+                    retorno_ids[(row.client_id, row.month, row.year)] = row.id
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+        for item in itens:
+            if item["owner_payment_amount"] is None:
+                continue
+            retorno_id = retorno_ids.get(
+                (item["client_id"], item["month"], item["year"])
+            )
+            if retorno_id is None:
+                item["owner_payment_amount"] = None
+                item["message"] = _mensagem_retorno_existente(
+                    item["month"], item["year"]
+                )
+                continue
+            item["success"] = True
+            item["message"] = "Retorno processado com sucesso"
+            item["retorno_id"] = retorno_id
+
+        processados = sum(1 for item in itens if item["success"])
+        return {
+            "total": len(itens),
+            "processed": processados,
+            "rejected": len(itens) - processados,
+            "items": itens,
+        }
+
+    @staticmethod
+    def _montar_retorno(
+        cliente: Client,
+        calc_mensal: Optional[MonthlyCalculation],
+        payment_date: date,
+        amount_paid: float,
+        interest: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Calcula os valores do retorno de um cliente no mês do pagamento
+        (vencimento, comissão e valor a pagar ao proprietário)
+        
+        Args:
+            cliente: Cliente do pagamento
+            calc_mensal: Cálculo mensal do cliente no mês, se existir
+            payment_date: Data do pagamento
+            amount_paid: Valor pago
+            interest: Juros
+            
+        Returns:
+            Colunas do registro de retorno (RetornoPagamento)
+        """
+        month = payment_date.month
+        year = payment_date.year
+
         # Calcular a data de vencimento
         if cliente.due_date:
             try:
@@ -137,34 +361,22 @@ class RetornoService:
                               commission - delivery_fee - 
                               (1 if condo_paid else 0))
         
-        # Criar o registro de retorno
-        novo_retorno = RetornoPagamento(
-            client_id=client_id,
-            month=month,
-            year=year,
-            due_date=vencimento_data,
-            payment_date=payment_date,
-            rent_amount=rent_amount,
-            amount_paid=amount_paid,
-            interest=interest,
-            condo_fee=condo_fee,
-            percentage=percentage,
-            commission=commission,
-            delivery_fee=delivery_fee,
-            condo_paid=condo_paid,
-            owner_payment_amount=owner_payment_amount,
-            processed_at=datetime.now()
-        )
-        
-        db.add(novo_retorno)
-        db.commit()
-        db.refresh(novo_retorno)
-        
         return {
-            "success": True,
-            "message": "Retorno processado com sucesso",
-            "retorno_id": novo_retorno.id,
-            "owner_payment_amount": owner_payment_amount
+            "client_id": cliente.id,
+            "month": month,
+            "year": year,
+            "due_date": vencimento_data,
+            "payment_date": payment_date,
+            "rent_amount": rent_amount,
+            "amount_paid": amount_paid,
+            "interest": interest,
+            "condo_fee": condo_fee,
+            "percentage": percentage,
+            "commission": commission,
+            "delivery_fee": delivery_fee,
+            "condo_paid": condo_paid,
+            "owner_payment_amount": owner_payment_amount,
+            "processed_at": datetime.now()
         }
     
     @staticmethod
@@ -179,9 +391,17 @@ class RetornoService:
         db: Session, 
         client_id: Optional[int] = None,
         month: Optional[int] = None,
-        year: Optional[int] = None
-    ) -> List[RetornoPagamento]:
-        """Busca retornos com filtros opcionais"""
+        year: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[RetornoPagamento], Optional[str]]:
+        """
+        Busca retornos com filtros opcionais, do mais recente para o mais
+        antigo, paginados por cursor (ver _paginar)
+        
+        Returns:
+            Retornos da página e o cursor da próxima página (None na última)
+        """
         query = db.query(RetornoPagamento)
         
         if client_id:
@@ -191,31 +411,29 @@ class RetornoService:
         if year:
             query = query.filter(RetornoPagamento.year == year)
             
-        # Ordenar por data de processamento (mais recente primeiro)
-        query = query.order_by(RetornoPagamento.processed_at.desc())
-            
-        return query.all()
+        return RetornoService._paginar(query, limit, cursor)
     
     @staticmethod
     def get_retornos_by_owner(
         db: Session,
         owner_id: int,
         month: Optional[int] = None,
-        year: Optional[int] = None
-    ) -> List[RetornoPagamento]:
-        """Busca retornos para todos os clientes de um proprietário"""
-        # Primeiro encontrar os IDs dos clientes deste proprietário
-        client_ids = [c.id for c in db.query(Client.id).filter(
-            Client.owner_id == owner_id, 
-            Client.is_active == True
-        ).all()]
-        
-        if not client_ids:
-            return []
-        
-        # Depois buscar os retornos para estes clientes
-        query = db.query(RetornoPagamento).filter(
-            RetornoPagamento.client_id.in_(client_ids)
+        year: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[RetornoPagamento], Optional[str]]:
+        """
+        Busca retornos dos clientes ativos de um proprietário (uma consulta,
+        com join em clients), paginados por cursor (ver _paginar)
+        
+        Returns:
+            Retornos da página e o cursor da próxima página (None na última)
+        """
+        query = db.query(RetornoPagamento).join(
+            Client, Client.id == RetornoPagamento.client_id
+        ).filter(
+            Client.owner_id == owner_id,
+            Client.is_active.is_(True)
         )
         
         if month:
@@ -223,10 +441,51 @@ class RetornoService:
         if year:
             query = query.filter(RetornoPagamento.year == year)
             
-        # Ordenar por data de processamento (mais recente primeiro)
-        query = query.order_by(RetornoPagamento.processed_at.desc())
+        return RetornoService._paginar(query, limit, cursor)
+
+    @staticmethod
+    def _paginar(
+        query: Any, limit: Optional[int], cursor: Optional[str]
+    ) -> Tuple[List[RetornoPagamento], Optional[str]]:
+        """
+        Ordena os retornos por data de processamento (mais recente primeiro,
+        usando o índice ix_retorno_processed_at_id) e aplica a paginação por
+        cursor: a página começa depois do último retorno da página anterior,
+        sem OFFSET. Sem limit, retorna todos os retornos.
+        
+        Args:
+            query: Consulta de RetornoPagamento já filtrada
+            limit: Quantidade máxima de retornos da página (opcional)
+            cursor: Cursor retornado na página anterior (opcional)
             
-        return query.all()
+        Returns:
+            Retornos da página e o cursor da próxima página (None na última)
+        """
+        if cursor:
+            processed_at, retorno_id = _decodificar_cursor(cursor)
+            query = query.filter(
+                or_(
+                    RetornoPagamento.processed_at < processed_at,
+                    and_(
+                        RetornoPagamento.processed_at == processed_at,
+                        RetornoPagamento.id < retorno_id
+                    )
+                )
+            )
+
+        # Ordenar por data de processamento (mais recente primeiro)
+        query = query.order_by(
+            RetornoPagamento.processed_at.desc(), RetornoPagamento.id.desc()
+        )
+        if limit is None:
+            return query.all(), None
+
+        # Um retorno a mais indica se existe uma próxima página
+        retornos = query.limit(limit + 1).all()
+        if len(retornos) <= limit:
+            return retornos, None
+        retornos = retornos[:limit]
+        return retornos, _codificar_cursor(retornos[-1])
         
     @staticmethod
     def retorno_to_dict(retorno: RetornoPagamento) -> Dict[str, Any]:
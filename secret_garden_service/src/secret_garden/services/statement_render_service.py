@@ -0,0 +1,302 @@
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from html import escape
+from itertools import islice
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from src.secret_garden.services.monthly_transfer_service import \
+    MonthlyTransferService
+
+try:
+    # Dependência opcional, usada apenas para gerar PDFs
+    from weasyprint import HTML as WeasyHTML
+except ImportError:
+    WeasyHTML = None
+
+logger = logging.getLogger(__name__)
+
+# Formatos de saída suportados
+STATEMENT_FORMATS = ('html', 'pdf')
+
+# Quantidade de extratos enviados a um worker por vez
+STATEMENT_BATCH_SIZE = 50
+
+MONTH_NAMES = (
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+    'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro',
+)
+
+# Templates compilados uma única vez, na importação do módulo (cada processo
+# do pool importa o módulo uma vez e reutiliza os templates)
+STATEMENT_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Repasse $period - $owner_name</title>
+<style>
+body { font-family: Arial, sans-serif; font-size: 12px; margin: 24px; }
+h1 { font-size: 18px; margin-bottom: 4px; }
+table { border-collapse: collapse; width: 100%; margin-top: 16px; }
+th, td { border: 1px solid #ccc; padding: 4px 6px; }
+th { background: #f0f0f0; text-align: left; }
+td.money, th.money { text-align: right; }
+tfoot td { font-weight: bold; }
+</style>
+</head>
+<body>
+<h1>Extrato de repasse - $period</h1>
+<p>Proprietário: $owner_name</p>
+<table>
+<thead>
+<tr>
+<th>Locatário</th>
+<th>Venc.</th>
+<th class="money">Aluguel</th>
+<th class="money">Base de cálculo</th>
+<th class="money">%</th>
+<th class="money">Comissão</th>
+<th class="money">Condomínio</th>
+<th class="money">Taxa de envio</th>
+<th class="money">Depósito</th>
+</tr>
+</thead>
+<tbody>
+$rows
+</tbody>
+<tfoot>
+<tr>
+<td colspan="2">Total ($total_properties imóveis)</td>
+<td class="money">$total_rent</td>
+<td></td>
+<td></td>
+<td class="money">$total_commission</td>
+<td class="money">$total_condo_fees</td>
+<td class="money">$total_delivery_fees</td>
+<td class="money">$total_deposit</td>
+</tr>
+</tfoot>
+</table>
+<p>Gerado em $generated_at</p>
+</body>
+</html>
+""")
+
+STATEMENT_ROW_TEMPLATE = Template("""<tr>
+<td>$tenant</td>
+<td>$due_date</td>
+<td class="money">$rent_amount</td>
+<td class="money">$calculation_base</td>
+<td class="money">$percentage</td>
+<td class="money">$commission</td>
+<td class="money">$condo_fee</td>
+<td class="money">$delivery_fee</td>
+<td class="money">$deposit_amount</td>
+</tr>""")
+
+
+def _format_currency(value: Optional[float]) -> str:
+    """Formata um valor em reais (ex: R$ 1.234,56)"""
+    formatted = f'{value or 0:,.2f}'
+    return 'R$ ' + formatted.replace(',', '_').replace('.', ',').replace(
+        '_', '.'
+    )
+
+
+def _format_percentage(value: Optional[float]) -> str:
+    """Formata um percentual (ex: 7,5)"""
+    return f'{value or 0:g}'.replace('.', ',')
+
+
+def render_statement_html(statement: Dict[str, Any]) -> str:
+    """
+    Renderiza o extrato de repasse de um proprietário em HTML.
+
+    Args:
+        statement: Repasse no formato de MonthlyTransferService
+            (data, summary e metadata com owner_name)
+
+    Returns:
+        Documento HTML do extrato
+    """
+    metadata = statement['metadata']
+    summary = statement['summary']
+
+    rows = '\n'.join(
+        STATEMENT_ROW_TEMPLATE.substitute(
+            tenant=escape(item['tenant']['name'] or ''),
+            due_date=item['due_date'] or '',
+            rent_amount=_format_currency(item['rent_amount']),
+            calculation_base=_format_currency(item['calculation_base']),
+            percentage=_format_percentage(item['percentage']),
+            commission=_format_currency(item['commission']),
+            condo_fee=_format_currency(item['condo_fee']),
+            delivery_fee=_format_currency(item['delivery_fee']),
+            deposit_amount=_format_currency(item['deposit_amount']),
+        )
+        for item in statement['data']
+    )
+
+    return STATEMENT_TEMPLATE.substitute(
+        period=f"{MONTH_NAMES[metadata['month'] - 1]}/{metadata['year']}",
+        owner_name=escape(
+            metadata.get('owner_name') or f"#{metadata['owner_id']}"
+        ),
+        rows=rows,
+        total_properties=summary['total_properties'],
+        total_rent=_format_currency(summary['total_rent']),
+        total_commission=_format_currency(summary['total_commission']),
+        total_condo_fees=_format_currency(summary['total_condo_fees']),
+        total_delivery_fees=_format_currency(summary['total_delivery_fees']),
+        total_deposit=_format_currency(summary['total_deposit']),
+        generated_at=metadata['generated_at'].strftime('%d/%m/%Y %H:%M'),
+    )
+
+
+def _render_batch(
+    statements: List[Dict[str, Any]], output_dir: str, formats: Sequence[str]
+) -> Dict[str, Any]:
+    """
+    Renderiza e grava um lote de extratos (executado nos processos do pool).
+
+    Returns:
+        Dict com os arquivos gravados ('files') e os proprietários que
+        falharam ('failed', lista de (owner_id, erro))
+    """
+    files = []
+    failed = []
+
+    for statement in statements:
+        metadata = statement['metadata']
+        base_name = os.path.join(
+            output_dir, f"repasse_{metadata['owner_id']}"
+        )
+        try:
+            html = render_statement_html(statement)
+            if 'html' in formats:
+                with open(f'{base_name}.html', 'w', encoding='utf-8') as file:
+                    file.write(html)
+                files.append(f'{base_name}.html')
+            if 'pdf' in formats:
+                WeasyHTML(string=html).write_pdf(f'{base_name}.pdf')
+                files.append(f'{base_name}.pdf')
+        except Exception as e:
+            failed.append((metadata['owner_id'], str(e)))
+
+    return {'files': files, 'failed': failed}
+
+
+def _batches(
+    statements: Iterable[Dict[str, Any]], size: int
+) -> Iterable[List[Dict[str, Any]]]:
+    """Agrupa os extratos em listas de até size itens"""
+    iterator = iter(statements)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class StatementRenderService:
+    """Serviço para gerar em lote os extratos de repasse dos proprietários"""
+
+    @staticmethod
+    def render_all(
+        db: Session,
+        output_dir: str,
+        month: Optional[int] = None,
+        year: Optional[int] = None,
+        formats: Sequence[str] = ('html',),
+        max_workers: Optional[int] = None,
+        batch_size: int = STATEMENT_BATCH_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Gera os extratos de repasse de todos os proprietários do mês.
+
+        Os repasses são lidos em uma única passada
+        (MonthlyTransferService.iter_all_owner_transfers) e enviados em lotes
+        para um pool de processos, que renderiza os templates e grava os
+        arquivos em output_dir/AAAA-MM. No máximo dois lotes por worker ficam
+        pendentes por vez, então a memória usada não depende do número de
+        proprietários.
+
+        Args:
+            db: Sessão do banco de dados
+            output_dir: Diretório de saída
+            month: Mês (1-12). Se não for fornecido, usa o mês atual
+            year: Ano. Se não for fornecido, usa o ano atual
+            formats: Formatos a gerar ('html' e/ou 'pdf')
+            max_workers: Número de processos (padrão: número de CPUs)
+            batch_size: Quantidade de extratos por lote
+
+        Returns:
+            Dict com o total de extratos, arquivos gravados, falhas e o
+            diretório de saída
+        """
+        unknown = set(formats) - set(STATEMENT_FORMATS)
+        if unknown:
+            raise ValueError(f"Formato não suportado: {', '.join(unknown)}")
+        if 'pdf' in formats and WeasyHTML is None:
+            raise ValueError(
+                'A geração de PDF requer o pacote weasyprint instalado.'
+            )
+
+        # Se mês e ano não forem fornecidos, usar o mês e ano atuais
+        if not month or not year:
+            now = datetime.now()
+            month = month or now.month
+            year = year or now.year
+
+        period_dir = os.path.join(output_dir, f'{year}-{month:02d}')
+        os.makedirs(period_dir, exist_ok=True)
+
+        max_workers = max_workers or os.cpu_count() or 1
+        statements = MonthlyTransferService.iter_all_owner_transfers(
+            db, month, year
+        )
+
+        total = 0
+        files: List[str] = []
+        failed: List[Dict[str, Any]] = []
+
+        def collect(future) -> None:
+            result = future.result()
+            files.extend(result['files'])
+            for owner_id, error in result['failed']:
+                logger.error(
+                    f'Erro ao gerar extrato do proprietário {owner_id}: '
+                    f'{error}'
+                )
+                failed.append({'owner_id': owner_id, 'error': error})
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for batch in _batches(statements, batch_size):
+                total += len(batch)
+                pending.add(
+                    executor.submit(
+                        _render_batch, batch, period_dir, tuple(formats)
+                    )
+                )
+
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+
+            for future in pending:
+                collect(future)
+
+        return {
+            'month': month,
+            'year': year,
+            'total_statements': total,
+            'files': len(files),
+            'failed': failed,
+            'output_dir': period_dir,
+        }
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.secret_garden.database import models
+from src.secret_garden.database.config import Base
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameIndexService
+from src.secret_garden.services.report_cache import report_cache
+
+
+@pytest.fixture
+def session():
+    """Sessão de um banco SQLite em memória com as tabelas criadas"""
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autoflush=False, bind=engine)()
+    report_cache.clear()
+
+    yield db
+
+    db.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def owner(session):
+    owner = models.Owner(name='Proprietário Teste')
+    session.add(owner)
+    session.commit()
+    return owner
+
+
+@pytest.fixture
+def make_client(session, owner):
+    """Cria um cliente (ativo, salvo se informado) e o seu índice de nomes"""
+
+    def _make_client(name, **fields):
+        values = {
+            'owner_id': owner.id,
+            'status': 'Ativo',
+            'due_date': 10,
+            'amount_paid': 1000.0,
+            'percentage': 10.0,
+            'start_date': date(2024, 1, 1),
+            **fields,
+        }
+        client = models.Client(name=name, **values)
+        session.add(client)
+        session.flush()
+        ClientNameIndexService.refresh_clients(session, [client.id])
+        session.commit()
+        return client
+
+    return _make_client
@@ -0,0 +1,75 @@
+from datetime import date
+
+from sqlalchemy import event
+
+from src.secret_garden.database.models import BankReturn
+from src.secret_garden.services.bank_return_service import BankReturnService
+
+
+def test_bulk_counts_created_and_updated(session, make_client):
+    first = make_client('Maria Silva')
+    second = make_client('José Souza')
+    BankReturnService.create_or_update_bank_return(
+        session, first.id, 3, 2024, {'title_amount': 1000.0}
+    )
+
+    report = BankReturnService.bulk_create_or_update_bank_returns(session, [
+        {'client_id': first.id, 'month': 3, 'year': 2024,
+         'charged_amount': 1010.0},
+        {'client_id': second.id, 'month': 3, 'year': 2024,
+         'title_amount': 900.0, 'due_date': '2024-03-10'},
+        {'client_id': 999, 'month': 3, 'year': 2024},
+    ])
+
+    assert report['total_items'] == 3
+    assert (report['created'], report['updated'], report['invalid']) == (
+        1, 1, 1
+    )
+    statuses = [result['status'] for result in report['results']]
+    assert statuses == ['updated', 'created', 'invalid']
+    assert all(result.get('id') for result in report['results'][:2])
+
+
+def test_bulk_update_keeps_fields_not_informed(session, make_client):
+    client = make_client('Maria Silva')
+    BankReturnService.create_or_update_bank_return(
+        session, client.id, 3, 2024,
+        {'title_amount': 1000.0, 'due_date': date(2024, 3, 10)},
+    )
+
+    BankReturnService.bulk_create_or_update_bank_returns(session, [
+        {'client_id': client.id, 'month': 3, 'year': 2024,
+         'charged_amount': 1010.0},
+    ])
+
+    session.expire_all()
+    bank_return = session.query(BankReturn).one()
+    assert bank_return.title_amount == 1000.0
+    assert bank_return.due_date == date(2024, 3, 10)
+    assert bank_return.charged_amount == 1010.0
+
+
+def test_bulk_writes_each_field_group_in_one_statement(session, make_client):
+    clients = [make_client(f'Cliente {index}') for index in range(20)]
+    statements = []
+
+    def count_inserts(conn, cursor, statement, *args):
+        if statement.startswith('INSERT INTO bank_returns'):
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, 'before_cursor_execute', count_inserts)
+    try:
+        report = BankReturnService.bulk_create_or_update_bank_returns(
+            session,
+            [
+                {'client_id': client.id, 'month': 3, 'year': 2024,
+                 'title_amount': 100.0 + index}
+                for index, client in enumerate(clients)
+            ],
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_inserts)
+
+    assert report['created'] == 20
+    assert len(statements) == 1
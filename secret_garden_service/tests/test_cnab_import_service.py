@@ -0,0 +1,203 @@
+from datetime import date
+
+import pytest
+
+from src.secret_garden.database.models import BankReturn
+from src.secret_garden.services.client_name_index_service import \
+    ClientNameMatcher
+from src.secret_garden.services.cnab_import_service import (STATUS_IMPORTED,
+                                                            STATUS_UNMATCHED,
+                                                            CnabImportService,
+                                                            iter_cnab_titles)
+
+
+def _line(size, fields):
+    """Monta uma linha do arquivo com os campos nas posições indicadas"""
+    line = [' '] * size
+    for start, value in fields:
+        line[start:start + len(value)] = value
+    return ''.join(line)
+
+
+def cnab240_file(*titles):
+    """Arquivo CNAB 240 com headers, segmentos T/U por título e trailers"""
+    lines = [_line(240, [(7, '0')]), _line(240, [(7, '1')])]
+    for company_number, payer_name, title_cents, paid_cents in titles:
+        lines.append(_line(240, [
+            (7, '3'),
+            (13, 'T'),
+            (58, '000000000000123'),
+            (73, '15032024'),
+            (81, str(title_cents).zfill(15)),
+            (105, company_number.ljust(25)),
+            (148, payer_name.ljust(40)),
+        ]))
+        lines.append(_line(240, [
+            (7, '3'),
+            (13, 'U'),
+            (77, str(paid_cents).zfill(15)),
+            (137, '18032024'),
+            (145, '19032024'),
+        ]))
+    lines += [_line(240, [(7, '5')]), _line(240, [(7, '9')])]
+    return [line + '\r\n' for line in lines]
+
+
+def cnab400_file(*titles):
+    """Arquivo CNAB 400 com header, um detalhe por título e trailer"""
+    lines = [_line(400, [(0, '0')])]
+    for company_number, payer_name, title_cents, paid_cents in titles:
+        lines.append(_line(400, [
+            (0, '1'),
+            (37, company_number.ljust(25)),
+            (146, '150324'),
+            (152, str(title_cents).zfill(13)),
+            (253, str(paid_cents).zfill(13)),
+            (295, '180324'),
+            (324, payer_name.ljust(30)),
+        ]))
+    lines.append(_line(400, [(0, '9')]))
+    return [line + '\n' for line in lines]
+
+
+def test_import_cnab400_blank_payer_name_uses_client_number(
+    session, make_client
+):
+    client = make_client('Maria Silva')
+
+    report = CnabImportService.import_file(
+        session, cnab400_file((str(client.id), '', 100000, 101000))
+    )
+
+    assert report[STATUS_IMPORTED] == 1
+    assert report['results'][0]['client_id'] == client.id
+    bank_return = session.query(BankReturn).one()
+    assert bank_return.client_id == client.id
+    assert bank_return.payer_name is None
+    assert (bank_return.month, bank_return.year) == (3, 2024)
+    assert bank_return.due_date == date(2024, 3, 15)
+    assert bank_return.charged_amount == 1010.0
+    assert bank_return.variation_amount == 10.0
+
+
+def test_import_cnab400_blank_payer_name_unknown_number_is_unmatched(
+    session, make_client
+):
+    make_client('Maria Silva')
+
+    report = CnabImportService.import_file(
+        session, cnab400_file(('99999', '', 100000, 100000))
+    )
+
+    assert report[STATUS_UNMATCHED] == 1
+    assert session.query(BankReturn).count() == 0
+
+
+def test_iter_cnab240_reads_t_and_u_segments():
+    titles = list(iter_cnab_titles(
+        cnab240_file(('42', 'MARIA SILVA', 100000, 101050))
+    ))
+
+    assert titles == [{
+        'line': 3,
+        'company_number': '42',
+        'document_number': '000000000000123',
+        'payer_name': 'MARIA SILVA',
+        'due_date': date(2024, 3, 15),
+        'payment_date': date(2024, 3, 19),
+        'title_cents': 100000,
+        'paid_cents': 101050,
+    }]
+
+
+def test_iter_cnab240_reports_segment_t_without_u():
+    lines = cnab240_file(('42', 'MARIA SILVA', 100000, 100000))
+    del lines[3]  # segmento U
+
+    titles = list(iter_cnab_titles(lines))
+
+    assert titles == [{
+        'line': 3, 'error': 'Segmento T sem o segmento U correspondente'
+    }]
+
+
+def test_iter_cnab400_reads_detail_lines():
+    titles = list(iter_cnab_titles(
+        cnab400_file(('42', 'MARIA SILVA', 100000, 99000))
+    ))
+
+    assert len(titles) == 1
+    assert titles[0]['line'] == 2
+    assert titles[0]['company_number'] == '42'
+    assert titles[0]['payer_name'] == 'MARIA SILVA'
+    assert titles[0]['due_date'] == date(2024, 3, 15)
+    assert titles[0]['payment_date'] == date(2024, 3, 18)
+    assert (titles[0]['title_cents'], titles[0]['paid_cents']) == (
+        100000, 99000
+    )
+
+
+def test_iter_cnab400_reports_invalid_amount():
+    lines = cnab400_file(('42', 'MARIA SILVA', 100000, 100000))
+    lines[1] = lines[1][:152] + '00000001000X0' + lines[1][165:]
+
+    titles = list(iter_cnab_titles(lines))
+
+    assert titles == [{'line': 2, 'error': "Valor inválido: '00000001000X0'"}]
+
+
+def test_iter_cnab_titles_rejects_unknown_layout():
+    with pytest.raises(ValueError, match='Layout CNAB não reconhecido'):
+        list(iter_cnab_titles(['0' * 100 + '\n']))
+
+
+def _title(company_number, payer_name):
+    return {
+        'company_number': company_number,
+        'document_number': '',
+        'payer_name': payer_name,
+    }
+
+
+@pytest.fixture
+def clients(make_client):
+    maria = make_client('Maria Silva')
+    jose = make_client('José Souza')
+    return maria, jose
+
+
+def test_match_client_accepts_number_without_payer_name(session, clients):
+    maria, _ = clients
+    matcher = ClientNameMatcher.from_db(session)
+
+    client_id = CnabImportService._match_client(
+        _title(str(maria.id), None), {maria.id}, matcher
+    )
+
+    assert client_id == maria.id
+
+
+def test_match_client_number_with_mismatched_payer_name_uses_the_name(
+    session, clients
+):
+    maria, jose = clients
+    matcher = ClientNameMatcher.from_db(session)
+
+    client_id = CnabImportService._match_client(
+        _title(str(maria.id), 'JOSE SOUZA'), {maria.id, jose.id}, matcher
+    )
+
+    assert client_id == jose.id
+
+
+def test_match_client_mismatched_payer_name_without_match_is_unmatched(
+    session, clients
+):
+    maria, jose = clients
+    matcher = ClientNameMatcher.from_db(session)
+
+    client_id = CnabImportService._match_client(
+        _title(str(maria.id), 'PEDRO ALMEIDA'), {maria.id, jose.id}, matcher
+    )
+
+    assert client_id is None
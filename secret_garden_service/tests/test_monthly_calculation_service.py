@@ -0,0 +1,97 @@
+from src.secret_garden.database.models import (MonthlyCalculation,
+                                               MonthlyVariableValues)
+from src.secret_garden.services.monthly_calculation_service import \
+    MonthlyCalculationService
+
+
+def _counts(result):
+    return result['successful'], result['skipped'], result['failed']
+
+
+def test_bulk_skips_clients_with_unchanged_inputs(session, make_client):
+    changed = make_client('Maria Silva')
+    make_client('José Souza')
+
+    first = MonthlyCalculationService.calculate_for_all_clients_bulk(
+        session, 3, 2024
+    )
+    unchanged = MonthlyCalculationService.calculate_for_all_clients_bulk(
+        session, 3, 2024
+    )
+    changed.amount_paid = 1500.0
+    session.commit()
+    after_change = MonthlyCalculationService.calculate_for_all_clients_bulk(
+        session, 3, 2024
+    )
+
+    assert _counts(first) == (2, 0, 0)
+    assert _counts(unchanged) == (0, 2, 0)
+    assert _counts(after_change) == (1, 1, 0)
+    calculation = session.query(MonthlyCalculation).filter_by(
+        client_id=changed.id
+    ).one()
+    assert calculation.rent_amount == 1500.0
+
+
+def test_bulk_force_recalculates_unchanged_clients(session, make_client):
+    make_client('Maria Silva')
+    MonthlyCalculationService.calculate_for_all_clients_bulk(session, 3, 2024)
+
+    result = MonthlyCalculationService.calculate_for_all_clients_bulk(
+        session, 3, 2024, force=True
+    )
+
+    assert _counts(result) == (1, 0, 0)
+
+
+def test_range_skips_unchanged_months(session, make_client):
+    client = make_client('Maria Silva', has_monthly_variation=True)
+
+    first = MonthlyCalculationService.calculate_for_period_range(
+        session, 1, 2024, 3, 2024
+    )
+    session.add(MonthlyVariableValues(
+        client_id=client.id, month=2, year=2024, water_bill=80.0
+    ))
+    session.commit()
+    second = MonthlyCalculationService.calculate_for_period_range(
+        session, 1, 2024, 3, 2024
+    )
+
+    assert _counts(first) == (3, 0, 0)
+    assert _counts(second) == (1, 2, 0)
+    assert [
+        (period['month'], period['successful'], period['skipped'])
+        for period in second['periods']
+    ] == [(1, 0, 1), (2, 1, 0), (3, 0, 1)]
+
+
+def test_preview_reports_changes_without_writing(session, make_client):
+    calculated = make_client('Maria Silva')
+    new = make_client('José Souza')
+    MonthlyCalculationService.calculate_for_all_clients_bulk(
+        session, 3, 2024, client_ids=[calculated.id]
+    )
+    calculated.amount_paid = 1200.0
+    session.commit()
+
+    preview = MonthlyCalculationService.preview_calculations(
+        session, 3, 2024
+    )
+
+    assert (
+        preview['total_clients'],
+        preview['changed_clients'],
+        preview['new_clients'],
+    ) == (2, 2, 1)
+    changes = {change['client_id']: change for change in preview['changes']}
+    assert changes[new.id]['is_new'] is True
+    assert changes[calculated.id]['fields']['rent_amount'] == {
+        'current': 1000.0, 'new': 1200.0, 'delta': 200.0
+    }
+    assert preview['totals']['rent_amount'] == {
+        'current': 1000.0, 'new': 2200.0, 'delta': 1200.0
+    }
+    session.expire_all()
+    stored = session.query(MonthlyCalculation).one()
+    assert stored.rent_amount == 1000.0
@@ -0,0 +1,65 @@
+from src.secret_garden.database.models import MonthlyVariableValues
+from src.secret_garden.services.monthly_variable_values_service import \
+    MonthlyVariableValuesService
+
+
+def _item(client, **values):
+    return {'client_id': client.id, 'month': 3, 'year': 2024, **values}
+
+
+def test_bulk_upsert_counts_created_updated_replaced_and_invalid(
+    session, make_client
+):
+    first = make_client('Maria Silva', has_monthly_variation=True)
+    second = make_client('José Souza', has_monthly_variation=True)
+    MonthlyVariableValuesService.bulk_upsert_monthly_values(
+        session, [_item(first, water_bill=50.0)]
+    )
+
+    report = MonthlyVariableValuesService.bulk_upsert_monthly_values(
+        session,
+        [
+            _item(first, water_bill=60.0),
+            _item(second, gas_bill=20.0),
+            _item(second, gas_bill=25.0),
+            {'client_id': second.id, 'month': 13, 'year': 2024},
+            {'client_id': 999, 'month': 3, 'year': 2024},
+        ],
+        chunk_size=1,
+    )
+
+    assert report['total_items'] == 5
+    assert [result['status'] for result in report['results']] == [
+        'updated', 'replaced', 'created', 'invalid', 'invalid'
+    ]
+    assert (
+        report['created'],
+        report['updated'],
+        report['replaced'],
+        report['invalid'],
+    ) == (1, 1, 1, 2)
+    assert report['recalculation'] is None
+
+    session.expire_all()
+    values = {
+        row.client_id: row
+        for row in session.query(MonthlyVariableValues)
+    }
+    assert values[first.id].water_bill == 60.0
+    assert values[second.id].gas_bill == 25.0
+    assert report['results'][0]['id'] == values[first.id].id
+    assert report['results'][2]['id'] == values[second.id].id
+
+
+def test_bulk_upsert_recalculates_only_written_clients(session, make_client):
+    written = make_client('Maria Silva', has_monthly_variation=True)
+    make_client('José Souza', has_monthly_variation=True)
+
+    report = MonthlyVariableValuesService.bulk_upsert_monthly_values(
+        session, [_item(written, condo_fee=300.0)], recalculate=True
+    )
+
+    [recalculation] = report['recalculation']
+    assert (recalculation['month'], recalculation['year']) == (3, 2024)
+    assert recalculation['total_processed'] == 1
+    assert recalculation['successful'] == 1
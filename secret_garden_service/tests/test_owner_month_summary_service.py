@@ -0,0 +1,48 @@
+from src.secret_garden.services.bank_return_service import BankReturnService
+from src.secret_garden.services.monthly_calculation_service import \
+    MonthlyCalculationService
+from src.secret_garden.services.monthly_transfer_service import \
+    MonthlyTransferService
+from src.secret_garden.services.owner_month_summary_service import (
+    BANK_RETURN_FIELDS, TRANSFER_FIELDS, OwnerMonthSummaryService)
+
+
+def test_summary_follows_writes_and_matches_reports(
+    session, owner, make_client
+):
+    first = make_client('Maria Silva', condo_fee=300.0, delivery_fee=3.5)
+    second = make_client('José Souza', amount_paid=2000.0)
+    MonthlyCalculationService.calculate_for_all_clients_bulk(session, 3, 2024)
+    BankReturnService.bulk_create_or_update_bank_returns(session, [
+        {'client_id': first.id, 'month': 3, 'year': 2024,
+         'title_amount': 1000.0, 'charged_amount': 1010.0,
+         'variation_amount': 10.0},
+        {'client_id': second.id, 'month': 3, 'year': 2024,
+         'title_amount': 2000.0, 'charged_amount': 1990.0,
+         'variation_amount': -10.0},
+    ])
+
+    summary = OwnerMonthSummaryService.get_summary(session, owner.id, 3, 2024)
+    transfers = MonthlyTransferService.get_owner_transfers(
+        session, owner.id, 3, 2024
+    )['summary']
+    bank_returns = BankReturnService.get_owner_bank_returns(
+        session, owner.id, 3, 2024
+    )['summary']
+
+    assert summary['updated_at'] is not None
+    assert summary['total_properties'] == 2
+    assert summary['total_returns'] == 2
+    for field in TRANSFER_FIELDS:
+        assert summary[field] == transfers[field], field
+    for field in BANK_RETURN_FIELDS:
+        assert summary[field] == bank_returns[field], field
+
+
+def test_summary_of_owner_without_active_clients_is_empty(session, owner):
+    summary = OwnerMonthSummaryService.get_summary(session, owner.id, 3, 2024)
+
+    assert summary['updated_at'] is None
+    assert all(
+        summary[field] == 0 for field in TRANSFER_FIELDS + BANK_RETURN_FIELDS
+    )
@@ -0,0 +1,35 @@
+from src.secret_garden.services.report_cache import ReportCache
+
+
+def test_set_skips_report_built_before_invalidation():
+    cache = ReportCache()
+    key = ('transfers', 1, 3, 2024)
+
+    generation = cache.generation(1, 3, 2024)
+    cache.invalidate(1, 3, 2024)
+    cache.set(key, {'stale': True}, generation)
+
+    assert cache.get(key) is None
+
+
+def test_set_keeps_report_when_other_owner_is_invalidated():
+    cache = ReportCache()
+    key = ('transfers', 1, 3, 2024)
+
+    generation = cache.generation(1, 3, 2024)
+    cache.invalidate(2, 3, 2024)
+    cache.invalidate(1, 4, 2024)
+    cache.set(key, {'fresh': True}, generation)
+
+    assert cache.get(key) == {'fresh': True}
+
+
+def test_month_and_owner_wide_invalidations_reach_the_report():
+    cache = ReportCache()
+    key = ('bank_returns', 1, 3, 2024)
+
+    for filters in ({'month': 3, 'year': 2024}, {'owner_id': 1}, {}):
+        generation = cache.generation(1, 3, 2024)
+        cache.invalidate(**filters)
+        cache.set(key, {'stale': True}, generation)
+        assert cache.get(key) is None
@@ -0,0 +1,89 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.secret_garden.database.models import RetornoPagamento
+from src.secret_garden.services.retorno_service import RetornoService
+
+
+def test_lote_rejects_inactive_clients(session, make_client):
+    active = make_client('Maria Silva')
+    inactive = make_client('José Souza', is_active=False)
+
+    result = RetornoService.processar_retornos_lote(session, [
+        {'client_id': active.id, 'payment_date': date(2024, 3, 10),
+         'amount_paid': 1000.0},
+        {'client_id': inactive.id, 'payment_date': date(2024, 3, 10),
+         'amount_paid': 1000.0},
+    ])
+
+    assert (result['processed'], result['rejected']) == (1, 1)
+    rejected = result['items'][1]
+    assert rejected['success'] is False
+    assert 'inativo' in rejected['message']
+    assert session.query(RetornoPagamento).count() == 1
+
+
+def test_single_path_rejects_inactive_client(session, make_client):
+    inactive = make_client('José Souza', is_active=False)
+
+    result = RetornoService.processar_retorno(
+        session, inactive.id, date(2024, 3, 10), 1000.0
+    )
+
+    assert result['success'] is False
+    assert 'inativo' in result['message']
+
+
+def _retornos(session, client, months):
+    RetornoService.processar_retornos_lote(session, [
+        {'client_id': client.id, 'payment_date': date(2024, month, 10),
+         'amount_paid': 1000.0}
+        for month in months
+    ])
+    return session.query(RetornoPagamento).order_by(RetornoPagamento.id).all()
+
+
+def test_paginar_cursor_round_trip(session, make_client):
+    client = make_client('Maria Silva')
+    retornos = _retornos(session, client, range(1, 8))
+    # Retornos com a mesma data de processamento são desempatados pelo id
+    for retorno, day in zip(retornos, (1, 1, 1, 2, 2, 3, 3)):
+        retorno.processed_at = datetime(2024, 4, day, 12, 0)
+    session.commit()
+
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = RetornoService.get_retornos(
+            session, client_id=client.id, limit=3, cursor=cursor
+        )
+        pages.append([retorno.id for retorno in page])
+        if cursor is None:
+            break
+
+    expected = [
+        retorno.id
+        for retorno in sorted(
+            retornos,
+            key=lambda retorno: (retorno.processed_at, retorno.id),
+            reverse=True,
+        )
+    ]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [retorno_id for page in pages for retorno_id in page] == expected
+
+
+def test_paginar_last_page_has_no_cursor(session, make_client):
+    client = make_client('Maria Silva')
+    _retornos(session, client, range(1, 4))
+
+    page, cursor = RetornoService.get_retornos(session, limit=3)
+
+    assert len(page) == 3
+    assert cursor is None
+
+
+def test_paginar_rejects_invalid_cursor(session):
+    with pytest.raises(ValueError, match='Cursor de paginação inválido'):
+        RetornoService.get_retornos(session, limit=3, cursor='invalido')